@@ -0,0 +1,73 @@
+import time
+import tempfile
+from contextlib import contextmanager
+from utils.driver_factory import DriverFactory
+from utils.fixtures import FixtureServer, build_synthetic_fixture
+from utils.profiler import CommandProfiler
+
+
+class BenchmarkFailure(AssertionError):
+    pass
+
+
+def expect(condition, message):
+    """
+    Correctness check of a benchmark: raises (non-zero exit) instead of printing a True/False column.
+    """
+    if not condition:
+        raise BenchmarkFailure(message)
+
+
+@contextmanager
+def synthetic_fixture(modules, **options):
+    """
+    Writes a synthetic portal (see build_synthetic_fixture) to a temp folder. Yields (path, menu items).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp, build_synthetic_fixture(tmp, modules, **options)
+
+
+@contextmanager
+def synthetic_portal(modules, **options):
+    """
+    Synthetic portal served on localhost. Yields (FixtureServer, menu items).
+    """
+    with synthetic_fixture(modules, **options) as (path, items):
+        with FixtureServer(path) as server:
+            yield server, items
+
+
+@contextmanager
+def profiled_driver(**options):
+    """
+    Headless Chrome (no implicit wait) whose WebDriver commands are recorded. Yields (driver, CommandProfiler).
+    """
+    profiler = CommandProfiler()
+    options.setdefault("implicit_wait", 0)
+    driver = profiler.attach(DriverFactory().create(headless=True, **options))
+    try:
+        yield driver, profiler
+    finally:
+        driver.quit()
+
+
+@contextmanager
+def measured(profiler=None):
+    """
+    Times the block; with a profiler also counts its WebDriver round-trips. Yields the result dict.
+    """
+    result = {}
+    commands, started = len(profiler.events) if profiler else 0, time.perf_counter()
+    yield result
+    result["seconds"] = time.perf_counter() - started
+    result["round_trips"] = len(profiler.events) - commands if profiler else 0
+
+
+def print_table(headers, rows):
+    """
+    First column left-aligned, the rest right-aligned; floats with 2 decimals.
+    """
+    cells = [[f"{value:.2f}" if isinstance(value, float) else str(value) for value in row] for row in rows]
+    widths = [max([len(header)] + [len(row[i]) for row in cells]) for i, header in enumerate(headers)]
+    for row in [headers] + cells:
+        print(" ".join(f"{value:<{width}}" if i == 0 else f"{value:>{width}}" for i, (value, width) in enumerate(zip(row, widths))))
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+import tempfile
+from config import Config
+from utils.driver_factory import DriverFactory
+from benchmarks.common import expect, print_table
+
+
+def benchmark_startup(runs=3, headless=True):
+    """
+    Cold start = chromedriver cache cleared (version lookup + download check); warm start = cached path.
+    Uses a temporary cache file, so the project's own cache is left alone. The cold start must cache
+    the chromedriver path and the warm starts must use it.
+    """
+    results = {"cold": [], "warm": []}
+    sources = set()
+    with tempfile.TemporaryDirectory() as tmp:
+        factory = DriverFactory(cache_file=os.path.join(tmp, ".driver_cache.json"))
+        for i in range(runs):
+            for mode in ("cold", "warm"):
+                if mode == "cold" and os.path.exists(factory.cache_file):
+                    os.remove(factory.cache_file)
+                elif mode == "warm":
+                    sources.add(factory.resolve_driver_path()[1])
+                started = time.perf_counter()
+                driver = factory.create(headless=headless, implicit_wait=0)
+                results[mode].append(time.perf_counter() - started)
+                driver.quit()
+
+    print_table(["Mode", "Runs", "Min (s)", "Avg (s)", "Max (s)"],
+                [[mode, len(values), min(values), sum(values) / len(values), max(values)] for mode, values in results.items()])
+    expect(sources == {"cache"}, f"warm starts resolved chromedriver via {', '.join(sorted(sources))}, not the cache "
+                                 f"(the cold start could not cache it: is webdriver-manager reachable?)")
+    cold, warm = (sum(results[mode]) / runs for mode in ("cold", "warm"))
+    expect(warm < cold, f"warm starts ({warm:.2f}s) are not faster than cold starts ({cold:.2f}s)")
+    return results
+
+
+if __name__ == "__main__":
+    Config.ensure_dirs()
+    benchmark_startup(runs=int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import tempfile
+from utils.inventory_db import InventoryDB
+from benchmarks.common import expect, print_table
+
+
+def benchmark_queries(runs=50, modules=40, elements_per_screen=20):
+    """
+    Builds a synthetic history (runs x modules x 16 menu items, each L3 screen with its elements)
+    in a temp database and times the inserts and the query CLI lookups. Each lookup must return
+    exactly the rows the synthetic history implies.
+    """
+    probe = min(7, modules - 1)
+    changing = sum(1 for m in range(modules) for s in range(3) for i in range(4) if (m + s + i) % 50 == 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = InventoryDB(os.path.join(tmp, "bench.db"))
+        insert_seconds = 0.0
+        for run in range(runs):
+            items = []
+            for m in range(modules):
+                l1 = f"Modulo {m}"
+                items.append({"menu_level_1": l1, "item_text": l1})
+                for s in range(3):
+                    l2 = f"Submenu {m}.{s}"
+                    items.append({"menu_level_1": l1, "menu_level_2": l2, "item_text": l2})
+                    for i in range(4):
+                        l3, url = f"Opcion {m}.{s}.{i}", f"/screens/{m}_{s}_{i}.html"
+                        items.append({"menu_level_1": l1, "menu_level_2": l2, "menu_level_3": l3, "item_text": l3, "url_after_click": url})
+                        # One screen in 50 changes on every run
+                        version = run if (m + s + i) % 50 == 0 else 0
+                        items.extend({"menu_level_1": l1, "menu_level_2": l2, "menu_level_3": l3, "item_text": f"Campo {e}.{version}",
+                                      "action_type": "input", "selector_hint": f"#c{e}", "url_after_click": url}
+                                     for e in range(elements_per_screen))
+            started = time.perf_counter()
+            db.add_run(items)
+            insert_seconds += time.perf_counter() - started
+
+        # (query, rows expected): 12 L3 items per module; the changing screens differ from the previous run
+        # in every run but the first; "Opcion 7.1" matches the 4 L3 items of submenu 7.1 and no element
+        queries = {
+            "items --l1 (L3)": (lambda: db.items(l1=f"Modulo {probe}", level=3), 12),
+            "changes --last 10": (lambda: db.changed_screens(10), changing * min(10, runs - 1)),
+            "search (last run)": (lambda: db.search(f"Opcion {probe}.1"), 4),
+            "runs --last 10": (lambda: db.runs(10), min(10, runs)),
+        }
+        total = db.conn.execute("SELECT (SELECT COUNT(*) FROM menu_nodes) + (SELECT COUNT(*) FROM elements)").fetchone()[0]
+        results = {}
+        for label, (query, expected) in queries.items():
+            started = time.perf_counter()
+            rows = query()
+            results[label] = (len(rows), expected, (time.perf_counter() - started) * 1000)
+        db.close()
+
+    print(f"{runs} runs, {total} rows; insert {insert_seconds / runs * 1000:.0f} ms/run")
+    print_table(["Query", "Rows", "Expected", "ms"], [[label, rows, expected, ms] for label, (rows, expected, ms) in results.items()])
+    expected_total = runs * modules * (16 + 12 * elements_per_screen)
+    expect(total == expected_total, f"{total} rows stored, expected {expected_total}")
+    for label, (rows, expected, ms) in results.items():
+        expect(rows == expected, f"{label}: {rows} rows, expected {expected}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_queries(*(int(a) for a in sys.argv[1:4]))
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import filecmp
+import tempfile
+import tracemalloc
+from utils.helpers import save_inventory_json, save_inventory_csv
+from utils.inventory_sink import InventoryRecord, InventorySink
+from benchmarks.common import expect, print_table
+
+
+def synthetic_items(count, ts):
+    # Menu-shaped rows: 16 items per L1 module (1 L1, 3 L2, 12 L3 with a screen URL)
+    for n in range(count):
+        m, r = divmod(n, 16)
+        l1, l2, l3 = f"Modulo {m}", "", ""
+        if r:
+            s, i = divmod(r - 1, 5)
+            l2 = f"Submenu {m}.{s}"
+            if i:
+                l3 = f"Opcion {m}.{s}.{i}"
+        yield InventoryRecord(l3 or l2 or l1, l1, l2, l3, ts=ts, url_after_click=f"/screens/{m}_{r}.html" if l3 else "")
+
+
+def benchmark_sink(count=100000):
+    """
+    Writes `count` synthetic items the old way (list of dicts + save_inventory_json/csv at the end)
+    and through InventorySink: wall time (untraced run) and peak traced memory (tracemalloc run).
+    Both writers must produce byte-identical inventory.json and inventory.csv.
+    """
+    ts = time.time()
+
+    def legacy(out_dir):
+        data = [record.to_dict() for record in synthetic_items(count, ts)]
+        save_inventory_json(data, os.path.join(out_dir, "inventory.json"))
+        save_inventory_csv(data, os.path.join(out_dir, "inventory.csv"))
+
+    def streamed(out_dir):
+        sink = InventorySink(output_dir=out_dir)
+        for record in synthetic_items(count, ts):
+            sink.write(record)
+        sink.finalize()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, writer in (("list + dump", legacy), ("sink", streamed)):
+            out_dir = os.path.join(tmp, label.split()[0])
+            os.makedirs(out_dir)
+            started = time.perf_counter()
+            writer(out_dir)
+            seconds = time.perf_counter() - started
+            tracemalloc.start()
+            writer(out_dir)
+            results[label] = (seconds, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        different = [name for name in ("inventory.json", "inventory.csv")
+                     if not filecmp.cmp(os.path.join(tmp, "list", name), os.path.join(tmp, "sink", name), shallow=False)]
+
+    print(f"{count} items")
+    print_table(["Writer", "Seconds", "Peak MB"], [[label, seconds, f"{peak / 1048576:.1f}"] for label, (seconds, peak) in results.items()])
+    expect(not different, f"InventorySink output differs from the list + dump writer: {', '.join(different)}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_sink(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
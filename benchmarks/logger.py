@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import logging
+import tempfile
+from utils.logger import setup_logger, stop_listener
+from benchmarks.common import expect, print_table
+
+
+def count_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+
+def benchmark_logging(calls=20000):
+    """
+    Per-call cost of logger.info in the caller thread: synchronous Stream+File handlers vs the queue pipeline.
+    Output goes to temp files so the console speed doesn't skew the numbers; every record must reach its file.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        sync = logging.getLogger("bench-sync")
+        sync.propagate = False
+        sync.setLevel(logging.INFO)
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        for handler in (logging.StreamHandler(devnull), logging.FileHandler(os.path.join(tmp, "sync.log"), encoding="utf-8")):
+            handler.setFormatter(formatter)
+            sync.addHandler(handler)
+
+        queued = setup_logger("bench-queue", log_dir=tmp, console=devnull, json_lines=False, levels={})
+
+        for label, log in (("sync", sync), ("queue", queued)):
+            started = time.perf_counter()
+            for i in range(calls):
+                log.info("Benchmark record %d: Depth 3 -> Level 2", i)
+            results[label] = (time.perf_counter() - started) / calls * 1e6
+
+        stop_listener(queued)
+        for handler in sync.handlers + list(queued.listener.handlers):
+            handler.close()
+        written = {"sync": count_lines(os.path.join(tmp, "sync.log")),
+                   "queue": count_lines(os.path.join(tmp, "execution.log"))}
+
+    print_table(["Pipeline", "Calls", "Written", "us/call"], [[label, calls, written[label], per_call] for label, per_call in results.items()])
+    for label, lines in written.items():
+        expect(lines == calls, f"{label}: {lines} of {calls} records reached the log file")
+    expect(results["queue"] < results["sync"],
+           f"the queue pipeline costs the caller more than the synchronous handlers: {results['queue']:.1f} vs {results['sync']:.1f} us/call")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_logging(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
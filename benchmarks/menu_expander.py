@@ -0,0 +1,35 @@
+import sys
+from selenium.webdriver.common.by import By
+from utils.menu_expander import MenuExpander
+from utils.snapshot import snapshot_sidebar
+from benchmarks.common import expect, measured, print_table, profiled_driver, synthetic_portal
+
+
+def benchmark_expand(modules=313):
+    """
+    Expands the collapsed sidebar of a synthetic portal (modules x 16 menu items; 313 modules = 5008
+    items, 1252 collapsed nodes): nodes opened, WebDriver round-trips and wall time. Every collapsed
+    node must be opened, every menu link visible afterwards, and a second expand() must open nothing.
+    """
+    with profiled_driver() as (driver, profiler), synthetic_portal(modules) as (server, items):
+        driver.get(server.entry_url)
+        sidebar = driver.find_element(By.CSS_SELECTOR, ".sidebar-menu")
+        expander = MenuExpander(driver, node_budget=items)
+
+        with measured(profiler) as run:
+            opened = expander.expand(sidebar)
+        _, nodes = snapshot_sidebar(driver, sidebar)
+        reopened = expander.expand(sidebar)
+
+    collapsed = modules * 4   # Each module and its 3 submenus
+    print(f"{modules} modules, {items} menu items")
+    print_table(["Opened", "Round-trips", "Seconds", "Visible", "Re-opened"],
+                [[opened, run["round_trips"], run["seconds"], len(nodes), reopened]])
+    expect(opened == collapsed, f"opened {opened} nodes, expected {collapsed}")
+    expect(len(nodes) == items, f"{len(nodes)} links visible after expanding, expected {items}")
+    expect(reopened == 0, f"a second expand() opened {reopened} nodes")
+    return opened, run
+
+
+if __name__ == "__main__":
+    benchmark_expand(int(sys.argv[1]) if len(sys.argv) > 1 else 313)
@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import time
+import urllib.request
+from utils.fixtures import FixtureServer, MANIFEST_FILE
+from utils.network_capture import NetworkMenuCapture, decode_payload, find_menu_tree, tree_to_records
+from utils.waits import Waits
+from benchmarks.common import expect, print_table, profiled_driver, synthetic_fixture
+
+
+def flatten_payload(nodes, parent=None, out=None):
+    # Same menu as {id, parentId, ...} rows: the other payload shape find_menu_tree accepts
+    out = [] if out is None else out
+    for node in nodes:
+        row = {"id": len(out) + 1, "parentId": parent, "text": node["text"], "url": node.get("url", "")}
+        out.append(row)
+        flatten_payload(node.get("children", []), row["id"], out)
+    return out
+
+
+def add_flat_payload(path):
+    """
+    Adds the fixture's menu as a flat id/parentId payload served at /api/menu_flat.json.
+    """
+    with open(os.path.join(path, "payloads", "menu.json"), "r", encoding="utf-8") as f:
+        nested = json.load(f)["d"]
+    with open(os.path.join(path, "payloads", "menu_flat.json"), "w", encoding="utf-8") as f:
+        json.dump({"data": flatten_payload(nested)}, f, ensure_ascii=False)
+    with open(os.path.join(path, MANIFEST_FILE), "r+", encoding="utf-8") as f:
+        manifest = json.load(f)
+        manifest["payloads"]["/api/menu_flat.json"] = {"file": "payloads/menu_flat.json", "mime": "application/json"}
+        f.seek(0)
+        json.dump(manifest, f, indent=2)
+        f.truncate()
+
+
+def levels(records):
+    return [(r.menu_level_1, r.menu_level_2, r.menu_level_3, r.url_after_click) for r in records]
+
+
+def benchmark_capture(modules=32, browser=True):
+    """
+    Serves a synthetic portal (its menu as a recorded nested payload and as a flat id/parentId one)
+    and parses each payload fetched over HTTP. With browser=True the same server is also captured
+    through Chrome's performance log (NetworkMenuCapture), the path --capture network takes after
+    login. Every source must yield all the menu items, with the same L1/L2/L3 tree and URLs.
+    """
+    results = []
+    with synthetic_fixture(modules) as (path, expected):
+        add_flat_payload(path)
+        with FixtureServer(path) as server:
+            for source in ("/api/menu.json", "/api/menu_flat.json"):
+                url = server.url + source
+                with urllib.request.urlopen(url, timeout=10) as response:
+                    body = response.read().decode("utf-8")
+                started = time.perf_counter()
+                records = tree_to_records(find_menu_tree(decode_payload(body), url))
+                results.append((source, levels(records), time.perf_counter() - started))
+
+            if browser:
+                with profiled_driver(performance_log=True) as (driver, _):
+                    started = time.perf_counter()
+                    driver.get(server.entry_url)
+                    Waits.wait_for_network_idle(driver)
+                    records = NetworkMenuCapture(driver).capture()
+                    results.append(("chrome performance log", levels(records), time.perf_counter() - started))
+
+    reference = results[0][1]
+    print(f"{modules} modules, {expected} menu items expected")
+    print_table(["Source", "Items", "ms"], [[source, len(tree), f"{seconds * 1000:.1f}"] for source, tree, seconds in results])
+    for source, tree, _ in results:
+        expect(len(tree) == expected, f"{source}: {len(tree)} items, expected {expected}")
+        expect(tree == reference, f"{source}: menu tree differs from {results[0][0]}")
+    return results
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:] if a.isdigit()]
+    benchmark_capture(sizes[0] if sizes else 32, "--no-browser" not in sys.argv)
@@ -0,0 +1,38 @@
+import sys
+from selenium.webdriver.common.by import By
+from utils.snapshot import snapshot_sidebar
+from benchmarks.common import expect, measured, print_table, profiled_driver, synthetic_portal
+
+# Shows every collapsed submenu of the synthetic portal, so both parsers see the full tree as visible links
+SHOW_ALL_JS = "document.querySelectorAll('.treeview-menu').forEach(function (ul) { ul.style.display = 'block'; });"
+
+
+def benchmark_snapshot(modules=32):
+    """
+    Parses the sidebar of a synthetic portal (submenus shown) the old way (is_displayed + .text +
+    ./ancestor::ul per link) and with snapshot_sidebar: WebDriver round-trips and wall time of each.
+    Both must return the same (text, depth) list, one per menu item.
+    """
+    with profiled_driver() as (driver, profiler), synthetic_portal(modules) as (server, items):
+        driver.get(server.entry_url)
+        driver.execute_script(SHOW_ALL_JS)
+        sidebar = driver.find_element(By.CSS_SELECTOR, ".sidebar-menu")
+
+        with measured(profiler) as legacy:
+            legacy["nodes"] = [(link.text.strip(), len(link.find_elements(By.XPATH, "./ancestor::ul")))
+                               for link in sidebar.find_elements(By.TAG_NAME, "a") if link.is_displayed()]
+        with measured(profiler) as snapshot:
+            _, nodes = snapshot_sidebar(driver, sidebar)
+            snapshot["nodes"] = [(n.text, n.depth) for n in nodes]
+
+    print(f"{modules} modules, {items} menu items")
+    print_table(["Parser", "Links", "Round-trips", "Seconds"],
+                [[label, len(r["nodes"]), r["round_trips"], r["seconds"]] for label, r in (("per element", legacy), ("snapshot", snapshot))])
+    expect(len(legacy["nodes"]) == items, f"per-element parser found {len(legacy['nodes'])} links, expected {items}")
+    expect(snapshot["nodes"] == legacy["nodes"], "snapshot_sidebar nodes differ from the per-element parser")
+    expect(snapshot["round_trips"] == 1, f"snapshot took {snapshot['round_trips']} round-trips, expected 1")
+    return legacy, snapshot
+
+
+if __name__ == "__main__":
+    benchmark_snapshot(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
@@ -0,0 +1,120 @@
+import sys
+import time
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from utils.throttle import AdaptiveThrottle, navigation_status
+from benchmarks.common import expect, print_table
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            load = server.in_flight
+        try:
+            # Latency grows with the requests in flight; past capacity the server answers 503
+            time.sleep(server.base_latency * load)
+            status = 503 if load > server.capacity else 200
+            self.send_response(status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def benchmark_throttle(clients=16, requests_per_client=20, base_latency=0.05, capacity=4, max_rps=20.0):
+    """
+    Stand-in ERP on localhost whose latency rises with concurrent load (503 past `capacity`).
+    `clients` threads hammer it with and without the throttle; prints throughput, errors and the limits reached.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.base_latency = base_latency
+    server.capacity = capacity
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    def fetch():
+        try:
+            with urllib.request.urlopen(url, timeout=10) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    class StandInExecutor:
+        # Behaves like ChromeDriver on that server: get succeeds even for the 503 page (it has a body);
+        # the status is only visible through the navigation entry (NAVIGATION_STATUS_JS)
+        def __init__(self):
+            self.status = threading.local()
+
+        def execute(self, command, params=None):
+            if command == "w3cExecuteScript":
+                return {"value": getattr(self.status, "code", 0)}
+            self.status.code = 200 if fetch() else 503
+            return {"value": None}
+
+    class StandInDriver:
+        def __init__(self):
+            self.command_executor = StandInExecutor()
+
+    def new_throttle():
+        return AdaptiveThrottle(max_rps=max_rps, max_concurrency=clients, target_latency=base_latency * capacity, enabled=True)
+
+    results = {}
+    for label, throttle in (("none", None), ("aimd", new_throttle()), ("driver", new_throttle())):
+        outcome = {"ok": 0, "errors": 0}
+        lock = threading.Lock()
+        # "driver": the requests go through attach() on a stand-in command executor, like driver.get
+        executor = throttle.attach(StandInDriver()).command_executor if label == "driver" else None
+
+        def client():
+            for _ in range(requests_per_client):
+                if throttle is None:
+                    ok = fetch()
+                elif executor is not None:
+                    executor.execute("get", {"url": url})
+                    ok = navigation_status(executor.execute) == 200
+                else:
+                    with throttle.request("get") as result:
+                        ok = result["ok"] = fetch()
+                with lock:
+                    outcome["ok" if ok else "errors"] += 1
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        outcome["seconds"] = time.perf_counter() - started
+        outcome["throttle"] = throttle
+        results[label] = outcome
+    server.shutdown()
+    server.server_close()
+
+    rows = []
+    for label, o in results.items():
+        t = o["throttle"]
+        rows.append([label, o["ok"], o["errors"], o["seconds"], (o["ok"] + o["errors"]) / o["seconds"],
+                     *((t.limit, t.rate, t.stats["peak_queue"]) if t else ("-", "-", "-"))])
+    print_table(["Mode", "OK", "Errors", "Seconds", "Req/s", "Limit", "Rps", "PeakQ"], rows)
+    none, aimd, driver = (results[label]["errors"] for label in ("none", "aimd", "driver"))
+    expect(none > 0, f"the stand-in server was never overloaded without the throttle (capacity {capacity}, {clients} clients)")
+    expect(aimd < none, f"the throttle did not reduce the errors: {aimd} with it, {none} without")
+    # attach() only wraps the command executor: it must back off as well as the explicit request() path
+    expect(driver < none and driver <= max(2 * aimd, capacity),
+           f"the throttle attached to the driver did not back off like request(): {driver} errors, {aimd} with request(), {none} without")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_throttle(*(int(a) for a in sys.argv[1:3]))
@@ -16,11 +16,100 @@ class Config:
     OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
     LOG_DIR = os.path.join(OUTPUT_DIR, "logs")
     EVIDENCE_DIR = os.path.join(OUTPUT_DIR, "evidence")
-    
-    # Ensure directories exist
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    os.makedirs(LOG_DIR, exist_ok=True)
-    os.makedirs(EVIDENCE_DIR, exist_ok=True)
+
+    # Session cache (skips CAPTCHA on repeat runs)
+    SESSION_FILE = os.path.join(OUTPUT_DIR, "session.enc")
+    SESSION_TTL_MINUTES = float(os.getenv("INTEGRENS_SESSION_TTL_MINUTES", "480"))
+    SESSION_KEY = os.getenv("INTEGRENS_SESSION_KEY")
+
+    # Streaming inventory output
+    SINK_FSYNC_EVERY = 200   # Items between fsyncs of inventory.jsonl/.csv
+    CHECKPOINT_FILE = os.path.join(OUTPUT_DIR, "crawl_checkpoint.json")
+    RUN_INDEX_FILE = os.path.join(OUTPUT_DIR, "run_index.json")   # Subtree hashes + items of the last run
+    NAV_INDEX_FILE = os.path.join(OUTPUT_DIR, "nav_index.json")   # Menu path -> screen URL (direct navigation)
+    NAV_LEARN_MAX = 200   # Menu leaves without an href (onclick navigation) clicked per run to learn their URL (0 = off)
+
+    # Run history (SQLite, queried with query_inventory.py)
+    INVENTORY_DB = os.getenv("INTEGRENS_INVENTORY_DB", "1") == "1"
+    INVENTORY_DB_FILE = os.path.join(OUTPUT_DIR, "inventory.db")
+
+    # Parallel crawl (worker pool)
+    WORKER_POOL_SIZE = int(os.getenv("INTEGRENS_WORKERS", "4"))
+    WORKER_MAX_RESTARTS = 3   # Browser restarts allowed per worker
+    WORKER_TASK_RETRIES = 1   # Retries per module after a crash
+
+    # Screen inventory (buttons, inputs, combos, grids of every menu screen)
+    SCREEN_MAX_DEPTH = 1        # Link hops from a menu screen queued for harvesting (BFS)
+    SCREEN_MAX_SCREENS = 2000   # Max distinct URLs visited per run
+    ASYNC_TABS = 4
+    TAB_PAGE_TIMEOUT = 30   # Seconds per screen (load + settle + harvest)
+
+    # Network capture mode (menu read from the portal's XHR payload)
+    NETWORK_MENU_MIN_NODES = 5   # Smaller candidates are ignored and the DOM crawl is used
+
+    # Logging (queued; written by a background listener thread)
+    LOG_MAX_BYTES = 5 * 1024 * 1024   # execution.log rotation size
+    LOG_BACKUP_COUNT = 5
+    LOG_JSON = os.getenv("INTEGRENS_LOG_JSON", "0") == "1"   # Also write logs/execution.jsonl (phase, worker, elapsed_ms)
+    # Per-module levels, e.g. INTEGRENS_LOG_LEVELS="safe_actions=WARNING,waits=WARNING,network_capture=DEBUG"
+    LOG_LEVELS = dict(item.strip().split("=", 1) for item in os.getenv("INTEGRENS_LOG_LEVELS", "").split(",") if "=" in item)
+
+    # Click strategy memory (SafeActions.robust_click tries the strategy that last worked first)
+    CLICK_MEMORY_PERSIST = os.getenv("INTEGRENS_CLICK_MEMORY", "1") == "1"   # Keep it between runs
+    CLICK_MEMORY_FILE = os.path.join(OUTPUT_DIR, "click_strategies.json")
+
+    # Adaptive throttle (AIMD) for page loads and clicks sent to the ERP server
+    THROTTLE_ENABLED = os.getenv("INTEGRENS_THROTTLE", "1") == "1"
+    THROTTLE_MAX_RPS = float(os.getenv("INTEGRENS_MAX_RPS", "5"))   # Hard cap, requests/second across all browsers and tabs
+    THROTTLE_MIN_RPS = 0.5
+    THROTTLE_MAX_CONCURRENCY = int(os.getenv("INTEGRENS_MAX_IN_FLIGHT", "8"))
+    THROTTLE_TARGET_LATENCY = 3.0   # Seconds; slower responses count as congestion
+    THROTTLE_BACKOFF = 0.5          # Multiplicative decrease on errors / slow responses
+
+    # Automatic menu expansion
+    EXPAND_MAX_DEPTH = 6               # Nesting levels below the root to open
+    EXPAND_NODE_BUDGET = 5000          # Max collapsed nodes opened per MenuExpander.expand call (one per L1 module)
+    EXPAND_MAX_CLICKS_PER_LEVEL = 10   # Native-click fallbacks per BFS level
+    DOM_QUIET_MS = 150                 # DOM considered settled after this long without mutations
+    DOM_SETTLE_TIMEOUT_MS = 5000
+    NETWORK_IDLE_MS = 500              # No pending XHR/fetch for this long = page loaded
+    NAVIGATION_START_MS = 2000         # Max wait for a click to start loading before idle is measured
+
+    # Record/replay fixtures (offline crawler regression runs, see replay.py)
+    FIXTURES_DIR = os.path.join(OUTPUT_DIR, "fixtures")
+    REPLAY_DIR = os.path.join(OUTPUT_DIR, "replay")   # Outputs of replay runs, one folder per fixture
+
+    # Driver startup
+    DRIVER_CACHE_FILE = os.path.join(OUTPUT_DIR, ".driver_cache.json")   # chromedriver path per Chrome major version
+    HEADLESS_WINDOW_SIZE = (1920, 1080)
+    IMPLICIT_WAIT = 5
+
+    @staticmethod
+    def ensure_dirs():
+        """
+        Creates the output folders. Called lazily by the writers instead of at import time.
+        """
+        for path in (Config.OUTPUT_DIR, Config.LOG_DIR, Config.EVIDENCE_DIR):
+            os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def use_output_dir(path):
+        """
+        Points every run output (inventory, indexes, checkpoint, evidence, session and driver caches,
+        fixtures) to another folder. Used by replay runs so they neither overwrite the results of the live
+        crawl nor read its session cache. Logs stay in LOG_DIR; REPLAY_DIR stays the parent of every replay.
+        """
+        Config.OUTPUT_DIR = path
+        Config.EVIDENCE_DIR = os.path.join(path, "evidence")
+        Config.SESSION_FILE = os.path.join(path, "session.enc")
+        Config.CHECKPOINT_FILE = os.path.join(path, "crawl_checkpoint.json")
+        Config.RUN_INDEX_FILE = os.path.join(path, "run_index.json")
+        Config.NAV_INDEX_FILE = os.path.join(path, "nav_index.json")
+        Config.INVENTORY_DB_FILE = os.path.join(path, "inventory.db")
+        Config.CLICK_MEMORY_FILE = os.path.join(path, "click_strategies.json")
+        Config.FIXTURES_DIR = os.path.join(path, "fixtures")
+        Config.DRIVER_CACHE_FILE = os.path.join(path, ".driver_cache.json")
+        Config.ensure_dirs()
 
     @staticmethod
     def validate_config():
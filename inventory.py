@@ -1,141 +1,565 @@
+import os
+import json
 import time
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException
 from utils.logger import logger
-from utils.helpers import save_inventory_json, save_inventory_csv, take_screenshot
+from utils.helpers import take_screenshot
+from utils.inventory_sink import InventoryRecord, InventorySink
+from utils.snapshot import snapshot_sidebar, subtree_hashes, module_keys, normalize_text, LINK_TEXT_JS
+from utils.run_index import RunIndex, diff_inventories, save_diff_report
+from utils.session_store import SessionStore
+from utils.worker_pool import CrawlWorkerPool
+from utils.menu_expander import MenuExpander
+from utils.profiler import profiler
+from utils.checkpoint import CrawlCheckpoint
+from utils.tab_crawler import TabCrawler
+from utils.screen_crawler import ScreenCrawler
+from utils.network_capture import NetworkMenuCapture
+from utils.frame_tree import FrameTree
+from utils.nav_index import NavIndex
+from utils.safe_actions import SafeActions
+from utils.waits import Waits
+from utils.evidence_store import evidence_store
+from utils.inventory_db import record_run
 from config import Config
 
+# Sidebar links that are chrome/noise rather than menu entries
+NOISE_TEXTS = {"Toggle navigation", "Ayuda", "Sign out", "Salir", "Usuario", "admin"}
+
+# Driver/session-level failures: every remaining module would fail the same way
+FATAL_ERROR_HINTS = ("chrome not reachable", "disconnected", "invalid session id", "session deleted",
+                     "no such window", "target window already closed", "connection refused", "max retries exceeded")
+
+# Marks unchanged L2 branches as already expanded so MenuExpander leaves them closed.
+# Returns the hash keys (= snapshot labels, same linkText()) of the branches that were found.
+MARK_BRANCHES_JS = LINK_TEXT_JS + r"""
+var root = arguments[0], keys = arguments[1], found = [];
+var lis = root.querySelectorAll('li');
+for (var i = 0; i < lis.length; i++) {
+    var link = null;
+    for (var k = 0; k < lis[i].children.length; k++) { if (lis[i].children[k].tagName === 'A') { link = lis[i].children[k]; break; } }
+    if (!link) continue;
+    var key = linkText(link);
+    if (keys.indexOf(key) === -1 || found.indexOf(key) !== -1) continue;
+    lis[i].setAttribute('data-qa-expanded', '1');
+    found.push(key);
+}
+return found;
+"""
+
 class InventoryCrawler:
-    def __init__(self, driver):
+    def __init__(self, driver, workers=0, sink=None, resume=False, full=False, screens=False, tabs=0, capture="dom", network=None):
         self.driver = driver
-        self.inventory_data = []
+        self.workers = workers
+        # capture="network": menu parsed from the portal's XHR payload, DOM crawl only as fallback
+        self.capture = capture
+        # NetworkMenuCapture already reading the performance log (e.g. shared with the fixture recorder)
+        self.network = network
+        # screens=True: harvest every menu screen after the sidebar crawl (tabs > 0: in K concurrent tabs)
+        self.screens = screens or tabs > 0
+        self.tabs = tabs
+        self.screen_targets = {}
+        self.resume = resume
+        # full=True ignores the run index and re-crawls every subtree
+        self.full = full
+        # Items are streamed to disk as they are parsed (no in-memory inventory list)
+        self.sink = sink or InventorySink()
+        self.checkpoint = CrawlCheckpoint()
+        self.failed_records = []
+        self.index_old = RunIndex()
+        self.index_new = RunIndex()
+        self.hashes = {}
+        # Menu path -> screen URL, so screens are opened with driver.get instead of clicking through the menu
+        self.nav_index = NavIndex()
+        self.crawled = 0
+        self.reused = 0
+        # Captured menu entries with no URL (JS-only navigation) and the paths that have children
+        self._unrouted = {}
+        self._parents = set()
+        self.learned = 0
+        self.started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._evidence_mark = len(evidence_store.entries)
+        # Module key (see module_keys) -> (label, n-th L1 with that label)
+        self._modules = {}
+        # Ordered write buffer: {sidebar position: (module, records, ok)}
+        self._order = {}
+        self._ready = {}
+        self._next = 0
+        # Frames mapped once per page; the sidebar may live in one of them
+        self.frames = FrameTree(driver)
+        self.sidebar_frame = ""
         # Scope: Sidebar
         self.side_menu_selector = (By.CSS_SELECTOR, "aside, .sidebar, #sidebar-menu, #main-menu, .main-sidebar, .page-sidebar") 
 
     def run(self):
-        logger.info("Starting Inventory Capture (Assisted Mode)...")
+        self.nav_index.load()
+        if self.capture == "network":
+            modules = self._capture_network()
+            if modules:
+                return self._finish(modules)
+            logger.warning("Falling back to the DOM crawl.")
+
+        logger.info("Starting Inventory Capture (Auto-Expand Mode)...")
         
         # 1. Ensure Sidebar is there
         sidebar = self._get_sidebar_element()
         if not sidebar:
              logger.error("Sidebar container not verified. Cannot proceed.")
-             return []
-
-        # 2. User Prompt
-        print("\n" + "="*60)
-        print("🖐️  INVENTARIO ASISTIDO  🖐️")
-        print("1. Ve al navegador.")
-        print("2. EXPANDE MANUALMENTE todos los menús que desees incluir (ej. Comercial, Logística).")
-        print("3. Asegúrate de que los submenús sean visibles.")
-        print("4. Cuando estés listo, vuelve aquí.")
-        input("👉 PRESIONA ENTER PARA CAPTURAR...")
-        print("="*60 + "\n")
-
-        # 3. Capture Evidence
+             return 0
+
+        # 2. Resume: keep items of completed subtrees and skip them
+        if self.resume and self.checkpoint.load():
+            self.sink.resume(self.checkpoint.items_written)
+            self._restore_menu_records()
+        else:
+            self.checkpoint.clear()
+
+        modules = self._key_modules(self.list_modules(sidebar))
+        if not modules:
+            logger.error("No L1 modules found in sidebar. Cannot proceed.")
+            return 0
+        self.checkpoint.set_frontier(modules)
+        pending = [m for m in modules if not self.checkpoint.is_done(m)]
+        logger.info(f"Modules (L1): {len(modules)} found, {len(modules) - len(pending)} already captured, {len(pending)} to crawl.")
+
+        # 3. Structural hashes (1 round-trip) vs. previous run: unchanged subtrees are re-emitted from the index
+        self.index_old.load()
+        self.hashes = subtree_hashes(self.driver, sidebar)
+        self._order = {m: i for i, m in enumerate(pending)}
+        self._ready = {}
+        self._next = 0
+
+        to_crawl = []
+        for module in pending:
+            old = self.index_old.get(module)
+            current = self.hashes.get(module)
+            if not self.full and old and current and current[0] and old["hash"] == current[0]:
+                ts = time.time()
+                self._commit_subtree(module, [InventoryRecord.from_dict(d, ts) for d in old["items"]], True)
+                self.reused += 1
+            else:
+                to_crawl.append(module)
+        self.crawled = len(to_crawl)
+        logger.info(f"Incremental crawl: {self.reused} modules unchanged (reused), {self.crawled} to crawl.")
+
+        # 4. Expand + parse each changed subtree (checkpointed after each one)
+        if self.workers:
+            self._crawl_parallel(to_crawl)
+        else:
+            self._crawl_serial(to_crawl)
+        return self._finish(modules)
+
+    def _capture_network(self):
+        """
+        Builds the whole inventory from the menu payload intercepted during login.
+        Returns the L1 modules written, or [] when no payload was found.
+        """
+        with profiler.span("network_capture"):
+            records = (self.network or NetworkMenuCapture(self.driver)).capture()
+        if not records:
+            return []
+
+        # Each L1 row opens a new subtree (two modules may share a label)
+        subtrees = []
+        for record in records:
+            if not subtrees or not (record.menu_level_2 or record.menu_level_3):
+                subtrees.append([])
+            subtrees[-1].append(record)
+        modules = self._key_modules([subtree[0].menu_level_1 for subtree in subtrees])
+        grouped = dict(zip(modules, subtrees))
+
+        self.checkpoint.clear()
+        self.index_old.load()
+        self._order = {m: i for i, m in enumerate(modules)}
+        self._ready = {}
+        self._next = 0
+        for module in modules:
+            self._commit_subtree(module, grouped[module], True)
+        self.crawled = len(modules)
+        return modules
+
+    def _finish(self, modules):
+        # 5. Capture Evidence (before the screen stage navigates away)
         take_screenshot(self.driver, "sidebar_expanded")
-        logger.info("Screenshot captured: outputs/evidence/sidebar_expanded.png")
+        logger.info("Screenshot captured: sidebar_expanded (see outputs/evidence/manifest.jsonl)")
 
-        # 4. Parse DOM
-        self._parse_sidebar_structure(sidebar)
+        # JS-only menu entries: URL learned by clicking once, then taken from the navigation index
+        self._learn_routes()
+
+        # 6. Screen inventory (BFS over the menu screens, deduplicated by DOM structure)
+        if self.screens:
+            targets = list(self.screen_targets.values())
+            exclude = self.side_menu_selector[1]
+            with profiler.span("screens"):
+                if self.tabs:
+                    TabCrawler(self.driver, self.tabs, self.sink, exclude, checkpoint=self.checkpoint).run(targets)
+                else:
+                    ScreenCrawler(self.driver, self.sink, exclude, navigate=self._open_target, checkpoint=self.checkpoint).run(targets)
+
+        # 7. Save Results (+ run index and diff report)
+        with profiler.span("save"):
+            self._save_results()
+            self._save_index(modules)
+            self.nav_index.save()
+        if self.failed_records:
+            # Failed subtrees are not marked done: --resume retries them
+            failed = len({r.menu_level_1 for r in self.failed_records})
+            logger.warning(f"{failed} modules failed. Checkpoint kept: run again with --resume to retry them.")
+        else:
+            self.checkpoint.clear()
+        return self.sink.count
+
+    def _key_modules(self, labels):
+        """
+        Returns the module keys for the L1 labels in sidebar order and remembers which L1 each one is.
+        """
+        keys = module_keys(labels)
+        occurrences = {}
+        for key, label in zip(keys, labels):
+            occurrences[label] = occurrences.get(label, 0) + 1
+            self._modules[key] = (label, occurrences[label])
+        return keys
+
+    def _crawl_serial(self, modules):
+        for module in modules:
+            label, occurrence = self._modules[module]
+            try:
+                with profiler.span(f"module: {module}"):
+                    records = self.capture_module(label, self._reusable_branches(module), occurrence)
+                self._commit_subtree(module, records, True)
+            except Exception as e:
+                logger.error(f"Failed to capture module '{module}': {e}")
+                self._commit_subtree(module, [InventoryRecord(label, menu_level_1=label, status="ERROR", error=str(e))], False)
+                if self._is_fatal(e):
+                    # Stop here: the checkpoint keeps this module and the rest pending for --resume
+                    raise
+
+    def _is_fatal(self, error):
+        """
+        True when the browser is gone or the ERP session expired (redirected to the login page).
+        """
+        if isinstance(error, (InvalidSessionIdException, NoSuchWindowException, ConnectionError)):
+            return True
+        if any(hint in str(error).lower() for hint in FATAL_ERROR_HINTS):
+            return True
+        try:
+            return self.driver.current_url.split("?")[0] == Config.URL_LOGIN
+        except Exception:
+            return True
+
+    def _crawl_parallel(self, modules):
+        """
+        Splits the L1 modules across a pool of headless browsers sharing this session.
+        """
+        if not modules:
+            return
+        logger.info(f"Distributing {len(modules)} L1 modules across {self.workers} workers: {modules}")
+
+        session = SessionStore().snapshot(self.driver)
+        reuse = {m: self._reusable_branches(m) for m in modules}
+        labels = self._modules
+        pool = CrawlWorkerPool(session, lambda driver, module: InventoryCrawler(driver).capture_module(labels[module][0], reuse[module], labels[module][1]),
+                               pool_size=self.workers)
+        with profiler.span("parallel_crawl"):
+            pool.run(modules, on_result=self._commit_subtree)
+
+    def _reusable_branches(self, module):
+        """
+        For a changed module, returns {l2_hash_key: [item dicts]} of the L2 branches whose hash did not change.
+        """
+        old = self.index_old.get(module)
+        current = self.hashes.get(module)
+        if self.full or not old or not current:
+            return {}
+        reuse = {}
+        for branch, branch_hash in current[1].items():
+            if not branch_hash or old.get("branches", {}).get(branch) != branch_hash:
+                continue
+            items = [d for d in old["items"] if normalize_text(d.get("menu_level_2")) == branch]
+            if items:
+                reuse[branch] = items
+        return reuse
+
+    def _commit_subtree(self, module, records, ok):
+        """
+        Subtrees may finish out of order (reused ones immediately, pool workers in any order):
+        they are buffered and written in sidebar order.
+        """
+        self._ready[self._order[module]] = (module, records, ok)
+        while self._next in self._ready:
+            module, records, ok = self._ready.pop(self._next)
+            self._next += 1
+            self._write_subtree(module, records, ok)
+
+    def _write_subtree(self, module, records, ok):
+        """
+        Flushes a finished subtree to disk, then checkpoints it. Failed subtrees are not
+        checkpointed (they are retried on --resume); their ERROR rows are written at the end.
+        """
+        if not ok:
+            self.failed_records.extend(records)
+            return
+        for record in records:
+            if record.status == "CAPTURED":
+                self._index_menu_record(record)
+        self.sink.write_many(records)
+        self.sink.flush()
+        self.checkpoint.mark_done(module, len(records), self.sink.count)
+
+        subtree_hash, branches = self.hashes.get(module, ("", {}))
+        self.index_new.update(module, subtree_hash, branches, [r.to_dict() for r in records])
+
+    def _index_menu_record(self, record):
+        """
+        Navigation index + screen target of a captured menu entry.
+        """
+        path = (record.menu_level_1, record.menu_level_2, record.menu_level_3)
+        if record.url_after_click:
+            self.nav_index.record(path, record.url_after_click)
+        else:
+            # Route learned on a previous run (click fallback) for a JS-only menu entry
+            record.url_after_click = self.nav_index.url_for(path)
+        if record.url_after_click:
+            self.screen_targets.setdefault(record.url_after_click, record)
+        else:
+            self._unrouted[path] = record
+        levels = [p for p in path if p]
+        for n in range(1, len(levels)):
+            self._parents.add(tuple(levels[:n] + [""] * (3 - n)))
+
+    def _learn_routes(self):
+        """
+        Menu leaves without an href (href="#" + onclick, javascript:) are clicked through the sidebar once:
+        the URL reached is recorded in the navigation index (source "click"), so later runs fill their
+        url_after_click and open the screen directly instead of clicking again.
+        """
+        leaves = [(path, record) for path, record in self._unrouted.items() if path not in self._parents]
+        if not leaves or not Config.NAV_LEARN_MAX:
+            return
+        leaves = leaves[:Config.NAV_LEARN_MAX]
+        home = self.driver.current_url
+        logger.info(f"Learning the route of {len(leaves)} menu entries without URL (one click each)...")
+        for path, record in leaves:
+            try:
+                if self.driver.current_url != home:
+                    self.driver.get(home)
+                    Waits.wait_for_network_idle(self.driver)
+                url = self._click_path(path)
+            except Exception as e:
+                logger.warning(f"Could not learn the route of '{' > '.join(p for p in path if p)}': {e}")
+                continue
+            if not url:
+                continue
+            self.nav_index.record(path, url, source="click")
+            record.url_after_click = url
+            self.screen_targets.setdefault(url, record)
+            self.learned += 1
+        logger.info(f"Navigation index: {self.learned}/{len(leaves)} routes learned by clicking.")
+
+    def _restore_menu_records(self):
+        """
+        --resume: subtrees completed before the interruption are not crawled again, so their
+        navigation index entries and screen targets are rebuilt from the menu rows kept in inventory.jsonl.
+        """
+        if not os.path.exists(self.sink.jsonl_path):
+            return
+        with open(self.sink.jsonl_path, "r", encoding="utf-8") as f:
+            for line in f:
+                data = json.loads(line) if line.strip() else {}
+                if data.get("status") == "CAPTURED" and not data.get("action_type"):
+                    self._index_menu_record(InventoryRecord.from_dict(data))
+        logger.info(f"Resume: {len(self.screen_targets)} screen targets rebuilt from the kept items.")
+
+    def _save_index(self, modules):
+        """
+        Saves the run index in sidebar order and writes the diff against the previous run.
+        Modules not captured in this run (failed, or completed before a --resume) keep their old entry.
+        """
+        for module in modules:
+            entry = self.index_new.get(module) or self.index_old.get(module)
+            if entry:
+                self.index_new.modules.pop(module, None)
+                self.index_new.modules[module] = entry
+
+        if self.index_old.modules:
+            old_items = [d for entry in self.index_old.modules.values() for d in entry["items"]]
+            new_items = [d for entry in self.index_new.modules.values() for d in entry["items"]]
+            save_diff_report(diff_inventories(old_items, new_items))
+        self.index_new.save()
+        logger.info(f"Crawl summary: {self.crawled} modules crawled, {self.reused} reused from run index.")
+
+    def _save_results(self):
+        self.sink.write_many(self.failed_records)
+        self.sink.finalize(publish=not Config.INVENTORY_DB)
+        if Config.INVENTORY_DB:
+            evidence_store.flush()
+            # inventory.json / .csv are exported from the history DB; the sink publishes them if that fails
+            run_id = record_run(self.sink.jsonl_path, self.started_at, self.capture, evidence_store.entries[self._evidence_mark:],
+                                json_path=self.sink.json_path, csv_path=self.sink.csv_path)
+            if run_id is None:
+                self.sink.publish()
+            else:
+                self.sink.drop_partial()
 
-        # 5. Save Results
-        save_inventory_json(self.inventory_data, "inventory.json")
-        save_inventory_csv(self.inventory_data, "inventory.csv")
-        
         # Summary
-        l1_count = len(set([i['menu_level_1'] for i in self.inventory_data if i['menu_level_1']]))
-        l2_count = len([i for i in self.inventory_data if i['menu_level_2']])
-        
-        logger.info(f"Inventory Captured. Modules (L1): {l1_count}, Submenus (L2): {l2_count}")
+        logger.info(f"Inventory Captured. Modules (L1): {len(self.sink.modules)}, Submenus (L2): {self.sink.l2_count}")
+        self.nav_index.log_summary()
         logger.info(f"Outputs saved in: {Config.OUTPUT_DIR}")
-        
-        return self.inventory_data
 
     def _get_sidebar_element(self):
+        """
+        Main document first, then every frame (cached frame tree). The driver is left in the sidebar's frame.
+        """
         try:
-            self.driver.switch_to.default_content()
-            elements = self.driver.find_elements(*self.side_menu_selector)
-            for el in elements:
-                if el.is_displayed():
-                    return el
-            return None
+            frame_path, element = self.frames.find_displayed(*self.side_menu_selector)
+            self.sidebar_frame = frame_path or ""
+            return element
         except:
             return None
 
-    def _parse_sidebar_structure(self, sidebar_element):
+    def open_screen(self, path):
         """
-        Parses the visible DOM hierarchy to infer L1/L2/L3 items based on nesting depth.
-        Uses ancestor counting to determine indentation levels.
+        Opens the screen of a menu path (L1, L2, L3): direct driver.get from the navigation index,
+        clicking through the sidebar only when the indexed URL is missing or stale.
+        Returns the URL reached, or None.
         """
-        try:
-            links = sidebar_element.find_elements(By.TAG_NAME, "a")
-            logger.info(f"Scanning {len(links)} potential links in sidebar...")
-            
-            items_raw = []
-            
-            # 1. Collect Valid Items and Measure Depth
-            for link in links:
-                if not link.is_displayed():
-                    continue
-                    
-                text = link.text.strip()
-                # Exclude common noise
-                if not text or text in ["Toggle navigation", "Ayuda", "Sign out", "Salir", "Usuario", "admin"]:
-                    continue
-
-                # Calculate Depth: Number of 'ul' ancestors
-                # This is a robust proxy for menu nesting in bootstrap/standard navs
-                depth = len(link.find_elements(By.XPATH, "./ancestor::ul"))
-                items_raw.append({
-                    "text": text,
-                    "depth": depth
-                })
-
-            if not items_raw:
-                logger.warning("No visible items found in sidebar execution.")
-                return
-
-            # 2. Normalize Depth (Find minimum depth to be Level 1)
-            min_depth = min(item['depth'] for item in items_raw)
-            logger.info(f"Depth analysis: Min Depth = {min_depth} (Level 1)")
-
-            # 3. Build Hierarchy
-            current_l1 = ""
-            current_l2 = ""
-            
-            for item in items_raw:
-                text = item['text']
-                raw_depth = item['depth']
-                
-                # Calculate relative level (1-based)
-                level = raw_depth - min_depth + 1
-                
-                entry = {
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "menu_level_1": "",
-                    "menu_level_2": "",
-                    "menu_level_3": "",
-                    "item_text": text,
-                    "status": "CAPTURED",
-                    "notes": f"Depth {raw_depth} -> Level {level}"
-                }
-                
-                if level == 1:
-                    current_l1 = text
-                    current_l2 = "" # Reset L2 when new L1 starts
-                    entry["menu_level_1"] = text
-                    
-                elif level == 2:
-                    current_l1 = current_l1 if current_l1 else "Unknown"
-                    current_l2 = text
-                    entry["menu_level_1"] = current_l1
-                    entry["menu_level_2"] = text
-                    
-                elif level >= 3:
-                     entry["menu_level_1"] = current_l1
-                     entry["menu_level_2"] = current_l2
-                     entry["menu_level_3"] = text
-                
-                self.inventory_data.append(entry)
-
-        except Exception as e:
-            logger.error(f"Error parsing sidebar structure: {e}")
+        return self.nav_index.navigate(self.driver, path, self._click_path)
+
+    def _open_target(self, target):
+        return self.open_screen((target.menu_level_1, target.menu_level_2, target.menu_level_3))
+
+    def _click_path(self, path):
+        """
+        Fallback navigation: opens each menu level that is still collapsed and clicks the last one.
+        Returns the URL reached, or None when the item isn't found or doesn't change the page URL.
+        """
+        segments = [p for p in path if p]
+        start_url = self.driver.current_url
+        depth = -1
+        for i, text in enumerate(segments):
+            sidebar = self._get_sidebar_element()
+            if not sidebar:
+                return None
+            _, nodes = snapshot_sidebar(self.driver, sidebar)
+            node = next((n for n in nodes if n.text == text and n.depth > depth), None)
+            if not node:
+                logger.warning(f"Menu item '{text}' not found while opening '{' > '.join(segments)}'.")
+                return None
+            depth = node.depth
+
+            last = i == len(segments) - 1
+            if not last and any(n.text == segments[i + 1] and n.depth > depth for n in nodes):
+                continue   # Already expanded: clicking would collapse it
+            mark = Waits.mark_document(self.driver) if last else None
+            SafeActions(self.driver).robust_click(self.driver.find_element(By.CSS_SELECTOR, node.selector))
+            if last:
+                Waits.wait_for_network_idle(self.driver, since=mark)
+            else:
+                Waits.wait_for_dom_quiet(self.driver)
+
+        self.driver.switch_to.default_content()
+        url = self.driver.current_url
+        return url if url != start_url else None
+
+    def list_modules(self, sidebar_element=None):
+        """
+        Returns the visible L1 module names (shallowest links) in sidebar order.
+        """
+        sidebar_element = sidebar_element or self._get_sidebar_element()
+        _, nodes = snapshot_sidebar(self.driver, sidebar_element)
+        nodes = [n for n in nodes if n.text and n.text not in NOISE_TEXTS]
+        if not nodes:
+            return []
+        min_depth = min(n.depth for n in nodes)
+        return [n.text for n in nodes if n.depth == min_depth]
+
+    def capture_module(self, module, reuse_branches=None, occurrence=1):
+        """
+        Expands a single L1 module and returns its InventoryRecords.
+        reuse_branches: {l2: [item dicts]} of unchanged L2 branches, which are left collapsed
+        and spliced back from the previous run.
+        occurrence: which L1 with this label (1 = first in the sidebar), for repeated module names.
+        Raises on driver errors so the caller (serial loop or worker pool) can record/restart.
+        """
+        sidebar = self._get_sidebar_element()
+        if not sidebar:
+            raise RuntimeError("Sidebar container not found")
+
+        _, nodes = snapshot_sidebar(self.driver, sidebar)
+        nodes = [n for n in nodes if n.text and n.text not in NOISE_TEXTS]
+        min_depth = min((n.depth for n in nodes), default=0)
+        matches = [n for n in nodes if n.depth == min_depth and n.text == module]
+        if len(matches) < occurrence:
+            raise RuntimeError(f"Module '{module}' not found in sidebar")
+        target = matches[occurrence - 1]
+
+        # Expand only this module's subtree (its <li> is the expansion root)
+        link = self.driver.find_element(By.CSS_SELECTOR, target.selector)
+        module_root = self.driver.execute_script("return arguments[0].closest('li');", link) or sidebar
+        reuse = {}
+        if reuse_branches:
+            marked = self.driver.execute_script(MARK_BRANCHES_JS, module_root, list(reuse_branches)) or []
+            reuse = {key: reuse_branches[key] for key in marked}
+            logger.info(f"'{module}': {len(reuse)} unchanged L2 branches left collapsed.")
+        MenuExpander(self.driver).expand(module_root)
+
+        total, nodes = snapshot_sidebar(self.driver, module_root)
+        logger.info(f"Scanning {total} potential links in '{module}' ({len(nodes)} visible, 1 round-trip)...")
+        records = []
+        for record in self._build_hierarchy(nodes):
+            if record.menu_level_1 != module:
+                continue
+            if record.menu_level_2 in reuse:
+                if not record.menu_level_3:
+                    records.extend(InventoryRecord.from_dict(d, record.ts) for d in reuse[record.menu_level_2])
+                continue
+            records.append(record)
+        return records
+
+    def _build_hierarchy(self, nodes):
+        """
+        Yields an InventoryRecord (L1/L2/L3) per snapshot node.
+        Uses ancestor 'ul' counts (node.depth) to determine indentation levels.
+        """
+        # 1. Collect Valid Items (exclude common noise)
+        items_raw = [n for n in nodes if n.text and n.text not in NOISE_TEXTS]
+        if not items_raw:
+            return
+
+        # 2. Normalize Depth (Find minimum depth to be Level 1)
+        min_depth = min(item.depth for item in items_raw)
+        logger.info(f"Depth analysis: Min Depth = {min_depth} (Level 1)")
+
+        # 3. Build Hierarchy
+        current_l1 = ""
+        current_l2 = ""
+        ts = time.time()
+
+        for item in items_raw:
+            text = item.text
+            raw_depth = item.depth
+
+            # Calculate relative level (1-based)
+            level = raw_depth - min_depth + 1
+
+            record = InventoryRecord(text, status="CAPTURED", notes=f"Depth {raw_depth} -> Level {level}", ts=ts,
+                                     url_after_click=item.href, frame_path=self.sidebar_frame)
+
+            if level == 1:
+                current_l1 = text
+                current_l2 = "" # Reset L2 when new L1 starts
+                record.menu_level_1 = text
+
+            elif level == 2:
+                current_l1 = current_l1 if current_l1 else "Unknown"
+                current_l2 = text
+                record.menu_level_1 = current_l1
+                record.menu_level_2 = text
+
+            elif level >= 3:
+                record.menu_level_1 = current_l1
+                record.menu_level_2 = current_l2
+                record.menu_level_3 = text
+
+            yield record
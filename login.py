@@ -2,19 +2,32 @@ from selenium.webdriver.common.by import By
 from config import Config
 from utils.logger import logger
 from utils.safe_actions import SafeActions
+from utils.session_store import SessionStore
+from utils.waits import Waits
 from selenium.webdriver.support.ui import Select
-import time
 from utils.helpers import take_screenshot
 
+# True while the login button is rendered and visible (the session did not survive)
+LOGIN_FORM_VISIBLE_JS = r"""
+var btn = document.querySelector('#btn_access');
+return !!(btn && (btn.offsetWidth || btn.offsetHeight || btn.getClientRects().length));
+"""
+
 class LoginFlow:
-    def __init__(self, driver):
+    def __init__(self, driver, session_store=None):
         self.driver = driver
         self.actions = SafeActions(driver)
+        self.session_store = session_store or SessionStore()
 
     def login(self):
         """
         Executes the login flow with manual CAPTCHA resolution.
+        A cached session is tried first; the interactive flow is the fallback.
         """
+        # 0. Reuse cached session (no CAPTCHA)
+        if self.restore_session():
+            return True
+
         logger.info("Navigate to login page...")
         self.driver.get(Config.URL_LOGIN)
         
@@ -55,7 +68,42 @@ class LoginFlow:
              return False
         
         # 4. Validate Login
-        return self._validate_login_success()
+        if not self._validate_login_success():
+            return False
+
+        # 5. Cache session for the next runs
+        self.session_store.save(self.driver)
+        return True
+
+    def restore_session(self):
+        """
+        Restores the cached session and checks it cheaply (URL + login button absence, no waits).
+        Invalidates the cache if the server no longer accepts it.
+        """
+        if not self.session_store.restore(self.driver):
+            return False
+
+        if self._is_session_active():
+            logger.info(f"Login skipped: cached session is valid. Current URL: {self.driver.current_url}")
+            return True
+
+        logger.warning("Cached session rejected by server. Falling back to interactive login.")
+        self.session_store.invalidate()
+        try:
+            self.driver.delete_all_cookies()
+        except Exception:
+            pass
+        return False
+
+    def _is_session_active(self):
+        try:
+            if self.driver.current_url.split("?")[0] == Config.URL_LOGIN:
+                return False
+            # One script call: find_elements would block for the implicit wait when the form is gone
+            return not self.driver.execute_script(LOGIN_FORM_VISIBLE_JS)
+        except Exception as e:
+            logger.debug(f"Session check failed: {e}")
+            return False
 
     def _validate_login_success(self):
         """
@@ -94,8 +142,8 @@ class LoginFlow:
         KEYWORDS = ["DIVISION TI", "OFI. LIMA"]
         
         try:
-            # Give time for Dashboard/Combos to load after login
-            time.sleep(3)
+            # Wait for Dashboard/Combos to load after login (was a fixed 3s sleep)
+            Waits.wait_for_network_idle(self.driver, baseline=3)
             
             # Strategy 1: Find standard <select> elements
             selects = self.driver.find_elements(By.TAG_NAME, "select")
@@ -131,9 +179,10 @@ class LoginFlow:
                             return True
                             
                         # Select it
+                        mark = Waits.mark_document(self.driver)
                         dropdown.select_by_visible_text(found_option.text)
                         logger.info("Selected Sucursal. Waiting for page reload...")
-                        time.sleep(3) # Wait for potential refresh
+                        Waits.wait_for_network_idle(self.driver, baseline=3, since=mark) # Wait for potential refresh
                         
                         # Verify
                         if found_option.is_selected():
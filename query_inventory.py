@@ -0,0 +1,84 @@
+import os
+import json
+import time
+import argparse
+from config import Config
+from utils.inventory_db import InventoryDB
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query the inventory history (outputs/inventory.db)")
+    parser.add_argument("--db", default=None, help="Database file (default: outputs/inventory.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runs = commands.add_parser("runs", help="List the last runs")
+    runs.add_argument("--last", type=int, default=10)
+
+    items = commands.add_parser("items", help="Menu items of a run, e.g. items --l1 Logística --level 3")
+    items.add_argument("--run", type=int, default=None, help="Run id (default: latest)")
+    items.add_argument("--l1")
+    items.add_argument("--l2")
+    items.add_argument("--level", type=int, choices=(1, 2, 3))
+
+    changes = commands.add_parser("changes", help="Screens whose elements changed in the last N runs")
+    changes.add_argument("--last", type=int, default=10)
+
+    search = commands.add_parser("search", help="Menu items and screen elements containing a text")
+    search.add_argument("text")
+    search.add_argument("--last", type=int, default=1, help="Runs to search (default: latest only)")
+
+    export = commands.add_parser("export", help="Write inventory.json / inventory.csv of a run")
+    export.add_argument("--run", type=int, default=None, help="Run id (default: latest)")
+    export.add_argument("--json", dest="json_path")
+    export.add_argument("--csv", dest="csv_path")
+
+    load = commands.add_parser("import", help="Add an existing inventory.json/.jsonl to the history")
+    load.add_argument("path")
+    args = parser.parse_args()
+    if args.command == "export" and not (args.json_path or args.csv_path):
+        export.error("give --json PATH and/or --csv PATH")
+    return args
+
+def print_rows(rows, columns):
+    print(" | ".join(columns))
+    for row in rows:
+        print(" | ".join(str(row[c]) if row[c] is not None else "" for c in range(len(columns))))
+
+def main():
+    args = parse_args()
+    path = args.db or Config.INVENTORY_DB_FILE
+    if args.command != "import" and not os.path.exists(path):
+        print(f"No inventory history at {path} (run run_inventory.py first).")
+        return
+
+    started = time.perf_counter()
+    with InventoryDB(path) as db:
+        if args.command == "runs":
+            rows = db.runs(args.last)
+            print_rows([[r["id"], r["started_at"], r["capture"], r["items"], r["modules"], r["submenus"], r["elements"]] for r in rows],
+                       ["run", "started_at", "capture", "items", "L1", "L2", "elements"])
+        elif args.command == "items":
+            rows = db.items(args.run, args.l1, args.l2, args.level)
+            print_rows([[r["menu_level_1"], r["menu_level_2"], r["menu_level_3"], r["status"], r["url_after_click"]] for r in rows],
+                       ["L1", "L2", "L3", "status", "url"])
+        elif args.command == "changes":
+            rows = db.changed_screens(args.last)
+            print_rows(rows, ["run", "url", "menu path", "previous run", "elements before", "elements now"])
+        elif args.command == "search":
+            rows = db.search(args.text, args.last)
+            print_rows(rows, ["run", "menu path", "text", "type", "url"])
+        elif args.command == "export":
+            rows = []
+            count = db.export(args.run, args.json_path, args.csv_path)
+            print(f"{count} items exported.")
+        else:
+            if args.path.endswith(".jsonl"):
+                run_id = db.add_run_from_jsonl(args.path, output_dir=os.path.dirname(os.path.abspath(args.path)))
+            else:
+                with open(args.path, "r", encoding="utf-8") as f:
+                    run_id = db.add_run(json.load(f), output_dir=os.path.dirname(os.path.abspath(args.path)))
+            rows = []
+            print(f"Imported as run #{run_id}.")
+    print(f"({len(rows)} rows, {(time.perf_counter() - started) * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
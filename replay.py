@@ -0,0 +1,236 @@
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+from contextlib import contextmanager
+from config import Config
+from inventory import InventoryCrawler
+from utils.logger import logger
+from utils.waits import Waits
+from utils.driver_factory import DriverFactory
+from utils.evidence_store import evidence_store
+from utils.throttle import throttle
+from utils.fixtures import FixtureServer, MANIFEST_FILE, build_synthetic_fixture
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline crawler runs against recorded (run_inventory.py --record) or synthetic fixtures")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Crawl one fixture headless (outputs in outputs/replay/<fixture>)")
+    run.add_argument("fixture", help="Fixture folder, or the name of a recording in outputs/fixtures")
+    run.add_argument("--workers", type=int, default=0, metavar="N")
+    run.add_argument("--screens", action="store_true")
+    run.add_argument("--tabs", type=int, default=0, metavar="K")
+    run.add_argument("--capture", choices=("dom", "network"), default="dom")
+
+    bench = commands.add_parser("bench", help="Time crawls over synthetic fixtures of increasing size (+ recorded ones)")
+    bench.add_argument("fixtures", nargs="*", help="Recorded fixtures to include")
+    bench.add_argument("--sizes", default="2,8,32", help="L1 modules of each synthetic fixture (16 menu items per module)")
+    bench.add_argument("--screens", action="store_true")
+    bench.add_argument("--capture", choices=("dom", "network"), default="dom")
+
+    pool = commands.add_parser("pool", help="Check serial crawl vs worker pool (also with a killed worker) on a synthetic portal: same rows, same order, no errors")
+    pool.add_argument("--modules", type=int, default=16)
+    pool.add_argument("--workers", type=int, default=4)
+
+    routes = commands.add_parser("routes", help="Check that JS-only menu entries (href=\"#\" + onclick) are learned by clicking once, then reused")
+    routes.add_argument("--modules", type=int, default=4)
+    routes.add_argument("--js-items", type=int, default=2, help="onclick leaves per submenu")
+
+    synth = commands.add_parser("synth", help="Write a synthetic fixture")
+    synth.add_argument("path")
+    synth.add_argument("--modules", type=int, default=8)
+    synth.add_argument("--submenus", type=int, default=3)
+    synth.add_argument("--items", type=int, default=4)
+    return parser.parse_args()
+
+def resolve_fixture(fixture):
+    return fixture if os.path.isdir(fixture) else os.path.join(Config.FIXTURES_DIR, fixture)
+
+def replay(driver, fixture, workers=0, screens=False, tabs=0, capture="dom", port=0):
+    """
+    Serves the fixture locally and runs InventoryCrawler against it. Returns (crawler, seconds).
+    port: fixed port, for runs that must find the URLs recorded by a previous run (navigation index).
+    """
+    Config.use_output_dir(os.path.join(Config.REPLAY_DIR, os.path.basename(os.path.normpath(fixture))))
+    with FixtureServer(fixture, port) as server:
+        # Session injection (worker pool) starts from URL_LOGIN: it must point at the replay server, never the ERP
+        Config.URL_LOGIN = server.entry_url
+        started = time.perf_counter()
+        driver.get(server.entry_url)
+        Waits.wait_for_network_idle(driver)
+        crawler = InventoryCrawler(driver, workers=workers, full=True, screens=screens, tabs=tabs, capture=capture)
+        crawler.run()
+        evidence_store.flush()
+        return crawler, time.perf_counter() - started
+
+def benchmark_replay(sizes, fixtures=(), screens=False, capture="dom"):
+    """
+    One headless browser for every crawl, so only the crawl itself is timed.
+    """
+    results = []
+    driver = throttle.attach(DriverFactory().create(headless=True, performance_log=capture == "network"))
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = []
+            for size in sizes:
+                path = os.path.join(tmp, f"synthetic_{size}")
+                runs.append((path, build_synthetic_fixture(path, size)))
+            for fixture in fixtures:
+                runs.append((resolve_fixture(fixture), "-"))
+
+            for path, items in runs:
+                crawler, seconds = replay(driver, path, screens=screens, capture=capture)
+                results.append((os.path.basename(os.path.normpath(path)), items, crawler.sink.count, seconds))
+    finally:
+        throttle.log_summary()
+        evidence_store.close()
+        driver.quit()
+
+    print(f"{'Fixture':<24} {'Items':>6} {'Rows':>6} {'Seconds':>8} {'Rows/s':>8}")
+    for name, items, rows, seconds in results:
+        print(f"{name:<24} {items:>6} {rows:>6} {seconds:>8.2f} {rows / seconds if seconds else 0:>8.1f}")
+    return results
+
+def read_rows():
+    """
+    Menu path and status of every row of the last run, in output order (timestamps left out).
+    """
+    with open(os.path.join(Config.OUTPUT_DIR, "inventory.jsonl"), "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(r["menu_level_1"], r["menu_level_2"], r["menu_level_3"], r["status"]) for r in rows]
+
+def check_pool(modules=16, workers=4):
+    """
+    Crawls the same synthetic portal serially, with the worker pool (cookies of the main browser
+    injected into each worker), and with the pool again while one worker's browser is killed in
+    the middle of a module. Every pool run must produce the serial rows, in the same order, with
+    no ERROR row (the killed worker is restarted and the module retried). Returns True when all hold.
+    """
+    results = []
+    driver = throttle.attach(DriverFactory().create(headless=True))
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"synthetic_{modules}")
+            items = build_synthetic_fixture(path, modules)
+            for label, count, crash in (("serial", 0, None), (f"{workers}", workers, None), (f"{workers}+kill", workers, "Modulo 2")):
+                with _browser_killed_once(crash) as killed:
+                    _, seconds = replay(driver, path, workers=count)
+                results.append((label, read_rows(), seconds, len(killed)))
+    finally:
+        throttle.log_summary()
+        evidence_store.close()
+        driver.quit()
+
+    reference = results[0][1]
+    ok = len(reference) == items
+    print(f"{modules} modules, {items} menu items")
+    print(f"{'Workers':>8} {'Rows':>6} {'Errors':>7} {'Killed':>7} {'Seconds':>8} {'Same rows':>10}")
+    for label, rows, seconds, killed in results:
+        errors = sum(1 for r in rows if r[3] == "ERROR")
+        same = rows == reference
+        ok = ok and same and not errors
+        print(f"{label:>8} {len(rows):>6} {errors:>7} {killed:>7} {seconds:>8.2f} {str(same):>10}")
+    ok = ok and results[-1][3] == 1
+    print("OK" if ok else "FAILED: pool rows differ from the serial crawl, or errors were written")
+    return ok
+
+@contextmanager
+def _browser_killed_once(module):
+    """
+    While active, the first capture of `module` quits its own browser first (a crashed worker).
+    Yields the list of modules killed so far.
+    """
+    killed = []
+    if module is None:
+        yield killed
+        return
+    capture_module = InventoryCrawler.capture_module
+
+    def crashing(crawler, label, *args, **kwargs):
+        if label == module and not killed:
+            killed.append(label)
+            crawler.driver.quit()
+        return capture_module(crawler, label, *args, **kwargs)
+
+    InventoryCrawler.capture_module = crashing
+    try:
+        yield killed
+    finally:
+        InventoryCrawler.capture_module = capture_module
+
+def check_routes(modules=4, js_items=2):
+    """
+    Two crawls of a synthetic portal whose last js_items leaves per submenu only navigate from an
+    onclick handler. The first must learn every such route by clicking (navigation index, source
+    "click"); the second must click nothing and write the learned URLs as url_after_click.
+    Returns True when both hold.
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    driver = throttle.attach(DriverFactory().create(headless=True))
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "js_routes")
+            build_synthetic_fixture(path, modules, js_items=js_items)
+            shutil.rmtree(os.path.join(Config.REPLAY_DIR, "js_routes"), ignore_errors=True)
+            runs = []
+            for _ in range(2):
+                crawler, seconds = replay(driver, path, port=port)
+                with open(crawler.sink.jsonl_path, "r", encoding="utf-8") as f:
+                    rows = [json.loads(line) for line in f if line.strip()]
+                routed = sum(1 for r in rows if r["menu_level_3"] and r.get("url_after_click"))
+                runs.append((crawler.learned, routed, crawler.sink.count, seconds))
+    finally:
+        throttle.log_summary()
+        evidence_store.close()
+        driver.quit()
+
+    expected = modules * 3 * js_items
+    leaves = modules * 3 * 4
+    print(f"{modules} modules, {leaves} leaves, {expected} with onclick navigation only")
+    print(f"{'Run':>4} {'Learned':>8} {'Leaves with URL':>16} {'Rows':>6} {'Seconds':>8}")
+    for i, (learned, routed, rows, seconds) in enumerate(runs, 1):
+        print(f"{i:>4} {learned:>8} {routed:>16} {rows:>6} {seconds:>8.2f}")
+    (learned_1, routed_1, _, _), (learned_2, routed_2, _, _) = runs
+    ok = learned_1 == expected and routed_1 == leaves - expected and learned_2 == 0 and routed_2 == leaves
+    print("OK" if ok else "FAILED: routes not learned on run 1 or not reused on run 2")
+    return ok
+
+def main():
+    args = parse_args()
+    if args.command == "synth":
+        items = build_synthetic_fixture(args.path, args.modules, args.submenus, args.items)
+        print(f"Synthetic fixture written to {args.path}: {items} menu items.")
+        return
+    if args.command == "pool":
+        sys.exit(0 if check_pool(args.modules, args.workers) else 1)
+    if args.command == "routes":
+        sys.exit(0 if check_routes(args.modules, args.js_items) else 1)
+    if args.command == "bench":
+        benchmark_replay([int(s) for s in args.sizes.split(",") if s.strip()], args.fixtures, args.screens, args.capture)
+        return
+
+    fixture = resolve_fixture(args.fixture)
+    if not os.path.exists(os.path.join(fixture, MANIFEST_FILE)):
+        logger.error(f"No fixture found at {fixture} (record one with run_inventory.py --record NAME).")
+        return
+    with open(os.path.join(fixture, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        logger.info(f"Fixture recorded at {json.load(f).get('recorded_at', '?')}.")
+
+    driver = throttle.attach(DriverFactory().create(headless=True, performance_log=args.capture == "network"))
+    try:
+        crawler, seconds = replay(driver, fixture, args.workers, args.screens, args.tabs, args.capture)
+        logger.info(f"Replay finished: {crawler.sink.count} rows in {seconds:.1f}s. Outputs in {Config.OUTPUT_DIR}")
+    finally:
+        throttle.log_summary()
+        evidence_store.close()
+        driver.quit()
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,84 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
+import os
+import argparse
 from config import Config
 from login import LoginFlow
 from inventory import InventoryCrawler
 from utils.logger import logger
+from utils.session_store import SessionStore
+from utils.waits import Waits
+from utils.safe_actions import SafeActions
+from utils.profiler import profiler
+from utils.driver_factory import DriverFactory
+from utils.evidence_store import evidence_store
+from utils.network_capture import NetworkMenuCapture
+from utils.fixtures import FixtureRecorder
+from utils.throttle import throttle
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Integrens ERP navigation inventory")
+    parser.add_argument("--reset-session", action="store_true", help="Discard the cached login session and force the interactive login")
+    parser.add_argument("--workers", type=int, default=0, metavar="N", help="Crawl L1 modules in parallel with N headless browsers (0 = serial)")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted crawl from outputs/crawl_checkpoint.json")
+    parser.add_argument("--full", action="store_true", help="Re-crawl every subtree even if its content hash is unchanged")
+    parser.add_argument("--screens", action="store_true", help="After the menu crawl, visit every screen (BFS) and inventory its buttons, inputs, combos and grids")
+    parser.add_argument("--tabs", type=int, default=0, metavar="K", help="Harvest the screens in K concurrent tabs of the logged-in browser (implies --screens)")
+    parser.add_argument("--capture", choices=("dom", "network"), default="dom", help="Read the menu from the sidebar DOM or from the portal's menu XHR payload (falls back to the DOM)")
+    parser.add_argument("--record", metavar="NAME", help="Record the post-login page, its frames and menu payloads as an offline fixture (outputs/fixtures/NAME, see replay.py)")
+    parser.add_argument("--headless", action="store_true", help="Run Chrome headless with the tuned crawl profile (requires a cached session)")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    Config.ensure_dirs()
     logger.info("Initializing Integrens Test Automation...")
+
+    if Config.CLICK_MEMORY_PERSIST:
+        SafeActions.load_memory()
+
+    session_store = SessionStore()
+    if args.reset_session:
+        session_store.invalidate()
+    if args.headless and not session_store.load():
+        logger.error("Headless mode needs a valid cached session (the CAPTCHA can't be solved without a visible browser). Run once without --headless.")
+        return
     
-    # Setup Driver
-    try:
-        driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()))
-        driver.maximize_window()
-        driver.implicitly_wait(Config.Config.WAIT_TIMEOUT if hasattr(Config, 'WAIT_TIMEOUT') else 5)
-    except  Exception as e:
-         # Fallback for manual path or newer selenium versions
-        logger.warning(f"Webdriver manager failed, trying default: {e}")
-        driver = webdriver.Chrome()
-        driver.maximize_window()
+    # Setup Driver (cached chromedriver path, Selenium Manager as fallback)
+    performance_log = args.capture == "network" or bool(args.record)
+    driver = DriverFactory().create(headless=args.headless, performance_log=performance_log)
+    network = NetworkMenuCapture(driver) if performance_log else None
+
+    profiler.attach(driver)
+    throttle.attach(driver)   # Outermost: queueing time is not counted as command latency
 
     try:
         # 1. Login
-        login_flow = LoginFlow(driver)
-        if not login_flow.login():
+        login_flow = LoginFlow(driver, session_store)
+        with profiler.span("login"):
+            logged_in = login_flow.login()
+        if not logged_in:
             logger.error("Login failed or aborted. Exiting.")
             return
+        if args.record:
+            with profiler.span("record"):
+                FixtureRecorder(driver, os.path.join(Config.FIXTURES_DIR, args.record), network).record()
         # 2. Inventory
-        crawler = InventoryCrawler(driver)
-        crawler.run()
+        crawler = InventoryCrawler(driver, workers=args.workers, resume=args.resume, full=args.full, screens=args.screens, tabs=args.tabs,
+                                   capture=args.capture, network=network)
+        with profiler.span("inventory"):
+            crawler.run()
         
     except Exception as e:
         logger.critical(f"Critical execution error: {e}")
+        logger.info("Progress was checkpointed. Run again with --resume to continue where the crawl stopped.")
     finally:
+        Waits.log_summary()
+        SafeActions.log_summary()
+        throttle.log_summary()
+        evidence_store.close()
+        evidence_store.log_summary()
+        if Config.CLICK_MEMORY_PERSIST:
+            SafeActions.save_memory()
+        profiler.save_report()
         logger.info("Closing driver...")
         driver.quit()
         print("\n\nExecution Finished. Check outputs/ directory for results.")
@@ -0,0 +1,91 @@
+import os
+import json
+import time
+from config import Config
+from utils.logger import logger
+
+
+class CrawlCheckpoint:
+    """
+    Persists crawl progress so an interrupted run can be resumed with --resume.
+    - completed: L1 subtrees fully captured and flushed to the sink (with their item counts)
+    - frontier: L1 subtrees still pending, in crawl order
+    - items_written: sink items that belong to completed subtrees (anything after is discarded on resume)
+    - screens: screen stage BFS state (ScreenFrontier.state()) after the last screen flushed to the sink
+    """
+
+    def __init__(self, path=None):
+        self.path = path or Config.CHECKPOINT_FILE
+        self.state = self._empty_state()
+
+    @staticmethod
+    def _empty_state():
+        return {"started_at": time.strftime("%Y-%m-%d %H:%M:%S"), "updated_at": "", "completed": {}, "frontier": [], "items_written": 0, "screens": None}
+
+    def load(self):
+        """
+        Loads a previous checkpoint. Returns True if there is progress to resume.
+        """
+        if not os.path.exists(self.path):
+            logger.info("No checkpoint found. Starting a full crawl.")
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+            logger.info(f"Checkpoint loaded: {len(self.state['completed'])} subtrees done, "
+                        f"{len(self.state['frontier'])} pending, {self.state['items_written']} items kept.")
+            return True
+        except Exception as e:
+            logger.warning(f"Checkpoint unreadable, starting over: {e}")
+            self.state = self._empty_state()
+            return False
+
+    def is_done(self, path):
+        return path in self.state["completed"]
+
+    @property
+    def items_written(self):
+        return self.state["items_written"]
+
+    @property
+    def screens(self):
+        return self.state.get("screens")
+
+    def mark_screens(self, frontier_state, items_written):
+        """
+        Call only after the rows of the screens visited so far were flushed to disk.
+        """
+        self.state["screens"] = frontier_state
+        self.state["items_written"] = items_written
+        self.save()
+
+    def set_frontier(self, paths):
+        self.state["frontier"] = [p for p in paths if not self.is_done(p)]
+        self.save()
+
+    def mark_done(self, path, items, items_written):
+        """
+        Call only after the subtree's items were flushed to disk.
+        """
+        self.state["completed"][path] = {"items": items, "at": time.strftime("%Y-%m-%d %H:%M:%S")}
+        self.state["frontier"] = [p for p in self.state["frontier"] if p != path]
+        self.state["items_written"] = items_written
+        self.save()
+
+    def save(self):
+        self.state["updated_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save checkpoint: {e}")
+
+    def clear(self):
+        """
+        Removes the checkpoint after a complete run.
+        """
+        self.state = self._empty_state()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,149 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import subprocess
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from config import Config
+from utils.logger import logger
+
+
+def detect_chrome_version():
+    """
+    Reads the installed Chrome version locally (registry / --version), without any network lookup.
+    """
+    if sys.platform.startswith("win"):
+        try:
+            import winreg
+            for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+                try:
+                    with winreg.OpenKey(hive, r"Software\Google\Chrome\BLBeacon") as key:
+                        return winreg.QueryValueEx(key, "version")[0]
+                except OSError:
+                    continue
+        except ImportError:
+            pass
+        return None
+
+    candidates = ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"] if sys.platform == "darwin" else []
+    candidates += [shutil.which(name) for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")]
+    for binary in filter(None, candidates):
+        try:
+            output = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=5).stdout
+            match = re.search(r"(\d+\.\d+\.\d+\.\d+)", output)
+            if match:
+                return match.group(1)
+        except Exception:
+            continue
+    return None
+
+
+class DriverFactory:
+    """
+    Creates Chrome drivers with an offline-first chromedriver cache keyed by Chrome major version.
+    webdriver-manager is only consulted when the cache misses (new Chrome version or missing file);
+    Selenium Manager (webdriver.Chrome() without a service path) is the last fallback.
+    """
+
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file or Config.DRIVER_CACHE_FILE
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_cache(self, cache):
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2)
+        except Exception as e:
+            logger.warning(f"Could not save chromedriver cache: {e}")
+
+    def resolve_driver_path(self, use_cache=True):
+        """
+        Returns (path, source) where source is 'cache', 'webdriver-manager' or 'selenium-manager' (path None).
+        Paths are only cached when the Chrome version is known (an "unknown" key would never be invalidated).
+        """
+        version = detect_chrome_version()
+        major = version.split(".")[0] if version else None
+        cache = self._load_cache()
+
+        cached = cache.get(major) if major else None
+        if use_cache and cached and os.path.exists(cached.get("path", "")):
+            return cached["path"], "cache"
+
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+            if major:
+                cache[major] = {"path": path, "chrome_version": version, "resolved_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+                self._save_cache(cache)
+            return path, "webdriver-manager"
+        except Exception as e:
+            logger.warning(f"Webdriver manager failed, using Selenium Manager: {e}")
+            return None, "selenium-manager"
+
+    def _forget(self, path):
+        cache = self._load_cache()
+        stale = [major for major, entry in cache.items() if entry.get("path") == path]
+        for major in stale:
+            del cache[major]
+        if stale:
+            self._save_cache(cache)
+
+    @staticmethod
+    def build_options(headless=False, performance_log=False):
+        options = webdriver.ChromeOptions()
+        if performance_log:
+            # Network events in driver.get_log("performance"), used by the network capture mode
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        if headless:
+            # Tuned crawl profile: no UI, no images, no extensions, fixed viewport
+            width, height = Config.HEADLESS_WINDOW_SIZE
+            options.add_argument("--headless=new")
+            options.add_argument(f"--window-size={width},{height}")
+            options.add_argument("--disable-gpu")
+            options.add_argument("--disable-extensions")
+            options.add_argument("--disable-dev-shm-usage")
+            options.add_argument("--disable-background-networking")
+            options.add_argument("--no-first-run")
+            options.add_argument("--no-default-browser-check")
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        return options
+
+    def create(self, headless=False, implicit_wait=None, performance_log=False):
+        started = time.perf_counter()
+        path, source = self.resolve_driver_path()
+        resolved = time.perf_counter()
+
+        options = self.build_options(headless, performance_log)
+        driver = None
+        while driver is None:
+            try:
+                driver = webdriver.Chrome(service=ChromeService(path), options=options) if path else webdriver.Chrome(options=options)
+            except Exception as e:
+                if not path:
+                    raise   # Selenium Manager was the last fallback
+                logger.warning(f"Chrome failed to start with the {source} chromedriver ({path}): {e}")
+                if source == "cache":
+                    # Stale entry (e.g. Chrome updated): drop it and resolve again
+                    self._forget(path)
+                    path, source = self.resolve_driver_path(use_cache=False)
+                else:
+                    path, source = None, "selenium-manager"
+
+        if not headless:
+            driver.maximize_window()
+        driver.implicitly_wait(Config.IMPLICIT_WAIT if implicit_wait is None else implicit_wait)
+
+        total = time.perf_counter() - started
+        logger.info(f"Chrome started in {total:.2f}s (driver resolve {resolved - started:.2f}s via {source}, headless={headless})")
+        return driver
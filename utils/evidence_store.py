@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import queue
+import base64
+import atexit
+import hashlib
+import threading
+from config import Config
+from utils.logger import logger
+
+# Page-coordinate box of an element (scrolled into view first), for a clipped CDP capture
+ELEMENT_CLIP_JS = r"""
+var el = arguments[0];
+el.scrollIntoView({block: 'center'});
+var r = el.getBoundingClientRect();
+return [r.left + window.scrollX, r.top + window.scrollY, r.width, r.height];
+"""
+
+
+class EvidenceStore:
+    """
+    Content-addressed screenshot store. The crawl thread only grabs the PNG bytes from the driver;
+    decoding, hashing and the disk write happen on a background thread. Files are named by
+    SHA-256 (evidence/<sha256>.png), so identical screens are stored once, and every capture is
+    appended to evidence/manifest.jsonl (name -> file) so each reference is kept.
+    """
+
+    def __init__(self, evidence_dir=None):
+        self._evidence_dir = evidence_dir
+        self.stats = {"captures": 0, "duplicates": 0, "bytes_written": 0, "bytes_skipped": 0, "stall_seconds": 0.0}
+        # Manifest entries stored by this process (the run history keeps them per run)
+        self.entries = []
+        self._queue = queue.Queue()
+        self._known = None
+        self._known_dir = None
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    @property
+    def evidence_dir(self):
+        # Resolved on use, so Config.use_output_dir (replay runs) moves the evidence too
+        return self._evidence_dir or Config.EVIDENCE_DIR
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.evidence_dir, "manifest.jsonl")
+
+    def capture(self, driver, name, element=None):
+        """
+        Queues a screenshot of the viewport, or only of the element (clipped capture via CDP).
+        Returns the evidence reference (name + timestamp) recorded in the manifest.
+        """
+        started = time.perf_counter()
+        reference = f"{name}_{time.strftime('%Y%m%d_%H%M%S')}"
+        try:
+            if element is not None:
+                x, y, width, height = driver.execute_script(ELEMENT_CLIP_JS, element)
+                clip = {"x": x, "y": y, "width": max(width, 1), "height": max(height, 1), "scale": 1}
+                result = driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "png", "clip": clip, "captureBeyondViewport": True})
+                payload = result["data"]
+            else:
+                payload = driver.get_screenshot_as_base64()
+        except Exception as e:
+            logger.error(f"Failed to take screenshot '{name}': {e}")
+            return None
+        finally:
+            self.stats["stall_seconds"] += time.perf_counter() - started
+
+        self._start()
+        self._queue.put((reference, payload, element is not None))
+        return reference
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="evidence-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._store(*item)
+            except Exception as e:
+                logger.error(f"Failed to store evidence '{item[0]}': {e}")
+            finally:
+                self._queue.task_done()
+
+    def _store(self, reference, payload, clipped):
+        data = base64.b64decode(payload)
+        digest = hashlib.sha256(data).hexdigest()
+        filename = f"{digest}.png"
+        path = os.path.join(self.evidence_dir, filename)
+
+        if self._known is None or self._known_dir != self.evidence_dir:
+            Config.ensure_dirs()
+            os.makedirs(self.evidence_dir, exist_ok=True)
+            self._known_dir = self.evidence_dir
+            self._known = {f[:-4] for f in os.listdir(self.evidence_dir) if f.endswith(".png")}
+
+        duplicate = digest in self._known
+        if duplicate:
+            self.stats["duplicates"] += 1
+            self.stats["bytes_skipped"] += len(data)
+        else:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._known.add(digest)
+            self.stats["bytes_written"] += len(data)
+        self.stats["captures"] += 1
+
+        entry = {"name": reference, "file": filename, "sha256": digest, "bytes": len(data), "duplicate": duplicate,
+                 "clipped": clipped, "captured_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.entries.append(entry)
+        logger.info(f"Screenshot saved: {path}" + (" (duplicate, not rewritten)" if duplicate else ""))
+
+    def flush(self):
+        """
+        Blocks until every queued screenshot is on disk.
+        """
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        if self._thread is None:
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def log_summary(self):
+        s = self.stats
+        if not s["captures"]:
+            return
+        logger.info(f"Evidence: {s['captures']} screenshots, {s['duplicates']} duplicates "
+                    f"({s['bytes_skipped'] / 1024:.0f} KB not written), {s['bytes_written'] / 1024:.0f} KB written, "
+                    f"crawl stalled {s['stall_seconds']:.2f}s on captures.")
+
+
+# Single store for the run (take_screenshot goes through it)
+evidence_store = EvidenceStore()
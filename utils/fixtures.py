@@ -0,0 +1,289 @@
+import os
+import re
+import json
+import html
+import time
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlparse
+from utils.logger import logger
+from utils.frame_tree import FrameTree
+
+# Serializes the current document for offline replay: scripts removed, same-origin stylesheets
+# inlined, same-origin links made relative (replay must never reach the live server), crawler
+# markers stripped. Each iframe src becomes "qa-frame:<label>" (FRAME_LIST_JS labels); the recorder
+# replaces it with the file of that frame.
+SNAPSHOT_HTML_JS = r"""
+var clone = document.documentElement.cloneNode(true);
+var live = document.querySelectorAll('iframe, frame'), copies = clone.querySelectorAll('iframe, frame');
+for (var i = 0; i < live.length && i < copies.length; i++) {
+    var el = live[i], index = -1;
+    for (var k = 0; k < window.frames.length; k++) { if (window.frames[k] === el.contentWindow) { index = k; break; } }
+    var tag = el.tagName.toLowerCase();
+    var label = el.id ? '#' + el.id : el.name ? tag + '[name=' + el.name + ']' : tag + '[' + index + ']';
+    copies[i].setAttribute('src', 'qa-frame:' + label);
+    copies[i].removeAttribute('srcdoc');
+}
+
+var css = [];
+for (var s = 0; s < document.styleSheets.length; s++) {
+    try {
+        var rules = document.styleSheets[s].cssRules;
+        for (var r = 0; r < rules.length; r++) css.push(rules[r].cssText);
+    } catch (e) { /* cross-origin stylesheet */ }
+}
+var drop = clone.querySelectorAll('script, noscript, base, style, link[rel=stylesheet], link[rel=preload], link[rel=modulepreload]');
+for (var d = 0; d < drop.length; d++) drop[d].parentNode.removeChild(drop[d]);
+var head = clone.querySelector('head') || clone;
+var style = document.createElement('style');
+style.textContent = css.join('\n');
+head.appendChild(style);
+
+var anchors = clone.querySelectorAll('a[href]');
+for (var a = 0; a < anchors.length; a++) {
+    var raw = anchors[a].getAttribute('href');
+    if (raw.charAt(0) === '#' || /^javascript:/i.test(raw)) continue;
+    if (anchors[a].origin === location.origin) anchors[a].setAttribute('href', anchors[a].pathname + anchors[a].search + anchors[a].hash);
+}
+var marked = clone.querySelectorAll('[data-qa-expanded], [data-qa-node]');
+for (var m = 0; m < marked.length; m++) { marked[m].removeAttribute('data-qa-expanded'); marked[m].removeAttribute('data-qa-node'); }
+return '<!DOCTYPE html>\n' + clone.outerHTML;
+"""
+
+# Re-issues the recorded XHRs on page load, so --capture network sees the same payloads in replay
+LOADER_SCRIPT = "<script>/* replay */ {paths}.forEach(function (u) {{ fetch(u, {{credentials: 'same-origin'}}); }});</script>"
+
+MANIFEST_FILE = "manifest.json"
+FRAMES_PATH = "/__frames__/"
+
+
+def frame_file(label):
+    """
+    "#contenido > iframe[name=detalle]" -> "/__frames__/contenido_iframe_name_detalle.html"
+    """
+    return FRAMES_PATH + (re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_") or "frame") + ".html"
+
+
+def _request_path(url):
+    parsed = urlparse(url)
+    return (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+
+
+def _with_loader(document, paths):
+    if not paths:
+        return document
+    script = LOADER_SCRIPT.format(paths=json.dumps(paths))
+    index = document.rfind("</body>")
+    return document[:index] + script + document[index:] if index >= 0 else document + script
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+class FixtureRecorder:
+    """
+    Records the page the driver is on as an offline fixture (see FixtureServer):
+    site/<page path> (the page), site/__frames__/*.html (one file per frame of the cached
+    FrameTree), payloads/*.json (same-origin XHR/fetch responses, when the driver has performance
+    logging) and manifest.json. Called right after login, before the crawl expands anything.
+    """
+
+    def __init__(self, driver, path, network=None):
+        self.driver = driver
+        self.path = path
+        # Shared with the crawler's network capture: reading the performance log drains it
+        self.network = network
+
+    def record(self):
+        """
+        Returns the fixture manifest, or None if the page could not be serialized.
+        """
+        started = time.perf_counter()
+        current = urlparse(self.driver.current_url)
+        origin = f"{current.scheme}://{current.netloc}"
+        entry = current.path if current.path not in ("", "/") else "/index.html"
+
+        try:
+            documents = FrameTree(self.driver).run(SNAPSHOT_HTML_JS)
+        except Exception as e:
+            logger.error(f"Fixture recording failed: {e}")
+            return None
+
+        pages = []
+        payloads = self._record_payloads(origin)
+        for label, document in documents:
+            if not document:
+                continue
+            document = re.sub(r'src="qa-frame:([^"]*)"',
+                              lambda m: f'src="{frame_file(" > ".join(p for p in (label, html.unescape(m.group(1))) if p))}"',
+                              document)
+            page = frame_file(label) if label else entry
+            if not label:
+                document = _with_loader(document, list(payloads))
+            _write(os.path.join(self.path, "site", page.lstrip("/")), document)
+            pages.append(page)
+
+        manifest = {"recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"), "source": origin, "entry": entry,
+                    "pages": pages, "payloads": payloads}
+        _write(os.path.join(self.path, MANIFEST_FILE), json.dumps(manifest, indent=2, ensure_ascii=False))
+        logger.info(f"Fixture recorded in {self.path}: {len(pages)} documents, {len(payloads)} payloads "
+                    f"({time.perf_counter() - started:.1f}s).")
+        return manifest
+
+    def _record_payloads(self, origin):
+        if self.network is None:
+            return {}
+        payloads = {}
+        for request_id, url in self.network.collect().items():
+            if not url.startswith(origin):
+                continue
+            body = self.network.body(request_id)
+            if body is None:
+                continue
+            request_path = _request_path(url)
+            name = f"payloads/{len(payloads):03d}.json"
+            _write(os.path.join(self.path, name), body)
+            payloads[request_path] = {"file": name, "mime": "application/json"}
+        return payloads
+
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        payload = self.server.payloads.get(self.path)
+        if payload:
+            with open(os.path.join(self.server.root, payload["file"]), "rb") as f:
+                data = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", payload.get("mime", "application/json") + "; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        super().do_GET()
+
+    do_POST = do_GET   # ASMX/WCF menus are usually POSTed; the recorded body is served either way
+
+    def log_message(self, format, *args):
+        logger.debug("Replay server: " + format % args)
+
+
+class FixtureServer:
+    """
+    Serves a recorded or synthetic fixture on localhost (random port), in a background thread.
+    """
+
+    def __init__(self, path, port=0):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def entry_url(self):
+        return self.url + self.manifest["entry"]
+
+    def start(self):
+        root = os.path.join(self.path, "site")
+        handler = lambda *args, **kwargs: _FixtureHandler(*args, directory=root, **kwargs)
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), handler)
+        self._server.daemon_threads = True
+        self._server.root = self.path
+        self._server.payloads = self.manifest.get("payloads", {})
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Replaying fixture {self.path} at {self.entry_url}")
+        return self
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=5)
+        self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# Screen templates of the synthetic portal (the screen stage dedups them by structure hash)
+SYNTH_TEMPLATES = (
+    '<form><label>Codigo</label><input name="codigo"><label>Fecha</label><input type="date" name="fecha">'
+    '<select name="estado"><option>Activo</option><option>Inactivo</option></select>'
+    '<button type="button">Buscar</button><button type="button">Nuevo</button></form>'
+    '<table class="grid"><thead><tr><th>Codigo</th><th>Descripcion</th></tr></thead><tbody><tr><td>1</td><td>-</td></tr></tbody></table>'
+    '<a href="/screens/detail.html">Ver detalle</a>',
+    '<div class="toolbar"><button type="button">Guardar</button><button type="button">Cancelar</button></div>'
+    '<textarea name="observaciones"></textarea><input type="checkbox" name="aprobado">'
+    '<iframe id="detalle" src="/screens/detail.html" style="width:600px;height:300px"></iframe>',
+    '<div class="report"><select name="periodo"><option>2025</option></select>'
+    '<button type="button">Exportar</button><a href="/screens/detail.html">Ver detalle</a></div>',
+)
+
+
+# AdminLTE treeview behaviour: a click on a node's link toggles its submenu
+TREEVIEW_SCRIPT = ("<script>document.addEventListener('click', function (e) {"
+                   " var a = e.target.closest('li.treeview > a'); if (!a) return; e.preventDefault();"
+                   " var ul = a.nextElementSibling; if (ul) ul.style.display = ul.style.display === 'none' ? 'block' : 'none';"
+                   " });</script>")
+
+
+def _page(title, body):
+    return (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(title)}</title></head>'
+            f'<body>{body}</body></html>')
+
+
+def build_synthetic_fixture(path, modules, submenus=3, items=4, js_items=0):
+    """
+    Writes an AdminLTE-style portal with modules x submenus x items menu entries (collapsed
+    treeview sidebar, one screen per leaf, 3 shared screen templates) plus the same menu as a
+    JSON payload. The last js_items leaves of each submenu navigate from an onclick handler
+    (href="#"), like the ERP's JS-only entries. Returns the number of menu items.
+    """
+    menu, sidebar, count = [], [], 0
+    for m in range(1, modules + 1):
+        module = {"text": f"Modulo {m}", "children": []}
+        subs = []
+        for s in range(1, submenus + 1):
+            sub = {"text": f"Submenu {m}.{s}", "children": []}
+            leaves = []
+            for i in range(1, items + 1):
+                text, href = f"Opcion {m}.{s}.{i}", f"/screens/{m}_{s}_{i}.html"
+                sub["children"].append({"text": text, "url": href})
+                if i > items - js_items:
+                    leaves.append(f'<li><a href="#" onclick="location.href=\'{href}\'; return false;">{text}</a></li>')
+                else:
+                    leaves.append(f'<li><a href="{href}">{text}</a></li>')
+                template = SYNTH_TEMPLATES[(m + s + i) % len(SYNTH_TEMPLATES)]
+                _write(os.path.join(path, "site", href.lstrip("/")), _page(text, f"<h1>{text}</h1>{template}"))
+            module["children"].append(sub)
+            subs.append(f'<li class="treeview"><a href="#">{sub["text"]}</a>'
+                        f'<ul class="treeview-menu" style="display:none">{"".join(leaves)}</ul></li>')
+            count += 1 + items
+        menu.append(module)
+        sidebar.append(f'<li class="treeview"><a href="#">{module["text"]}</a>'
+                       f'<ul class="treeview-menu" style="display:none">{"".join(subs)}</ul></li>')
+        count += 1
+
+    index = _page("Portal", '<aside class="main-sidebar"><ul class="sidebar-menu">' + "".join(sidebar) +
+                  '</ul></aside><div class="content-wrapper"><h1>Inicio</h1></div>' + TREEVIEW_SCRIPT)
+    payloads = {"/api/menu.json": {"file": "payloads/menu.json", "mime": "application/json"}}
+    _write(os.path.join(path, "site", "index.html"), _with_loader(index, list(payloads)))
+    _write(os.path.join(path, "site", "screens", "detail.html"), _page("Detalle", '<input name="linea"><button type="button">Aceptar</button>'))
+    _write(os.path.join(path, "payloads", "menu.json"), json.dumps({"d": menu}, ensure_ascii=False))
+    manifest = {"recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"), "source": "synthetic", "entry": "/index.html",
+                "pages": ["/index.html"], "payloads": payloads, "menu_items": count}
+    _write(os.path.join(path, MANIFEST_FILE), json.dumps(manifest, indent=2))
+    return count
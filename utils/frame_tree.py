@@ -0,0 +1,165 @@
+import uuid
+from collections import namedtuple
+from selenium.common.exceptions import WebDriverException
+from config import Config
+from utils.logger import logger
+
+# One cached frame: index in its parent's window.frames (what switch_to.frame(int) uses),
+# readable path label ("#contenido > iframe[name=detalle]") and child frames.
+Frame = namedtuple("Frame", ["index", "label", "children"])
+
+# Lists the visible child frames of the current document: [[window.frames index, label], ...]
+FRAME_LIST_JS = r"""
+var out = [], els = document.querySelectorAll('iframe, frame');
+for (var i = 0; i < els.length; i++) {
+    var el = els[i];
+    if (el.tagName === 'IFRAME' && !(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) continue;
+    var index = -1;
+    for (var k = 0; k < window.frames.length; k++) { if (window.frames[k] === el.contentWindow) { index = k; break; } }
+    if (index < 0) continue;
+    var tag = el.tagName.toLowerCase();
+    var label = el.id ? '#' + el.id : el.name ? tag + '[name=' + el.name + ']' : tag + '[' + index + ']';
+    out.push([index, label]);
+}
+return out;
+"""
+
+
+def with_frame_list(script):
+    """
+    Wraps a script so it also lists the child frames in the same round-trip (discovery while walking).
+    """
+    return "return [(function () {" + script + "}).apply(null, arguments), (function () {" + FRAME_LIST_JS + "})()];"
+
+
+# Navigation token kept in the top window: gone after any navigation or reload of the page
+TOKEN_JS = "if (arguments[0]) { window.__qaFrameToken = arguments[0]; } return window.__qaFrameToken || null;"
+
+
+class FrameTree:
+    """
+    Maps the frames of the current page once and caches their index paths, so per-frame work is
+    one switch + one script per frame instead of locating iframes again for every lookup.
+    The cache is tied to a token stored in the top window and is dropped when the page navigates.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.frames = None
+        self._token = None
+
+    def invalidate(self):
+        self.frames = None
+        self._token = None
+
+    def is_valid(self):
+        if self.frames is None:
+            return False
+        try:
+            self.driver.switch_to.default_content()
+            return self.driver.execute_script(TOKEN_JS, None) == self._token
+        except WebDriverException:
+            return False
+
+    def discover(self):
+        """
+        Returns the cached frame tree, rebuilding it (one FRAME_LIST_JS per frame) after a navigation.
+        """
+        if self.is_valid():
+            return self.frames
+        self.run("return null;")
+        return self.frames
+
+    def run(self, script, *args):
+        """
+        Executes script in the main document and in every frame (depth-first).
+        Returns [(label, result)]; the main document's label is "". Leaves the driver on the main document.
+        """
+        results = []
+        if self.is_valid():
+            results.append(("", self.driver.execute_script(script, *args)))
+            self._walk(self.frames, [], script, args, results)
+            if self.frames is None:
+                # A cached frame disappeared mid-walk: remap and run again
+                return self.run(script, *args)
+        else:
+            self._token = uuid.uuid4().hex
+            self.driver.switch_to.default_content()
+            self.driver.execute_script(TOKEN_JS, self._token)
+            self.frames = self._discover_walk([], script, args, results)
+            logger.debug(f"Frame tree mapped: {len(results) - 1} frames.")
+        self.driver.switch_to.default_content()
+        return results
+
+    def _discover_walk(self, path, script, args, results):
+        result, children = self.driver.execute_script(with_frame_list(script), *args)
+        results.append((" > ".join(path), result))
+        frames = []
+        for index, label in children or []:
+            try:
+                self.driver.switch_to.frame(index)
+            except WebDriverException as e:
+                logger.debug(f"Frame {label} not reachable: {e}")
+                continue
+            try:
+                frames.append(Frame(index, label, self._discover_walk(path + [label], script, args, results)))
+            finally:
+                self.driver.switch_to.parent_frame()
+        return frames
+
+    def _walk(self, frames, path, script, args, results):
+        for frame in frames:
+            try:
+                self.driver.switch_to.frame(frame.index)
+            except WebDriverException as e:
+                # A frame was removed/reloaded since mapping: remap on the next call
+                logger.debug(f"Cached frame {frame.label} gone, invalidating frame tree: {e}")
+                self.invalidate()
+                return
+            try:
+                results.append((" > ".join(path + [frame.label]), self.driver.execute_script(script, *args)))
+                self._walk(frame.children, path + [frame.label], script, args, results)
+            finally:
+                self.driver.switch_to.parent_frame()
+
+    def find_displayed(self, by, value):
+        """
+        Finds the first displayed element matching the locator in any frame and leaves the driver
+        switched into that frame. Returns (label, element) or (None, None).
+        The implicit wait is off during the walk: an empty frame must not cost IMPLICIT_WAIT seconds.
+        """
+        self.discover()
+        implicit = self._implicit_wait()
+        self.driver.implicitly_wait(0)
+        try:
+            self.driver.switch_to.default_content()
+            for element in self.driver.find_elements(by, value):
+                if element.is_displayed():
+                    return "", element
+            return self._find_in(self.frames or [], [], [], by, value)
+        finally:
+            self.driver.implicitly_wait(implicit)
+
+    def _implicit_wait(self):
+        try:
+            return self.driver.timeouts.implicit_wait
+        except (WebDriverException, AttributeError):
+            return Config.IMPLICIT_WAIT
+
+    def _find_in(self, frames, indexes, path, by, value):
+        for frame in frames:
+            self.driver.switch_to.default_content()
+            try:
+                for index in indexes + [frame.index]:
+                    self.driver.switch_to.frame(index)
+            except WebDriverException:
+                self.invalidate()
+                break
+            for element in self.driver.find_elements(by, value):
+                if element.is_displayed():
+                    return " > ".join(path + [frame.label]), element
+            found = self._find_in(frame.children, indexes + [frame.index], path + [frame.label], by, value)
+            if found[1] is not None:
+                return found
+        self.driver.switch_to.default_content()
+        return None, None
@@ -1,29 +1,27 @@
 import os
 import csv
 import json
-from datetime import datetime
 from config import Config
 from utils.logger import logger
+from utils.evidence_store import evidence_store
 
-def take_screenshot(driver, name="screenshot"):
+INVENTORY_CSV_FIELDS = ["timestamp", "menu_level_1", "menu_level_2", "menu_level_3", "item_text", "selector_hint", "action_type", "url_after_click", "frame_path", "status", "error"]
+
+def take_screenshot(driver, name="screenshot", element=None):
+    """
+    Queues the screenshot in the evidence store (written in the background, named by content hash).
+    element: capture only that element. Returns the evidence reference listed in evidence/manifest.jsonl.
+    """
     if not driver:
         return None
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     # Sanitize name
     name = "".join([c for c in name if c.isalpha() or c.isdigit() or c=='_']).rstrip()
-    filename = f"{name}_{timestamp}.png"
-    path = os.path.join(Config.EVIDENCE_DIR, filename)
-    try:
-        driver.save_screenshot(path)
-        logger.info(f"Screenshot saved: {path}")
-        return path
-    except Exception as e:
-        logger.error(f"Failed to take screenshot: {e}")
-        return None
+    return evidence_store.capture(driver, name, element)
 
 def save_inventory_json(data, filename="inventory.json"):
     path = os.path.join(Config.OUTPUT_DIR, filename)
     try:
+        Config.ensure_dirs()
         with open(path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=4, ensure_ascii=False)
         logger.info(f"Inventory saved to JSON: {path}")
@@ -36,7 +34,8 @@ def save_inventory_csv(data, filename="inventory.csv"):
         return
         
     try:
-        keys = ["timestamp", "menu_level_1", "menu_level_2", "menu_level_3", "item_text", "selector_hint", "action_type", "url_after_click", "status", "error"]
+        Config.ensure_dirs()
+        keys = INVENTORY_CSV_FIELDS
         
         with open(path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=keys)
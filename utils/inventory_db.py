@@ -0,0 +1,220 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import hashlib
+from config import Config
+from utils.logger import logger
+from utils.helpers import INVENTORY_CSV_FIELDS
+from utils.inventory_sink import InventoryRecord
+from utils.nav_index import menu_key
+
+# Inventory row columns, shared by menu_nodes and elements (same names as the inventory.json keys)
+ITEM_COLUMNS = ("position", "timestamp", "menu_level_1", "menu_level_2", "menu_level_3", "item_text", "status", "notes",
+                "selector_hint", "action_type", "url_after_click", "frame_path", "error")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT, finished_at TEXT, capture TEXT, output_dir TEXT,
+    items INTEGER, modules INTEGER, submenus INTEGER, elements INTEGER
+);
+CREATE TABLE IF NOT EXISTS menu_nodes (
+    run_id INTEGER NOT NULL REFERENCES runs(id), path TEXT,
+    position INTEGER, timestamp TEXT, menu_level_1 TEXT, menu_level_2 TEXT, menu_level_3 TEXT, item_text TEXT, status TEXT,
+    notes TEXT, selector_hint TEXT, action_type TEXT, url_after_click TEXT, frame_path TEXT, error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_menu_nodes_run ON menu_nodes(run_id, position);
+CREATE INDEX IF NOT EXISTS idx_menu_nodes_levels ON menu_nodes(menu_level_1, menu_level_2, menu_level_3, run_id);
+CREATE INDEX IF NOT EXISTS idx_menu_nodes_path ON menu_nodes(path, run_id);
+CREATE TABLE IF NOT EXISTS elements (
+    run_id INTEGER NOT NULL REFERENCES runs(id), path TEXT,
+    position INTEGER, timestamp TEXT, menu_level_1 TEXT, menu_level_2 TEXT, menu_level_3 TEXT, item_text TEXT, status TEXT,
+    notes TEXT, selector_hint TEXT, action_type TEXT, url_after_click TEXT, frame_path TEXT, error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_elements_run ON elements(run_id, position);
+CREATE INDEX IF NOT EXISTS idx_elements_screen ON elements(url_after_click, run_id);
+CREATE TABLE IF NOT EXISTS screens (
+    run_id INTEGER NOT NULL REFERENCES runs(id), url TEXT NOT NULL, path TEXT, elements INTEGER, signature TEXT,
+    PRIMARY KEY (url, run_id)
+);
+CREATE INDEX IF NOT EXISTS idx_screens_run ON screens(run_id);
+CREATE TABLE IF NOT EXISTS evidence (
+    run_id INTEGER NOT NULL REFERENCES runs(id), name TEXT, file TEXT, sha256 TEXT, bytes INTEGER,
+    duplicate INTEGER, clipped INTEGER, captured_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_evidence_run ON evidence(run_id);
+CREATE INDEX IF NOT EXISTS idx_evidence_sha ON evidence(sha256);
+"""
+
+# Screens whose element signature differs from the previous run that harvested them
+CHANGED_SCREENS_SQL = """
+SELECT cur.run_id, cur.url, cur.path, prev.run_id, prev.elements, cur.elements
+FROM screens cur
+JOIN screens prev ON prev.url = cur.url
+ AND prev.run_id = (SELECT MAX(run_id) FROM screens WHERE url = cur.url AND run_id < cur.run_id)
+WHERE cur.run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?) AND prev.signature != cur.signature
+ORDER BY cur.run_id DESC, cur.path
+"""
+
+
+def _signature(rows):
+    """
+    Order-independent hash of a screen's elements (frame, type, label, selector).
+    """
+    parts = sorted(f"{r['frame_path']}|{r['action_type']}|{r['item_text']}|{r['selector_hint']}" for r in rows)
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class InventoryDB:
+    """
+    Indexed history of every run (outputs/inventory.db): runs, menu_nodes (sidebar entries),
+    elements (screen-stage rows, action_type set; failed screens use "screen"), screens (element signature per URL and run)
+    and evidence (screenshot manifest entries). A run is inserted in a single transaction;
+    inventory.json/.csv of any past run can be exported back from it.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or Config.INVENTORY_DB_FILE
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_run(self, items, started_at=None, capture="", output_dir="", evidence=()):
+        """
+        Bulk-inserts one run (item dicts in inventory.json shape + evidence manifest entries). Returns the run id.
+        """
+        menu, elements, screens = [], [], {}
+        for position, item in enumerate(items):
+            row = [item.get(c, "") for c in ITEM_COLUMNS[1:]]
+            path = menu_key((item.get("menu_level_1", ""), item.get("menu_level_2", ""), item.get("menu_level_3", "")))
+            if item.get("action_type"):
+                elements.append([path, position] + row)
+                screens.setdefault(item.get("url_after_click", ""), (path, []))[1].append(item)
+            else:
+                menu.append([path, position] + row)
+
+        submenus = sum(1 for row in menu if row[4] and not row[5])
+        columns = ", ".join(("run_id", "path") + ITEM_COLUMNS)
+        marks = ", ".join("?" * (len(ITEM_COLUMNS) + 2))
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (started_at, finished_at, capture, output_dir, items, modules, submenus, elements) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (started_at or time.strftime("%Y-%m-%d %H:%M:%S"), time.strftime("%Y-%m-%d %H:%M:%S"), capture, output_dir,
+                 len(menu) + len(elements), len({row[3] for row in menu if row[3]}), submenus, len(elements)))
+            run_id = cursor.lastrowid
+            self.conn.executemany(f"INSERT INTO menu_nodes ({columns}) VALUES ({marks})", ([run_id] + row for row in menu))
+            self.conn.executemany(f"INSERT INTO elements ({columns}) VALUES ({marks})", ([run_id] + row for row in elements))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO screens (run_id, url, path, elements, signature) VALUES (?, ?, ?, ?, ?)",
+                ((run_id, url, path, len(rows), _signature({c: r.get(c, "") for c in ITEM_COLUMNS} for r in rows))
+                 for url, (path, rows) in screens.items() if url))
+            self.conn.executemany(
+                "INSERT INTO evidence (run_id, name, file, sha256, bytes, duplicate, clipped, captured_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((run_id, e.get("name"), e.get("file"), e.get("sha256"), e.get("bytes"), int(bool(e.get("duplicate"))),
+                  int(bool(e.get("clipped"))), e.get("captured_at")) for e in evidence))
+        return run_id
+
+    def add_run_from_jsonl(self, jsonl_path, **kwargs):
+        items = []
+        with open(jsonl_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    items.append(json.loads(line))
+        return self.add_run(items, **kwargs)
+
+    def latest_run(self):
+        row = self.conn.execute("SELECT MAX(id) FROM runs").fetchone()
+        return row[0]
+
+    def runs(self, last=10):
+        return self.conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (last,)).fetchall()
+
+    def items(self, run_id=None, l1=None, l2=None, level=None):
+        """
+        Menu nodes of a run (latest by default), optionally under an L1/L2 and at one level (1-3).
+        """
+        sql, args = "SELECT * FROM menu_nodes WHERE run_id = ?", [run_id or self.latest_run()]
+        for column, value in (("menu_level_1", l1), ("menu_level_2", l2)):
+            if value:
+                sql += f" AND {column} = ?"
+                args.append(value)
+        if level == 1:
+            sql += " AND menu_level_2 = ''"
+        elif level == 2:
+            sql += " AND menu_level_2 != '' AND menu_level_3 = ''"
+        elif level == 3:
+            sql += " AND menu_level_3 != ''"
+        return self.conn.execute(sql + " ORDER BY position", args).fetchall()
+
+    def search(self, text, last=1):
+        """
+        Menu nodes and screen elements whose text contains `text`, in the last N runs.
+        """
+        pattern = f"%{text}%"
+        sql = ("SELECT run_id, path, item_text, action_type, url_after_click FROM {table} "
+               "WHERE run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?) AND item_text LIKE ?")
+        return (self.conn.execute(sql.format(table="menu_nodes"), (last, pattern)).fetchall() +
+                self.conn.execute(sql.format(table="elements"), (last, pattern)).fetchall())
+
+    def changed_screens(self, last=10):
+        return self.conn.execute(CHANGED_SCREENS_SQL, (last,)).fetchall()
+
+    def export(self, run_id=None, json_path=None, csv_path=None):
+        """
+        Rebuilds the inventory.json / inventory.csv of a run (byte-identical to InventorySink.publish).
+        Files are swapped in atomically. Returns the number of items.
+        """
+        run_id = run_id or self.latest_run()
+        columns = ", ".join(ITEM_COLUMNS)
+        rows = self.conn.execute(f"SELECT {columns} FROM menu_nodes WHERE run_id = ? UNION ALL "
+                                 f"SELECT {columns} FROM elements WHERE run_id = ? ORDER BY position", (run_id, run_id))
+        items = []
+        for row in rows:
+            item = {k: row[k] for k in ("timestamp", "menu_level_1", "menu_level_2", "menu_level_3", "item_text", "status", "notes")}
+            item.update({k: row[k] for k in InventoryRecord.OPTIONAL_FIELDS if row[k]})
+            items.append(item)
+
+        if json_path:
+            with open(json_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(items, f, indent=4, ensure_ascii=False)
+            os.replace(json_path + ".tmp", json_path)
+        if csv_path and items:
+            with open(csv_path + ".tmp", "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=INVENTORY_CSV_FIELDS, extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(items)
+            os.replace(csv_path + ".tmp", csv_path)
+        return len(items)
+
+
+def record_run(jsonl_path, started_at=None, capture="", evidence=(), json_path=None, csv_path=None):
+    """
+    Adds the run just finalized by the sink to the history database and exports its inventory.json /
+    inventory.csv from it. Never fails the run: returns None on error (the caller publishes from the JSONL).
+    """
+    started = time.perf_counter()
+    try:
+        with InventoryDB() as db:
+            run_id = db.add_run_from_jsonl(jsonl_path, started_at=started_at, capture=capture,
+                                           output_dir=Config.OUTPUT_DIR, evidence=evidence)
+            db.export(run_id, json_path, csv_path)
+        logger.info(f"Inventory history: run #{run_id} stored in {Config.INVENTORY_DB_FILE} "
+                    f"({time.perf_counter() - started:.2f}s).")
+        return run_id
+    except Exception as e:
+        logger.error(f"Failed to store the run in the inventory database: {e}")
+        return None
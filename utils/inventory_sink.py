@@ -0,0 +1,205 @@
+import os
+import csv
+import json
+import time
+from config import Config
+from utils.logger import logger
+from utils.helpers import INVENTORY_CSV_FIELDS
+
+_ts_cache = [None, ""]
+
+
+def format_timestamp(ts):
+    # Items are produced in bursts within the same second: format once per second
+    second = int(ts)
+    if _ts_cache[0] != second:
+        _ts_cache[0] = second
+        _ts_cache[1] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+    return _ts_cache[1]
+
+
+class InventoryRecord:
+    """
+    Compact inventory item. Only raw values are kept (epoch timestamp, no per-item dict);
+    to_dict() produces the same shape as the historical inventory.json entries.
+    """
+    __slots__ = ("ts", "menu_level_1", "menu_level_2", "menu_level_3", "item_text", "status", "notes",
+                 "selector_hint", "action_type", "url_after_click", "frame_path", "error")
+
+    # Written only when set, so plain captures keep the original JSON shape
+    OPTIONAL_FIELDS = ("selector_hint", "action_type", "url_after_click", "frame_path", "error")
+
+    def __init__(self, item_text, menu_level_1="", menu_level_2="", menu_level_3="", status="CAPTURED", notes="",
+                 ts=None, selector_hint="", action_type="", url_after_click="", frame_path="", error=""):
+        self.ts = time.time() if ts is None else ts
+        self.menu_level_1 = menu_level_1
+        self.menu_level_2 = menu_level_2
+        self.menu_level_3 = menu_level_3
+        self.item_text = item_text
+        self.status = status
+        self.notes = notes
+        self.selector_hint = selector_hint
+        self.action_type = action_type
+        self.url_after_click = url_after_click
+        # "" = main document, else the iframe path ("#contenido > iframe[name=detalle]")
+        self.frame_path = frame_path
+        self.error = error
+
+    def to_dict(self):
+        data = {
+            "timestamp": format_timestamp(self.ts),
+            "menu_level_1": self.menu_level_1,
+            "menu_level_2": self.menu_level_2,
+            "menu_level_3": self.menu_level_3,
+            "item_text": self.item_text,
+            "status": self.status,
+            "notes": self.notes,
+        }
+        for field in self.OPTIONAL_FIELDS:
+            value = getattr(self, field)
+            if value:
+                data[field] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data, ts=None):
+        """
+        Rebuilds a record from an inventory.json entry (items reused from the run index). The old
+        "timestamp" string is not parsed back (local time, whole seconds, ambiguous on DST folds):
+        the record is stamped with ts, by default now, i.e. the run that re-emits it.
+        """
+        fields = {k: data.get(k, "") for k in cls.__slots__ if k != "ts"}
+        return cls(ts=ts, **fields)
+
+
+class InventorySink:
+    """
+    Streams inventory records to disk as they are parsed.
+    - inventory.jsonl: append-only log (survives crashes), fsync'ed every SINK_FSYNC_EVERY items
+    - inventory.csv: written incrementally to a .part file, renamed on finalize
+    - inventory.json: rebuilt from the JSONL on finalize and swapped in atomically
+    """
+
+    def __init__(self, json_name="inventory.json", csv_name="inventory.csv", output_dir=None, fsync_every=None):
+        output_dir = output_dir or Config.OUTPUT_DIR
+        self.json_path = os.path.join(output_dir, json_name)
+        self.csv_path = os.path.join(output_dir, csv_name)
+        self.jsonl_path = os.path.splitext(self.json_path)[0] + ".jsonl"
+        self.fsync_every = fsync_every or Config.SINK_FSYNC_EVERY
+
+        self.count = 0
+        self.modules = set()
+        self.l2_count = 0
+        self._unsynced = 0
+        self._jsonl = None
+        self._csv_file = None
+        self._csv_writer = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.jsonl_path), exist_ok=True)
+        self._jsonl = open(self.jsonl_path, "w", encoding="utf-8")
+        self._csv_file = open(self.csv_path + ".part", "w", newline="", encoding="utf-8")
+        self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=INVENTORY_CSV_FIELDS, extrasaction="ignore")
+        return self
+
+    def resume(self, keep_items):
+        """
+        Reopens the streams after an interrupted run, keeping only the first keep_items
+        entries of inventory.jsonl (items of subtrees that were checkpointed as complete).
+        """
+        previous = self.jsonl_path + ".prev"
+        if os.path.exists(self.jsonl_path):
+            os.replace(self.jsonl_path, previous)
+
+        self.open()
+        if os.path.exists(previous):
+            with open(previous, "r", encoding="utf-8") as f:
+                for line in f:
+                    if self.count >= keep_items:
+                        break
+                    if line.strip():
+                        self.write(json.loads(line))
+            os.remove(previous)
+        self.flush()
+        logger.info(f"Inventory sink resumed with {self.count} items from previous run.")
+        return self
+
+    def write(self, record):
+        if self._jsonl is None:
+            self.open()
+        data = record.to_dict() if isinstance(record, InventoryRecord) else record
+
+        self._jsonl.write(json.dumps(data, ensure_ascii=False) + "\n")
+        if self.count == 0:
+            self._csv_writer.writeheader()
+        self._csv_writer.writerow({k: data.get(k, "") for k in INVENTORY_CSV_FIELDS})
+
+        self.count += 1
+        if data.get("menu_level_1"):
+            self.modules.add(data["menu_level_1"])
+        if data.get("menu_level_2") and not data.get("action_type"):
+            self.l2_count += 1  # Menu entries only, not screen elements
+
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.flush()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        for f in (self._jsonl, self._csv_file):
+            if f:
+                f.flush()
+                os.fsync(f.fileno())
+        self._unsynced = 0
+
+    def finalize(self, publish=True):
+        """
+        Closes the streams and publishes inventory.json / inventory.csv atomically.
+        The output is byte-identical to json.dump(list, indent=4) + the historical CSV writer.
+        With publish=False the streams are only closed: the caller exports the outputs from the history
+        DB and then calls publish() (fallback) or drop_partial().
+        """
+        if self._jsonl is None:
+            self.open()
+        self.flush()
+        self._jsonl.close()
+        self._csv_file.close()
+        if publish:
+            self.publish()
+
+    def drop_partial(self):
+        if os.path.exists(self.csv_path + ".part"):
+            os.remove(self.csv_path + ".part")
+
+    def publish(self):
+        """
+        Rebuilds inventory.json from inventory.jsonl and swaps in the streamed CSV.
+        """
+        try:
+            tmp_json = self.json_path + ".tmp"
+            with open(self.jsonl_path, "r", encoding="utf-8") as src, open(tmp_json, "w", encoding="utf-8") as dst:
+                first = True
+                for line in src:
+                    if not line.strip():
+                        continue
+                    item = json.dumps(json.loads(line), indent=4, ensure_ascii=False)
+                    dst.write(("[\n" if first else ",\n") + "    " + item.replace("\n", "\n    "))
+                    first = False
+                dst.write("[]" if first else "\n]")
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp_json, self.json_path)
+            logger.info(f"Inventory saved to JSON: {self.json_path}")
+
+            # Same as save_inventory_csv: no CSV at all for an empty inventory
+            if self.count:
+                os.replace(self.csv_path + ".part", self.csv_path)
+                logger.info(f"Inventory saved to CSV: {self.csv_path}")
+            else:
+                os.remove(self.csv_path + ".part")
+        except Exception as e:
+            logger.error(f"Failed to finalize inventory outputs: {e}")
+
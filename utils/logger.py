@@ -1,26 +1,145 @@
 import logging
+import logging.handlers
 import os
 import sys
+import json
+import queue
+import atexit
 from config import Config
 
-def setup_logger(name="IntegrensTest"):
+# Returns the current run phase of the calling thread (set by the profiler, see utils.profiler)
+_phase_provider = None
+
+
+def set_phase_provider(provider):
+    global _phase_provider
+    _phase_provider = provider
+
+
+class LazyFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Opens the log file (and creates the log folder) on the first record, not at import time.
+    Rotates at Config.LOG_MAX_BYTES.
+    """
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class ContextFilter(logging.Filter):
+    """
+    Per-module levels (Config.LOG_LEVELS, keyed by module name) and run context on every record:
+    phase, worker id and elapsed ms. Runs in the calling thread, before the record is queued.
+    """
+    def __init__(self, levels=None, default_level=logging.INFO):
+        super().__init__()
+        self.levels = {}
+        for module, level in (levels or {}).items():
+            value = logging.getLevelName(str(level).upper())
+            if isinstance(value, int):
+                self.levels[module] = value
+        self.default_level = default_level
+
+    def filter(self, record):
+        if record.levelno < self.levels.get(record.module, self.default_level):
+            return False
+        record.phase = _phase_provider() if _phase_provider else ""
+        thread = record.threadName or ""
+        record.worker = thread.rsplit("-", 1)[-1] if thread.startswith("crawl-worker-") else ""
+        record.elapsed_ms = int(record.relativeCreated)
+        return True
+
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Only merge the args here; timestamps and layout are formatted on the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_exc_formatter = logging.Formatter()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "module": record.module,
+            "phase": getattr(record, "phase", ""),
+            "worker": getattr(record, "worker", ""),
+            "elapsed_ms": getattr(record, "elapsed_ms", int(record.relativeCreated)),
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _output_handlers(log_dir, console=sys.stdout, json_lines=False):
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = []
+
+    # Console handler
+    if console is not None:
+        ch = logging.StreamHandler(console)
+        ch.setFormatter(formatter)
+        handlers.append(ch)
+
+    # File handler (rotating)
+    fh = LazyFileHandler(os.path.join(log_dir, "execution.log"), maxBytes=Config.LOG_MAX_BYTES,
+                         backupCount=Config.LOG_BACKUP_COUNT, encoding='utf-8', delay=True)
+    fh.setFormatter(formatter)
+    handlers.append(fh)
+
+    # Structured JSON lines (phase / worker / elapsed_ms), for post-run analysis
+    if json_lines:
+        jh = LazyFileHandler(os.path.join(log_dir, "execution.jsonl"), maxBytes=Config.LOG_MAX_BYTES,
+                             backupCount=Config.LOG_BACKUP_COUNT, encoding='utf-8', delay=True)
+        jh.setFormatter(JsonLinesFormatter())
+        handlers.append(jh)
+    return handlers
+
+
+def stop_listener(logger):
+    """
+    Flushes the queued records and stops the listener thread (safe to call twice).
+    """
+    listener = getattr(logger, "listener", None)
+    if listener is not None and listener._thread is not None:
+        listener.stop()
+
+
+def setup_logger(name="IntegrensTest", log_dir=None, console=sys.stdout, json_lines=None, levels=None):
+    """
+    Callers only enqueue records (QueueHandler); console and file I/O happen on a QueueListener thread.
+    console: stream for the console handler (None = no console output).
+    """
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
+
     if not logger.handlers:
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        
-        # Console handler
-        ch = logging.StreamHandler(sys.stdout)
-        ch.setFormatter(formatter)
-        logger.addHandler(ch)
-        
-        # File handler
-        log_file = os.path.join(Config.LOG_DIR, "execution.log")
-        fh = logging.FileHandler(log_file, encoding='utf-8')
-        fh.setFormatter(formatter)
-        logger.addHandler(fh)
-    
+        levels = Config.LOG_LEVELS if levels is None else levels
+        context = ContextFilter(levels)
+        # The logger must let through the most verbose module level; the filter applies the rest
+        logger.setLevel(min([logging.INFO] + list(context.levels.values())))
+        logger.propagate = False
+
+        log_queue = queue.SimpleQueue()
+        qh = RecordQueueHandler(log_queue)
+        qh.addFilter(context)
+        logger.addHandler(qh)
+
+        handlers = _output_handlers(log_dir or Config.LOG_DIR, console, Config.LOG_JSON if json_lines is None else json_lines)
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        logger.listener = listener
+        atexit.register(stop_listener, logger)   # Drains the queue so the last records reach the files
+
     return logger
 
+
 logger = setup_logger()
@@ -0,0 +1,169 @@
+import time
+from selenium.webdriver.common.by import By
+from config import Config
+from utils.logger import logger
+from utils.safe_actions import SafeActions
+from utils.waits import Waits, NETWORK_TRACKER_JS
+from utils.throttle import throttle
+
+# Finds the shallowest level of collapsed menu nodes (BFS) under the root and
+# opens all of them in the same call. Nodes are tagged so they are never re-expanded.
+# Returns [[node_id, depth, text], ...] for the level that was expanded. The XHR/fetch tracker is
+# installed first so the lazy loads these clicks start are seen by wait_for_network_idle.
+EXPAND_LEVEL_JS = NETWORK_TRACKER_JS + r"""
+var root = arguments[0] || document.body, maxDepth = arguments[1], limit = arguments[2];
+var seq = window.__qaNodeSeq || 0;
+
+function visible(el) {
+    if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) return false;
+    return window.getComputedStyle(el).visibility !== 'hidden';
+}
+function submenu(li) {
+    for (var i = 0; i < li.children.length; i++) { if (li.children[i].tagName === 'UL') return li.children[i]; }
+    return null;
+}
+function toggleOf(li) {
+    for (var i = 0; i < li.children.length; i++) {
+        var c = li.children[i];
+        if (c.tagName === 'A' || c.tagName === 'SPAN' || c.tagName === 'BUTTON') return c;
+    }
+    return null;
+}
+function depthOf(li) {
+    if (li === root) return 0;
+    var d = 0, p = li.parentElement;
+    while (p && p !== root) { if (p.tagName === 'UL') d++; p = p.parentElement; }
+    return d;
+}
+
+var lis = Array.prototype.slice.call(root.querySelectorAll('li'));
+if (root.tagName === 'LI') lis.unshift(root);
+
+var candidates = [], minDepth = Infinity;
+for (var i = 0; i < lis.length; i++) {
+    var li = lis[i];
+    if (li.hasAttribute('data-qa-expanded')) continue;
+    var sub = submenu(li), toggle = toggleOf(li);
+    var collapsible = sub || li.classList.contains('treeview') || li.classList.contains('has-sub') ||
+                      (toggle && toggle.getAttribute('aria-expanded') === 'false');
+    if (!collapsible || !toggle) continue;
+    if (sub && visible(sub)) { li.setAttribute('data-qa-expanded', '1'); continue; }
+    if (!visible(toggle)) continue;   // Parent still closed: belongs to a later BFS level
+    var depth = depthOf(li);
+    if (depth > maxDepth) continue;
+    candidates.push([li, toggle, depth]);
+    if (depth < minDepth) minDepth = depth;
+}
+
+var out = [];
+for (var j = 0; j < candidates.length && out.length < limit; j++) {
+    var c = candidates[j];
+    if (c[2] !== minDepth) continue;
+    var id = String(++seq);
+    c[0].setAttribute('data-qa-node', id);
+    c[0].setAttribute('data-qa-expanded', '1');
+    c[1].click();
+    out.push([id, c[2], (c[1].textContent || '').trim()]);
+}
+window.__qaNodeSeq = seq;
+return out;
+"""
+
+# After the batch click (and its lazy loads): accordion menus close siblings when a node opens,
+# so any submenu that has content but is hidden is forced open. Returns the ids whose submenu is
+# missing/empty AND whose toggle still reads closed: those need a real click. A node that reports
+# itself open (aria-expanded/open class) is left alone, another click would collapse it.
+FORCE_OPEN_JS = r"""
+var ids = arguments[0], missing = [];
+function isOpen(li) {
+    for (var k = 0; k < li.children.length; k++) {
+        var state = li.children[k].getAttribute('aria-expanded');
+        if (state !== null) return state === 'true';
+    }
+    return li.classList.contains('menu-open') || li.classList.contains('open') || li.classList.contains('show');
+}
+for (var i = 0; i < ids.length; i++) {
+    var li = document.querySelector('li[data-qa-node="' + ids[i] + '"]');
+    if (!li) continue;
+    var sub = null;
+    for (var k = 0; k < li.children.length; k++) { if (li.children[k].tagName === 'UL') sub = li.children[k]; }
+    if (!sub || !sub.children.length) { if (!isOpen(li)) missing.push(ids[i]); continue; }
+    if (!(sub.offsetWidth || sub.offsetHeight || sub.getClientRects().length)) {
+        sub.style.display = 'block';
+        sub.style.height = 'auto';
+        sub.classList.add('in', 'show', 'menu-open');
+        li.classList.add('active', 'open', 'menu-open');
+    }
+}
+return missing;
+"""
+
+
+class MenuExpander:
+    """
+    Expands collapsed sidebar nodes breadth-first, one batch (single script call) per level.
+    Replaces the manual "expand everything" step of the assisted inventory.
+    """
+
+    def __init__(self, driver, max_depth=None, node_budget=None):
+        self.driver = driver
+        self.actions = SafeActions(driver)
+        self.max_depth = Config.EXPAND_MAX_DEPTH if max_depth is None else max_depth
+        self.node_budget = Config.EXPAND_NODE_BUDGET if node_budget is None else node_budget
+
+    def expand(self, root=None):
+        """
+        Expands every collapsed node under root (default: whole page). Returns the number of nodes opened.
+        """
+        started = time.perf_counter()
+        expanded = 0
+        levels = 0
+        clicks = 0
+
+        while expanded < self.node_budget:
+            # One batch of toggle clicks (may trigger lazy submenu loads) = one throttled request
+            with throttle.request("expand"):
+                batch = self.driver.execute_script(EXPAND_LEVEL_JS, root, self.max_depth, self.node_budget - expanded) or []
+            if not batch:
+                break
+            levels += 1
+            expanded += len(batch)
+            self._wait_loaded()
+
+            missing = self.driver.execute_script(FORCE_OPEN_JS, [node_id for node_id, _, _ in batch]) or []
+            if missing:
+                clicks += self._click_fallback(missing[:Config.EXPAND_MAX_CLICKS_PER_LEVEL])
+
+            logger.info(f"Expand level {levels} (depth {batch[0][1]}): {len(batch)} nodes, {len(missing)} needed a real click.")
+
+        if expanded >= self.node_budget:
+            logger.warning(f"Menu expansion stopped at node budget ({self.node_budget}).")
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Menu expansion done: {expanded} nodes in {levels} levels, {clicks} fallback clicks, {elapsed:.2f}s")
+        return expanded
+
+    def _click_fallback(self, node_ids):
+        """
+        Lazy-loaded nodes: a native click (via SafeActions.robust_click) is needed to trigger the fetch.
+        """
+        clicks = 0
+        for node_id in node_ids:
+            try:
+                toggle = self.driver.find_element(By.CSS_SELECTOR, f'li[data-qa-node="{node_id}"] > a, li[data-qa-node="{node_id}"] > span')
+                if self.actions.robust_click(toggle):
+                    clicks += 1
+            except Exception as e:
+                logger.debug(f"Fallback expand failed for node {node_id}: {e}")
+        if clicks:
+            self._wait_loaded()
+        return clicks
+
+    def _wait_loaded(self):
+        """
+        Lazy submenus: the fetch started by the toggle must return before the DOM can settle.
+        """
+        timeout = Config.DOM_SETTLE_TIMEOUT_MS / 1000.0
+        Waits.wait_for_network_idle(self.driver, Config.DOM_QUIET_MS, timeout)
+        return Waits.wait_for_dom_quiet(self.driver, Config.DOM_QUIET_MS, timeout)
+
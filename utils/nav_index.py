@@ -0,0 +1,133 @@
+import os
+import re
+import json
+import time
+from urllib.parse import urlparse
+from config import Config
+from utils.logger import logger
+from utils.waits import Waits
+
+# Location + title of the page reached, in one round-trip (used to detect stale URLs)
+PAGE_STATE_JS = "return [location.href, document.title || ''];"
+
+# Whole titles of error pages (IIS/ASP.NET/generic 404 and 5xx). Real screens whose title merely
+# contains "error" ("Registro de Errores") don't match; login redirects are caught by the route check.
+STALE_TITLE_RE = re.compile(r"^(?:error|error \d{3}.*|\d{3}(?: - .*)?|(?:404 )?(?:page |file )?not found|"
+                            r"p[aá]gina no encontrada|recurso no encontrado|runtime error|server error.*|error response|"
+                            r"the resource cannot be found\.?)$", re.IGNORECASE)
+
+
+def _route(url):
+    """
+    Path of a URL, plus its fragment when it is a client-side route ('#/ventas/facturas').
+    """
+    parsed = urlparse(url)
+    route = parsed.path.rstrip("/")
+    if parsed.fragment.startswith(("/", "!/")):
+        route += "#" + parsed.fragment
+    return route
+
+
+def menu_key(path):
+    """
+    ("Comercial", "Ventas", "Facturas") -> "Comercial > Ventas > Facturas"
+    """
+    return " > ".join(p for p in path if p)
+
+
+class NavIndex:
+    """
+    Persistent menu path -> URL map (outputs/nav_index.json). Screens are opened with driver.get
+    on the indexed URL; the click path through the sidebar is only used when the entry is
+    missing or stale, and the URL it reaches is recorded for the next visit.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or Config.NAV_INDEX_FILE
+        self.entries = {}
+        self.lookups = 0
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+            logger.info(f"Navigation index loaded: {len(self.entries)} screens.")
+        except Exception as e:
+            logger.warning(f"Navigation index unreadable, starting empty: {e}")
+            self.entries = {}
+        return self
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"updated_at": time.strftime("%Y-%m-%d %H:%M:%S"), "entries": self.entries}, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save navigation index: {e}")
+
+    def url_for(self, path):
+        entry = self.entries.get(menu_key(path))
+        return entry["url"] if entry else ""
+
+    def record(self, path, url, source="href"):
+        key = menu_key(path)
+        if not key or not url:
+            return
+        entry = self.entries.get(key)
+        if entry and entry["url"] == url:
+            return
+        self.entries[key] = {"url": url, "source": source, "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+    def forget(self, path):
+        self.entries.pop(menu_key(path), None)
+
+    def navigate(self, driver, path, click_path=None):
+        """
+        Opens the screen of a menu path. driver.get on the indexed URL when there is one;
+        click_path(path) -> url is the fallback for missing or stale entries.
+        Returns the URL reached, or None if the screen could not be opened.
+        """
+        self.lookups += 1
+        url = self.url_for(path)
+        if url:
+            driver.get(url)
+            Waits.wait_for_network_idle(driver)
+            if self._reached(driver, url):
+                self.hits += 1
+                return url
+            self.stale += 1
+            logger.info(f"Navigation index: stale URL for '{menu_key(path)}' ({url}), using the menu.")
+            self.forget(path)
+        else:
+            self.misses += 1
+
+        if click_path is None:
+            return None
+        reached = click_path(path)
+        if reached:
+            self.record(path, reached, source="click")
+        return reached
+
+    @staticmethod
+    def _reached(driver, url):
+        try:
+            current, title = driver.execute_script(PAGE_STATE_JS)
+        except Exception:
+            return False
+        if _route(current) != _route(url):
+            return False   # Redirected (expired route, login page, default screen)
+        return not STALE_TITLE_RE.match(title.strip())
+
+    def log_summary(self):
+        if not self.lookups:
+            return
+        rate = 100.0 * self.hits / self.lookups
+        logger.info(f"Navigation index: {self.hits}/{self.lookups} direct hits ({rate:.0f}%), "
+                    f"{self.stale} stale, {self.misses} not indexed, {len(self.entries)} screens indexed.")
@@ -0,0 +1,237 @@
+import json
+import time
+import base64
+from urllib.parse import urljoin
+from config import Config
+from utils.logger import logger
+from utils.inventory_sink import InventoryRecord
+
+# Key names (lower-case) the menu payload may use; the portal's exact schema is not assumed
+TEXT_KEYS = ("text", "title", "label", "name", "nombre", "descripcion", "description", "caption", "titulo")
+CHILD_KEYS = ("children", "items", "submenu", "submenus", "nodes", "hijos", "opciones", "menus", "childs")
+URL_KEYS = ("url", "href", "link", "ruta", "path", "pagina", "page")
+ID_KEYS = ("id", "codigo", "code", "key", "menuid", "idmenu")
+PARENT_KEYS = ("parentid", "parent_id", "parent", "padre", "idpadre", "id_padre", "codigopadre", "parentcode")
+
+# XSSI guards some backends prepend to JSON responses
+_JSON_PREFIXES = (")]}',", ")]}'", "while(1);", "for(;;);")
+
+
+def _lookup(node, keys):
+    lowered = {k.lower(): v for k, v in node.items()}
+    for key in keys:
+        value = lowered.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _text(node):
+    value = _lookup(node, TEXT_KEYS)
+    return " ".join(str(value).split()) if isinstance(value, (str, int)) else ""
+
+
+def decode_payload(body):
+    """
+    Parses a response body as JSON. ASP.NET style wrappers ({"d": "<json string>"}) are unwrapped.
+    Returns None for non-JSON bodies.
+    """
+    body = body.strip()
+    for prefix in _JSON_PREFIXES:
+        if body.startswith(prefix):
+            body = body[len(prefix):].lstrip()
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    while isinstance(payload, dict) and len(payload) == 1 and isinstance(next(iter(payload.values())), str):
+        inner = next(iter(payload.values())).strip()
+        if not inner.startswith(("[", "{")):
+            break
+        try:
+            payload = json.loads(inner)
+        except ValueError:
+            break
+    return payload
+
+
+def _nested_tree(nodes, base_url):
+    """
+    [{text, url, children: [...]}, ...] -> [(text, url, [children])]
+    """
+    tree = []
+    for node in nodes:
+        if not isinstance(node, dict):
+            continue
+        children = _lookup(node, CHILD_KEYS)
+        tree.append((_text(node), _url(node, base_url), _nested_tree(children, base_url) if isinstance(children, list) else []))
+    return tree
+
+
+def _flat_tree(nodes, base_url):
+    """
+    [{id, parentId, text, url}, ...] -> [(text, url, [children])], keeping payload order.
+    """
+    by_id, roots = {}, []
+    entries = []
+    for node in nodes:
+        node_id = _lookup(node, ID_KEYS)
+        entry = (_text(node), _url(node, base_url), [])
+        entries.append((node_id, _lookup(node, PARENT_KEYS), entry))
+        if node_id is not None:
+            by_id[str(node_id)] = entry
+    for node_id, parent_id, entry in entries:
+        parent = by_id.get(str(parent_id)) if parent_id not in (None, "", 0, "0") else None
+        if parent is not None and parent is not entry:
+            parent[2].append(entry)
+        else:
+            roots.append(entry)
+    return roots
+
+
+def _url(node, base_url):
+    value = _lookup(node, URL_KEYS)
+    if not isinstance(value, str) or not value.strip() or value.startswith("#") or value.lower().startswith("javascript:"):
+        return ""
+    return urljoin(base_url, value.strip())
+
+
+def _size(tree):
+    return sum(1 + _size(children) for _, _, children in tree)
+
+
+def _depth(tree):
+    return max((1 + _depth(children) for _, _, children in tree), default=0)
+
+
+def find_menu_tree(payload, base_url=""):
+    """
+    Walks a decoded payload and returns the largest list of labelled nodes that forms a menu
+    (at least two levels, nested via a children key or flat with id/parent references).
+    """
+    best = []
+    stack = [payload]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+            continue
+        if not isinstance(value, list):
+            continue
+        stack.extend(value)
+
+        nodes = [n for n in value if isinstance(n, dict)]
+        if not nodes or sum(1 for n in nodes if _text(n)) < len(nodes) / 2:
+            continue
+        if any(isinstance(_lookup(n, CHILD_KEYS), list) for n in nodes):
+            tree = _nested_tree(nodes, base_url)
+        elif any(_lookup(n, PARENT_KEYS) not in (None, "", 0, "0") for n in nodes):
+            tree = _flat_tree(nodes, base_url)
+        else:
+            continue
+        if _depth(tree) >= 2 and _size(tree) > _size(best):
+            best = tree
+    return best
+
+
+def tree_to_records(tree, source=""):
+    """
+    Flattens a menu tree into L1/L2/L3 InventoryRecords, in the same order the sidebar crawl yields them
+    (deeper levels are reported as L3, like the DOM parser does).
+    """
+    ts = time.time()
+    records = []
+
+    def walk(nodes, path):
+        for text, url, children in nodes:
+            if not text:
+                walk(children, path)
+                continue
+            level = len(path) + 1
+            levels = (path + [text])[:3] if level <= 3 else path[:2] + [text]
+            levels += [""] * (3 - len(levels))
+            records.append(InventoryRecord(text, *levels, status="CAPTURED", ts=ts, url_after_click=url,
+                                           notes=f"Network payload -> Level {level}" + (f" ({source})" if source else "")))
+            walk(children, path + [text])
+
+    walk(tree, [])
+    return records
+
+
+class NetworkMenuCapture:
+    """
+    Reads the menu structure from the portal's own XHR/fetch responses instead of the DOM.
+    Needs a driver created with performance logging (DriverFactory.create(performance_log=True)):
+    the Network events in Chrome's performance log identify the JSON responses and
+    Network.getResponseBody fetches their bodies, so a full menu costs one payload parse.
+    """
+
+    def __init__(self, driver, min_nodes=None):
+        self.driver = driver
+        self.min_nodes = min_nodes or Config.NETWORK_MENU_MIN_NODES
+        # requestId -> response URL of finished JSON responses (the performance log is drained on every read)
+        self.responses = {}
+        self._pending = {}
+
+    def collect(self):
+        """
+        Drains the performance log and keeps the finished XHR/fetch/JSON responses.
+        """
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            logger.error(f"Performance log unavailable (driver created without performance logging?): {e}")
+            return self.responses
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method, params = message.get("method"), message.get("params", {})
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                if params.get("type") in ("XHR", "Fetch") or "json" in response.get("mimeType", ""):
+                    self._pending[params["requestId"]] = response.get("url", "")
+            elif method == "Network.loadingFinished" and params.get("requestId") in self._pending:
+                self.responses[params["requestId"]] = self._pending.pop(params["requestId"])
+        return self.responses
+
+    def body(self, request_id):
+        try:
+            result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except Exception as e:
+            logger.debug(f"Response body {request_id} not available: {e}")
+            return None
+        body = result.get("body", "")
+        if result.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8", errors="replace")
+        return body
+
+    def capture(self):
+        """
+        Returns the InventoryRecords of the largest menu found in the captured responses,
+        or [] when no response looks like a menu (the caller falls back to the DOM crawl).
+        """
+        started = time.perf_counter()
+        self.collect()
+        logger.info(f"Network capture: inspecting {len(self.responses)} JSON/XHR responses...")
+
+        best, best_url = [], ""
+        for request_id, url in self.responses.items():
+            body = self.body(request_id)
+            payload = decode_payload(body) if body else None
+            if payload is None:
+                continue
+            tree = find_menu_tree(payload, url)
+            if _size(tree) > _size(best):
+                best, best_url = tree, url
+
+        if _size(best) < self.min_nodes:
+            logger.warning(f"Network capture: no menu payload found ({_size(best)} nodes in the best candidate).")
+            return []
+        records = tree_to_records(best, best_url)
+        logger.info(f"Network capture: {len(records)} menu items parsed from {best_url} "
+                    f"in {time.perf_counter() - started:.2f}s.")
+        return records
+
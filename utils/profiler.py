@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import threading
+import contextlib
+from contextlib import contextmanager
+from datetime import datetime
+from config import Config
+from utils.logger import logger, set_phase_provider
+
+# Frames from these files are skipped when looking for the caller of a WebDriver command
+# (the throttle wraps the same executor and uses contextlib, so its frames sit between the caller and the command)
+_SKIP_PATHS = (os.sep + "selenium" + os.sep, os.path.abspath(__file__),
+               os.path.join(os.path.dirname(os.path.abspath(__file__)), "throttle.py"), contextlib.__file__)
+
+
+class CommandProfiler:
+    """
+    Records every WebDriver command (name, locator, latency, caller, phase) by wrapping
+    the driver's command executor, plus span timers for run phases (login, expand, parse, save).
+    """
+
+    def __init__(self):
+        self.events = []
+        self.spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started = time.perf_counter()
+
+    def attach(self, driver):
+        """
+        Wraps driver.command_executor.execute so every command is timed. Safe to call twice.
+        """
+        executor = driver.command_executor
+        if getattr(executor, "_qa_profiled", False):
+            return driver
+        original = executor.execute
+
+        def profiled_execute(command, params=None):
+            started = time.perf_counter()
+            try:
+                return original(command, params)
+            finally:
+                self._record(command, params, time.perf_counter() - started)
+
+        executor.execute = profiled_execute
+        executor._qa_profiled = True
+        return driver
+
+    @contextmanager
+    def span(self, name):
+        stack = self._phase_stack()
+        stack.append(name)
+        commands_before = self._thread_commands()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "thread": threading.current_thread().name,
+                    "start_s": round(started - self._started, 4),
+                    "elapsed_s": round(elapsed, 4),
+                    "commands": self._thread_commands() - commands_before,
+                })
+            logger.info(f"Phase '{name}' finished in {elapsed:.2f}s")
+
+    def _phase_stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current_phase(self):
+        stack = self._phase_stack()
+        return stack[-1] if stack else ""
+
+    def _thread_commands(self):
+        return getattr(self._local, "commands", 0)
+
+    def _record(self, command, params, latency):
+        locator = ""
+        if params:
+            if "using" in params:
+                locator = f"{params.get('using')}={params.get('value')}"
+            elif "url" in params:
+                locator = params["url"]
+        stack = self._phase_stack()
+        self._local.commands = self._thread_commands() + 1
+        event = (time.perf_counter() - self._started, command, locator, latency, self._caller(), stack[-1] if stack else "")
+        with self._lock:
+            self.events.append(event)
+
+    @staticmethod
+    def _caller():
+        frame = sys._getframe(2)
+        while frame:
+            path = frame.f_code.co_filename
+            if not any(skip in path for skip in _SKIP_PATHS):
+                owner = frame.f_locals.get("self")
+                prefix = type(owner).__name__ if owner is not None else os.path.splitext(os.path.basename(path))[0]
+                return f"{prefix}.{frame.f_code.co_name}"
+            frame = frame.f_back
+        return "?"
+
+    def _aggregate(self, key_index):
+        totals = {}
+        for event in self.events:
+            key = event[key_index]
+            count, total, worst = totals.get(key, (0, 0.0, 0.0))
+            totals[key] = (count + 1, total + event[3], max(worst, event[3]))
+        rows = [
+            {"key": key, "count": count, "total_ms": round(total * 1000, 2), "avg_ms": round(total * 1000 / count, 2), "max_ms": round(worst * 1000, 2)}
+            for key, (count, total, worst) in totals.items()
+        ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def save_report(self, top_n=15):
+        """
+        Writes profile_<timestamp>.json (all events) and .txt (top-N tables) to the log directory.
+        """
+        with self._lock:
+            by_command = self._aggregate(1)
+            by_caller = self._aggregate(4)
+            report = {
+                "generated_at": datetime.now().isoformat(timespec="seconds"),
+                "elapsed_s": round(time.perf_counter() - self._started, 3),
+                "total_commands": len(self.events),
+                "total_command_ms": round(sum(e[3] for e in self.events) * 1000, 2),
+                "spans": list(self.spans),
+                "by_command": by_command,
+                "by_caller": by_caller,
+                "events": [
+                    {"t_s": round(t, 4), "command": c, "locator": loc, "latency_ms": round(lat * 1000, 2), "caller": caller, "phase": phase}
+                    for t, c, loc, lat, caller, phase in self.events
+                ],
+            }
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        json_path = os.path.join(Config.LOG_DIR, f"profile_{stamp}.json")
+        txt_path = os.path.join(Config.LOG_DIR, f"profile_{stamp}.txt")
+        try:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+            lines = [f"WebDriver commands: {report['total_commands']} ({report['total_command_ms'] / 1000:.2f}s) in {report['elapsed_s']:.2f}s run", ""]
+            lines.append(f"{'Phase':<30} {'Seconds':>9} {'Commands':>9}")
+            lines.extend(f"{s['name']:<30} {s['elapsed_s']:>9.2f} {s['commands']:>9}" for s in report["spans"])
+            for title, rows in (("Command", by_command), ("Caller", by_caller)):
+                lines.append("")
+                lines.append(f"{'Top ' + title:<45} {'Count':>7} {'Total ms':>10} {'Avg ms':>8} {'Max ms':>8}")
+                lines.extend(f"{r['key'][:45]:<45} {r['count']:>7} {r['total_ms']:>10.1f} {r['avg_ms']:>8.1f} {r['max_ms']:>8.1f}" for r in rows[:top_n])
+            with open(txt_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+            logger.info(f"WebDriver profile: {report['total_commands']} commands, {report['total_command_ms'] / 1000:.2f}s in round-trips")
+            logger.info(f"Profile saved: {json_path}")
+            return json_path
+        except Exception as e:
+            logger.error(f"Failed to save profile: {e}")
+            return None
+
+
+profiler = CommandProfiler()
+# Log records carry the phase of the span they were logged in
+set_phase_provider(profiler.current_phase)
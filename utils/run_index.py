@@ -0,0 +1,122 @@
+import os
+import csv
+import json
+import time
+from config import Config
+from utils.logger import logger
+
+DIFF_CSV_FIELDS = ["change_type", "menu_level_1", "menu_level_2", "menu_level_3", "old_text", "new_text"]
+
+
+class RunIndex:
+    """
+    Per-module structural hashes and captured items of the last run (outputs/run_index.json).
+    Modules whose in-page hash is unchanged are re-emitted from here instead of being re-crawled.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or Config.RUN_INDEX_FILE
+        self.modules = {}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.modules = json.load(f).get("modules", {})
+            logger.info(f"Run index loaded: {len(self.modules)} modules from previous run.")
+        except Exception as e:
+            logger.warning(f"Run index unreadable, doing a full crawl: {e}")
+            self.modules = {}
+        return self
+
+    def get(self, module):
+        return self.modules.get(module)
+
+    def update(self, module, subtree_hash, branch_hashes, items):
+        self.modules[module] = {"hash": subtree_hash, "branches": branch_hashes, "items": items}
+
+    def save(self):
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"updated_at": time.strftime("%Y-%m-%d %H:%M:%S"), "modules": self.modules}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save run index: {e}")
+
+
+def _path(item):
+    return tuple(item.get(k, "") for k in ("menu_level_1", "menu_level_2", "menu_level_3"))
+
+
+def _children(paths, level):
+    """
+    Groups the paths of one level by parent, keeping sidebar order: {parent_path: [name, ...]}.
+    """
+    grouped = {}
+    for path in paths:
+        if path[level] and not any(path[level + 1:]):
+            grouped.setdefault(path[:level], []).append(path[level])
+    return grouped
+
+
+def diff_inventories(old_items, new_items):
+    """
+    Compares two inventories level by level (L1, then L2, then L3).
+    A removed and an added sibling at the same position under the same parent count as a rename;
+    renames are applied to the old tree before descending, so a renamed module doesn't
+    show up as all of its children removed and re-added.
+    """
+    old_paths = [_path(i) for i in old_items]
+    new_paths = [_path(i) for i in new_items]
+    changes = []
+
+    for level in range(3):
+        old_groups = _children(old_paths, level)
+        new_groups = _children(new_paths, level)
+        renames = {}
+
+        for parent in list(old_groups) + [p for p in new_groups if p not in old_groups]:
+            old_names = old_groups.get(parent, [])
+            new_names = new_groups.get(parent, [])
+            removed = [(pos, n) for pos, n in enumerate(old_names) if n not in new_names]
+            added = [(pos, n) for pos, n in enumerate(new_names) if n not in old_names]
+            added_by_pos = dict(added)
+
+            for pos, name in removed:
+                if pos in added_by_pos:
+                    new_name = added_by_pos.pop(pos)
+                    renames[parent + (name,)] = parent + (new_name,)
+                    changes.append(("RENAMED", parent + (new_name,), name, new_name))
+                else:
+                    changes.append(("REMOVED", parent + (name,), name, ""))
+            for pos, name in added_by_pos.items():
+                changes.append(("ADDED", parent + (name,), "", name))
+
+        # Re-root descendants of renamed nodes before comparing the next level
+        if renames:
+            depth = level + 1
+            old_paths = [renames.get(p[:depth], p[:depth]) + p[depth:] for p in old_paths]
+
+    rows = []
+    for change_type, path, old_text, new_text in changes:
+        padded = path + ("",) * (3 - len(path))
+        rows.append({"change_type": change_type, "menu_level_1": padded[0], "menu_level_2": padded[1],
+                     "menu_level_3": padded[2], "old_text": old_text, "new_text": new_text})
+    return rows
+
+
+def save_diff_report(rows, filename="inventory_diff.csv"):
+    path = os.path.join(Config.OUTPUT_DIR, filename)
+    try:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=DIFF_CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        with open(os.path.splitext(path)[0] + ".json", "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=4, ensure_ascii=False)
+        counts = {t: sum(1 for r in rows if r["change_type"] == t) for t in ("ADDED", "REMOVED", "RENAMED")}
+        logger.info(f"Diff report saved: {path} (added {counts['ADDED']}, removed {counts['REMOVED']}, renamed {counts['RENAMED']})")
+    except Exception as e:
+        logger.error(f"Failed to save diff report: {e}")
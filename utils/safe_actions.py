@@ -1,10 +1,35 @@
+import os
+import json
+import time
+import threading
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
+from config import Config
 from utils.logger import logger
 from utils.waits import Waits
+from utils.throttle import throttle
+
+# Scrolls the element into view (first step of the standard click) and returns its signature for the
+# strategy memory in the same round-trip: [page path, tag.classes[role]] (ids are often generated)
+SIGNATURE_JS = r"""
+var el = arguments[0];
+el.scrollIntoView({block: 'center'});
+var classes = (typeof el.className === 'string' ? el.className : '').split(/\s+/).filter(function (c) {
+    return c && !/^(active|open|hover|focus|selected|disabled|collapsed|in|show)$/.test(c);
+}).sort().slice(0, 4);
+var role = el.getAttribute('role');
+return [location.pathname, el.tagName.toLowerCase() + (classes.length ? '.' + classes.join('.') : '') + (role ? '[role=' + role + ']' : '')];
+"""
 
 class SafeActions:
+    STRATEGIES = ("standard", "actions", "js")
+
+    # Shared by every instance (and worker thread): signature -> strategy that last worked, per-strategy stats
+    memory = {}
+    stats = {}
+    _lock = threading.Lock()
+
     def __init__(self, driver: WebDriver):
         self.driver = driver
 
@@ -21,41 +46,99 @@ class SafeActions:
             logger.error(f"Failed to click element {locator}: {e}")
             return False
 
-    def robust_click(self, element):
+    def robust_click(self, element, locator=None):
         """
         Tries 3 strategies to click an element:
         1. Scroll into view + Click
         2. ActionChains Move + Click
         3. JavaScript Click
+        The strategy that last worked for the same element signature on the same page is tried first.
         """
-        try:
-            # Strategy 1: Scroll + Standard Click
-            try:
-                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                ActionChains(self.driver).move_to_element(element).perform() # Hover to ensure visibility
-                element.click()
-                logger.info("Robust Click: Standard click successful.")
-                return True
-            except Exception as e1:
-                logger.warning(f"Standard click failed: {e1}. Trying ActionChains...")
-
-            # Strategy 2: ActionChains
+        key = self._signature(element, locator)
+        preferred = SafeActions.memory.get(key)
+        order = [preferred] + [s for s in self.STRATEGIES if s != preferred] if preferred in self.STRATEGIES else list(self.STRATEGIES)
+
+        for strategy in order:
+            started = time.perf_counter()
             try:
-                actions = ActionChains(self.driver)
-                actions.move_to_element(element).click().perform()
-                logger.info("Robust Click: ActionChains click successful.")
-                return True
-            except Exception as e2:
-                logger.warning(f"ActionChains click failed: {e2}. Trying JS...")
-
-            # Strategy 3: JavaScript Force Click
-            self.driver.execute_script("arguments[0].click();", element)
-            logger.info("Robust Click: JS click successful.")
+                getattr(self, f"_click_{strategy}")(element)
+            except Exception as e:
+                self._record(strategy, False, time.perf_counter() - started)
+                logger.warning(f"Robust Click: {strategy} click failed: {e}")
+                continue
+            self._record(strategy, True, time.perf_counter() - started)
+            if key and preferred != strategy:
+                with SafeActions._lock:
+                    SafeActions.memory[key] = strategy
+            logger.info(f"Robust Click: {strategy} click successful" + (" (remembered)." if strategy == preferred else "."))
             return True
 
-        except Exception as final_e:
-            logger.error(f"All click strategies failed: {final_e}")
-            return False
+        logger.error("All click strategies failed.")
+        return False
+
+    def _click_standard(self, element):
+        # Already scrolled into view by _signature
+        ActionChains(self.driver).move_to_element(element).perform() # Hover to ensure visibility
+        element.click()
+
+    def _click_actions(self, element):
+        ActionChains(self.driver).move_to_element(element).click().perform()
+
+    def _click_js(self, element):
+        # Script clicks don't go through the throttled clickElement command
+        with throttle.request("click"):
+            self.driver.execute_script("arguments[0].click();", element)
+
+    def _signature(self, element, locator=None):
+        """
+        page path + locator, or page path + tag/classes/role of the element. Shares its round-trip
+        with the scrollIntoView the standard click needs anyway, so the memory costs no extra call.
+        """
+        try:
+            path, signature = self.driver.execute_script(SIGNATURE_JS, element)
+            return f"{path}|{locator[0]}={locator[1]}" if locator else f"{path}|{signature}"
+        except Exception:
+            return None
+
+    @staticmethod
+    def _record(strategy, ok, elapsed):
+        with SafeActions._lock:
+            entry = SafeActions.stats.setdefault(strategy, {"attempts": 0, "successes": 0, "seconds": 0.0})
+            entry["attempts"] += 1
+            entry["successes"] += int(ok)
+            entry["seconds"] += elapsed
+
+    @staticmethod
+    def load_memory(path=None):
+        path = path or Config.CLICK_MEMORY_FILE
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                SafeActions.memory.update(json.load(f))
+            logger.info(f"Click strategy memory loaded: {len(SafeActions.memory)} element signatures.")
+        except Exception as e:
+            logger.warning(f"Click strategy memory unreadable, starting empty: {e}")
+
+    @staticmethod
+    def save_memory(path=None):
+        path = path or Config.CLICK_MEMORY_FILE
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(SafeActions.memory, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"Failed to save click strategy memory: {e}")
+
+    @staticmethod
+    def log_summary():
+        for strategy in SafeActions.STRATEGIES:
+            entry = SafeActions.stats.get(strategy)
+            if not entry:
+                continue
+            rate = 100.0 * entry["successes"] / entry["attempts"]
+            avg_ms = 1000.0 * entry["seconds"] / entry["attempts"]
+            logger.info(f"Click strategy [{strategy}]: {entry['successes']}/{entry['attempts']} ok ({rate:.0f}%), avg {avg_ms:.0f} ms.")
 
     def send_keys(self, locator, text, timeout=10):
         try:
@@ -0,0 +1,182 @@
+import time
+from collections import deque
+from config import Config
+from utils.logger import logger
+from utils.inventory_sink import InventoryRecord
+from utils.snapshot import SCREEN_SCAN_JS
+from utils.waits import Waits
+from utils.frame_tree import FrameTree
+
+
+def element_record(target, element, url, frame_path=""):
+    """
+    One screen element ([kind, label, action_type, selector]) under its menu item.
+    """
+    kind, label, action_type, selector = element
+    return InventoryRecord(label or kind, target.menu_level_1, target.menu_level_2, target.menu_level_3,
+                           status="CAPTURED", notes=f"Screen element: {kind}", selector_hint=selector,
+                           action_type=action_type, url_after_click=url, frame_path=frame_path)
+
+
+def error_record(target, error):
+    """
+    Screen that could not be harvested. action_type "screen" keeps it with the screen rows, not the menu entries.
+    """
+    return InventoryRecord(target.item_text, target.menu_level_1, target.menu_level_2, target.menu_level_3,
+                           status="ERROR", action_type="screen", url_after_click=target.url_after_click, error=str(error) or type(error).__name__)
+
+
+class ScreenFrontier:
+    """
+    Breadth-first queue of screens to harvest. Menu screens are depth 0; links found on a screen
+    are queued one level deeper (up to SCREEN_MAX_DEPTH). Every URL is visited once. Dedup is per
+    document: a frame whose structure hash was already harvested is skipped, and a screen with no
+    new frame at all only gets a single "same template" row.
+    Shared by the sync ScreenCrawler and the async TabCrawler.
+    """
+
+    def __init__(self, targets, max_depth=None, max_screens=None, state=None):
+        self.max_depth = Config.SCREEN_MAX_DEPTH if max_depth is None else max_depth
+        self.max_screens = max_screens or Config.SCREEN_MAX_SCREENS
+        self.queue = deque()
+        self.visited = set()
+        # structure hash -> label of the first screen harvested with it
+        self.templates = {}
+        self.popped = 0
+        self.duplicates = 0
+        if state:
+            # Resumed from a checkpoint: screens already visited are not queued again
+            self.queue.extend((InventoryRecord.from_dict(data), depth) for data, depth in state["queue"])
+            self.visited.update(state["visited"])
+            self.templates.update(state["templates"])
+            self.popped, self.duplicates = state["popped"], state["duplicates"]
+        for target in targets:
+            self.push(target, 0)
+
+    def state(self):
+        """
+        JSON-serializable BFS state, for the screen stage checkpoint.
+        """
+        return {"queue": [[target.to_dict(), depth] for target, depth in self.queue], "visited": sorted(self.visited),
+                "templates": self.templates, "popped": self.popped, "duplicates": self.duplicates}
+
+    def push(self, target, depth):
+        url = target.url_after_click
+        if not url or url in self.visited or depth > self.max_depth or len(self.visited) >= self.max_screens:
+            return False
+        self.visited.add(url)
+        self.queue.append((target, depth))
+        return True
+
+    def pop(self):
+        """
+        Returns (order, target, depth) of the next screen, or None when the queue is empty.
+        """
+        if not self.queue:
+            return None
+        target, depth = self.queue.popleft()
+        self.popped += 1
+        return self.popped - 1, target, depth
+
+    def known_hashes(self):
+        return list(self.templates)
+
+    def records(self, target, depth, scans):
+        """
+        Turns the SCREEN_SCAN_JS results of one screen (main document first, then its frames)
+        into InventoryRecords and queues the screen's links.
+        """
+        url = target.url_after_click
+        records, new_frames, known = [], 0, ""
+        for scan in scans:
+            for text, href in scan.get("links") or []:
+                self.push(InventoryRecord(text, target.menu_level_1, target.menu_level_2, target.menu_level_3,
+                                          url_after_click=href), depth + 1)
+            structure = scan.get("hash", "")
+            if scan.get("elements") is None or structure in self.templates:
+                known = known or structure
+                continue
+            new_frames += 1
+            self.templates[structure] = target.item_text
+            records.extend(element_record(target, element, url, scan.get("frame", "")) for element in scan["elements"])
+
+        if scans and not new_frames:
+            self.duplicates += 1
+            return [InventoryRecord(target.item_text, target.menu_level_1, target.menu_level_2, target.menu_level_3,
+                                    status="CAPTURED", action_type="screen", url_after_click=url,
+                                    notes=f"Same screen template as '{self.templates.get(known, '?')}' ({known})")]
+        return records
+
+
+class ScreenCrawler:
+    """
+    Synchronous screen stage: visits each screen in the logged-in tab (BFS order), waits for the DOM
+    to settle and harvests the main document and every iframe with one execute_script call each
+    (frames mapped once per page by FrameTree). See TabCrawler for the concurrent variant.
+    """
+
+    def __init__(self, driver, sink=None, exclude=None, max_depth=None, max_screens=None, navigate=None, checkpoint=None):
+        self.driver = driver
+        # navigate(target) -> url reached: opens menu screens (depth 0), e.g. through the navigation index
+        self.navigate = navigate
+        self.frames = FrameTree(driver)
+        self.sink = sink
+        # CSS selector of page chrome (the sidebar) left out of the harvest and the structure hash
+        self.exclude = exclude
+        self.max_depth = max_depth
+        self.max_screens = max_screens
+        # CrawlCheckpoint: the BFS state is saved after every screen, --resume continues from it
+        self.checkpoint = checkpoint
+        self.visited = 0
+        self.failed = 0
+
+    def run(self, targets):
+        """
+        targets: menu InventoryRecords with url_after_click set. Returns the number of records written.
+        """
+        state = self.checkpoint.screens if self.checkpoint else None
+        frontier = ScreenFrontier(targets, self.max_depth, self.max_screens, state)
+        if not frontier.queue:
+            return 0
+        started = time.perf_counter()
+        logger.info(f"Screen crawl: {len(frontier.queue)} menu screens (BFS, link depth {frontier.max_depth})...")
+
+        written = 0
+        while True:
+            entry = frontier.pop()
+            if entry is None:
+                break
+            _, target, depth = entry
+            records = self._visit(frontier, target, depth)
+            if self.sink is not None:
+                self.sink.write_many(records)
+                if self.checkpoint:
+                    self.sink.flush()
+                    self.checkpoint.mark_screens(frontier.state(), self.sink.count)
+            written += len(records)
+
+        logger.info(f"Screen crawl done in {time.perf_counter() - started:.1f}s: {self.visited} screens "
+                    f"({len(frontier.templates)} templates, {frontier.duplicates} duplicates), {self.failed} failed, {written} rows.")
+        return written
+
+    def _visit(self, frontier, target, depth):
+        try:
+            if depth == 0 and self.navigate:
+                if not self.navigate(target):
+                    raise RuntimeError("Screen could not be opened (stale URL and menu click failed)")
+            else:
+                self.driver.get(target.url_after_click)
+            Waits.wait_for_dom_quiet(self.driver, timeout=Config.DOM_SETTLE_TIMEOUT_MS / 1000.0)
+            scans = []
+            for frame_path, result in self.frames.run(SCREEN_SCAN_JS, self.exclude, frontier.known_hashes()):
+                if result:
+                    result["frame"] = frame_path
+                    scans.append(result)
+            self.visited += 1
+            records = frontier.records(target, depth, scans)
+            logger.info(f"[screen d{depth}] {target.item_text}: {len(records)} rows")
+            return records
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Failed to harvest '{target.item_text}' ({target.url_after_click}): {e}")
+            return [error_record(target, e)]
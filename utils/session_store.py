@@ -0,0 +1,137 @@
+import os
+import json
+import base64
+import time
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from config import Config
+from utils.logger import logger
+
+# Dumps both Web Storage areas as plain objects in one round-trip
+DUMP_STORAGE_JS = """
+function dump(s) { var o = {}; for (var i = 0; i < s.length; i++) { var k = s.key(i); o[k] = s.getItem(k); } return o; }
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+LOAD_STORAGE_JS = """
+var data = arguments[0];
+Object.keys(data.local || {}).forEach(function (k) { window.localStorage.setItem(k, data.local[k]); });
+Object.keys(data.session || {}).forEach(function (k) { window.sessionStorage.setItem(k, data.session[k]); });
+"""
+
+
+class SessionStore:
+    """
+    Encrypted on-disk cache of an authenticated browser session (cookies + localStorage + sessionStorage).
+    The key is derived from INTEGRENS_SESSION_KEY (or the ERP password) so the file is useless on its own.
+    """
+    KDF_ITERATIONS = 390000
+
+    def __init__(self, path=None, ttl_minutes=None):
+        self.path = path or Config.SESSION_FILE
+        self.ttl_seconds = int((ttl_minutes if ttl_minutes is not None else Config.SESSION_TTL_MINUTES) * 60)
+
+    def _fernet(self, salt):
+        secret = Config.SESSION_KEY or Config.PASS
+        if not secret:
+            raise ValueError("No secret available to encrypt the session cache.")
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=self.KDF_ITERATIONS)
+        return Fernet(base64.urlsafe_b64encode(kdf.derive(secret.encode("utf-8"))))
+
+    def snapshot(self, driver):
+        """
+        Returns the live session of the driver as a plain dict (cookies, storage, current URL).
+        """
+        storage = driver.execute_script(DUMP_STORAGE_JS) or {}
+        return {
+            "saved_at": time.time(),
+            "url": driver.current_url,
+            "cookies": driver.get_cookies(),
+            "local": storage.get("local", {}),
+            "session": storage.get("session", {}),
+        }
+
+    def save(self, driver):
+        """
+        Snapshots the current session after a successful login and writes it encrypted.
+        """
+        try:
+            payload = self.snapshot(driver)
+            salt = os.urandom(16)
+            token = self._fernet(salt).encrypt(json.dumps(payload).encode("utf-8"))
+
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"salt": base64.b64encode(salt).decode("ascii"), "token": token.decode("ascii")}, f)
+            os.replace(tmp_path, self.path)
+            logger.info(f"Session cached ({len(payload['cookies'])} cookies): {self.path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to cache session: {e}")
+            return False
+
+    def load(self):
+        """
+        Returns the decrypted session payload, or None if missing, expired or unreadable.
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                envelope = json.load(f)
+            salt = base64.b64decode(envelope["salt"])
+            # Fernet tokens carry their creation time, so the TTL check is done on decrypt
+            data = self._fernet(salt).decrypt(envelope["token"].encode("ascii"), ttl=self.ttl_seconds)
+            return json.loads(data)
+        except InvalidToken:
+            logger.info("Cached session expired or key changed. Invalidating cache.")
+            self.invalidate()
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read cached session: {e}")
+            return None
+
+    def restore(self, driver):
+        """
+        Injects the cached session into a fresh driver and navigates to the last authenticated URL.
+        Returns True if something was restored (caller must still validate the session).
+        """
+        payload = self.load()
+        if not payload:
+            return False
+
+        try:
+            self.inject(driver, payload)
+            age_min = (time.time() - payload.get("saved_at", time.time())) / 60
+            logger.info(f"Cached session restored (age {age_min:.0f} min).")
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to restore cached session: {e}")
+            return False
+
+    @staticmethod
+    def inject(driver, payload):
+        """
+        Loads a session payload (see snapshot) into a driver. Raises on navigation errors.
+        """
+        # Cookies/storage can only be set for the origin currently loaded
+        driver.get(Config.URL_LOGIN)
+        for cookie in payload.get("cookies", []):
+            if cookie.get("expiry") and cookie["expiry"] < time.time():
+                continue  # Expired since it was cached
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                logger.debug(f"Skipping cookie {cookie.get('name')}: {e}")
+        driver.execute_script(LOAD_STORAGE_JS, {"local": payload.get("local", {}), "session": payload.get("session", {})})
+        driver.get(payload.get("url") or Config.URL_LOGIN)
+
+    def invalidate(self):
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+                logger.info(f"Session cache removed: {self.path}")
+        except Exception as e:
+            logger.error(f"Failed to remove session cache: {e}")
@@ -0,0 +1,289 @@
+import json
+from collections import namedtuple
+from utils.logger import logger
+
+# Shared by every script that reads or keys on a menu label, so the snapshot labels, the subtree
+# hash keys and the branch marks always agree. innerText is the rendered text of a visible link and
+# falls back to textContent for a hidden (collapsed) one.
+LINK_TEXT_JS = r"""
+function linkText(a) { return ((a.innerText === undefined ? a.textContent : a.innerText) || '').replace(/\s+/g, ' ').trim(); }
+"""
+
+
+def normalize_text(text):
+    """
+    Python side of linkText(): collapses whitespace, for labels read back from disk (run index, JSONL).
+    """
+    return " ".join((text or "").split())
+
+
+# Compact record for one sidebar link, built in Python from the raw JS array.
+SidebarNode = namedtuple("SidebarNode", ["text", "depth", "href", "id", "css_class", "selector", "visible"])
+
+# Walks every <a> under the container in ONE round-trip and returns arrays:
+# [text, depth, href, id, class, selector, visible]
+# Depth = number of <ul> ancestors (same proxy as the old ./ancestor::ul XPath).
+SIDEBAR_SNAPSHOT_JS = LINK_TEXT_JS + r"""
+var root = arguments[0] || document.body;
+var includeHidden = !!arguments[1];
+var links = root.getElementsByTagName('a');
+var out = [];
+
+function isVisible(el) {
+    if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) return false;
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+
+function cssPath(el) {
+    if (el.id) return '#' + CSS.escape(el.id);
+    var parts = [];
+    while (el && el.nodeType === 1 && el !== document.body) {
+        if (el.id) { parts.unshift('#' + CSS.escape(el.id)); break; }
+        var tag = el.tagName.toLowerCase();
+        var idx = 1, sib = el;
+        while ((sib = sib.previousElementSibling)) { if (sib.tagName === el.tagName) idx++; }
+        parts.unshift(tag + ':nth-of-type(' + idx + ')');
+        el = el.parentElement;
+    }
+    return parts.join(' > ');
+}
+
+for (var i = 0; i < links.length; i++) {
+    var a = links[i];
+    var visible = isVisible(a);
+    if (!visible && !includeHidden) continue;
+    var depth = 0, p = a.parentElement;
+    while (p) { if (p.tagName === 'UL') depth++; p = p.parentElement; }
+    // Only real navigation targets (absolute URL, or a '#/route' of the SPA); '#' and javascript: toggles are left empty
+    var raw = a.getAttribute('href') || '';
+    var route = raw.charAt(0) === '#' ? /^#!?\//.test(raw) : raw.toLowerCase().indexOf('javascript:') !== 0;
+    var href = (raw && route) ? a.href : '';
+    out.push([linkText(a), depth, href, a.id || '',
+              (typeof a.className === 'string' ? a.className : ''), cssPath(a), visible ? 1 : 0]);
+}
+return {total: links.length, nodes: out};
+"""
+
+
+def snapshot_sidebar(driver, container=None, include_hidden=False):
+    """
+    Returns (total_links, [SidebarNode]) for the container using a single execute_script call.
+    """
+    try:
+        result = driver.execute_script(SIDEBAR_SNAPSHOT_JS, container, include_hidden) or {}
+    except Exception as e:
+        logger.error(f"Sidebar snapshot failed: {e}")
+        return 0, []
+
+    nodes = [
+        SidebarNode(text, int(depth), href, el_id, css_class, selector, bool(visible))
+        for text, depth, href, el_id, css_class, selector, visible in result.get("nodes", [])
+    ]
+    return result.get("total", len(nodes)), nodes
+
+
+# Structural hash (FNV-1a over link text + relative depth + raw href) of every L1 subtree and its L2
+# branches. Collapsed (hidden) submenus are included without expanding anything.
+# Returns [[l1_text, hash, {l2_text: hash}], ...] in sidebar order, labels from the same linkText() as the snapshot.
+SUBTREE_HASH_JS = LINK_TEXT_JS + r"""
+var root = arguments[0] || document.body;
+function fnv(str) {
+    var h = 0x811c9dc5;
+    for (var i = 0; i < str.length; i++) { h ^= str.charCodeAt(i); h = Math.imul(h, 0x01000193); }
+    return ('0000000' + (h >>> 0).toString(16)).slice(-8);
+}
+function depthOf(a) {
+    var d = 0, p = a.parentElement;
+    while (p) { if (p.tagName === 'UL') d++; p = p.parentElement; }
+    return d;
+}
+var text = linkText;
+// The href is part of the structure: a re-pointed menu entry must not reuse the old URL
+function hashOf(li, base) {
+    var links = li.getElementsByTagName('a'), parts = [];
+    for (var i = 0; i < links.length; i++) {
+        var t = text(links[i]);
+        if (t) parts.push((depthOf(links[i]) - base) + ':' + t + ':' + (links[i].getAttribute('href') || ''));
+    }
+    return fnv(parts.join('|'));
+}
+// No child links in the DOM and not a page link: the children are loaded on expand, so the
+// subtree content is unknown ('' = always crawl) rather than "just the label"
+function lazy(li, link) {
+    var links = li.getElementsByTagName('a');
+    for (var i = 0; i < links.length; i++) { if (links[i] !== link && text(links[i])) return false; }
+    var raw = link.getAttribute('href') || '';
+    return !raw || raw === '#' || /^javascript:/i.test(raw);
+}
+
+var links = root.getElementsByTagName('a'), minDepth = Infinity, tops = [];
+for (var i = 0; i < links.length; i++) {
+    if (!text(links[i])) continue;
+    var d = depthOf(links[i]);
+    if (d < minDepth) { minDepth = d; tops = []; }
+    if (d === minDepth) tops.push(links[i]);
+}
+
+var out = [];
+for (var j = 0; j < tops.length; j++) {
+    var li = tops[j].closest('li');
+    if (!li) continue;
+    var branches = {}, inner = li.getElementsByTagName('a');
+    for (var k = 0; k < inner.length; k++) {
+        if (depthOf(inner[k]) !== minDepth + 1 || !text(inner[k])) continue;
+        var sub = inner[k].closest('li');
+        if (sub && sub !== li) branches[text(inner[k])] = lazy(sub, inner[k]) ? '' : hashOf(sub, minDepth);
+    }
+    out.push([text(tops[j]), lazy(li, tops[j]) ? '' : hashOf(li, minDepth), branches]);
+}
+return out;
+"""
+
+
+def module_keys(labels):
+    """
+    Key of each L1 module in sidebar order (checkpoint, run index, commit order): the label, with
+    '#n' appended to the n-th repeat of a label, so two 'Reportes' modules are 'Reportes' and 'Reportes#2'.
+    """
+    seen, keys = {}, []
+    for label in labels:
+        seen[label] = seen.get(label, 0) + 1
+        keys.append(label if seen[label] == 1 else f"{label}#{seen[label]}")
+    return keys
+
+
+def subtree_hashes(driver, container=None):
+    """
+    Returns {module_key: (hash, {l2_text: hash})} for the sidebar in a single execute_script call.
+    Subtrees whose children are not in the DOM yet (lazy-loaded menus) get an empty hash: never reused.
+    """
+    try:
+        result = driver.execute_script(SUBTREE_HASH_JS, container) or []
+    except Exception as e:
+        logger.error(f"Subtree hashing failed: {e}")
+        return {}
+    keys = module_keys([l1 for l1, _, _ in result])
+    return {key: (h, branches) for key, (_, h, branches) in zip(keys, result)}
+
+
+# Harvests the interactive elements of the current screen in one call.
+# Returns [[kind, label, action_type, selector], ...] for visible buttons, inputs, combos and grids
+# (elements inside arguments[1], e.g. the sidebar, are skipped).
+SCREEN_HARVEST_JS = r"""
+var root = arguments[0] || document, exclude = arguments[1];
+var QUERIES = [
+    ['button', 'button, input[type=button], input[type=submit], input[type=reset], a.btn, [role=button]', 'click'],
+    ['combo', 'select, [role=combobox], .select2-container, .k-combobox, .k-dropdown', 'select'],
+    ['input', 'input:not([type=button]):not([type=submit]):not([type=reset]):not([type=hidden]), textarea', 'input'],
+    ['grid', 'table, [role=grid], .k-grid, .ui-jqgrid, .dataTables_wrapper', 'grid']
+];
+function visible(el) {
+    if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) return false;
+    return window.getComputedStyle(el).visibility !== 'hidden';
+}
+function cssPath(el) {
+    if (el.id) return '#' + CSS.escape(el.id);
+    var parts = [];
+    while (el && el.nodeType === 1 && el !== document.body) {
+        if (el.id) { parts.unshift('#' + CSS.escape(el.id)); break; }
+        var tag = el.tagName.toLowerCase(), idx = 1, sib = el;
+        while ((sib = sib.previousElementSibling)) { if (sib.tagName === el.tagName) idx++; }
+        parts.unshift(tag + ':nth-of-type(' + idx + ')');
+        el = el.parentElement;
+    }
+    return parts.join(' > ');
+}
+function label(el) {
+    if (el.id) {
+        var lab = document.querySelector('label[for="' + CSS.escape(el.id) + '"]');
+        if (lab && lab.innerText.trim()) return lab.innerText.trim();
+    }
+    var text = el.getAttribute('aria-label') || el.getAttribute('title') || el.getAttribute('placeholder') ||
+               (el.tagName === 'INPUT' ? el.value : '') || (el.tagName === 'TABLE' ? '' : el.innerText) || el.getAttribute('name') || el.id || '';
+    if (el.tagName === 'TABLE' || el.getAttribute('role') === 'grid') {
+        var cap = el.querySelector('caption, th');
+        text = text || (cap ? cap.innerText : '');
+    }
+    return text.replace(/\s+/g, ' ').trim().slice(0, 120);
+}
+
+var seen = new Set(), out = [];
+for (var q = 0; q < QUERIES.length; q++) {
+    var els = root.querySelectorAll(QUERIES[q][1]);
+    for (var i = 0; i < els.length; i++) {
+        var el = els[i];
+        if (seen.has(el) || !visible(el) || (exclude && el.closest(exclude))) continue;
+        seen.add(el);
+        out.push([QUERIES[q][0], label(el), QUERIES[q][2], cssPath(el)]);
+    }
+}
+return out;
+"""
+
+# Structure hash + harvest + outgoing links of the current screen in one call.
+# arguments: [exclude_selector, known_hashes]. The hash covers tags/input types only (no text), with
+# repeated siblings (grid rows, options) collapsed, so screens built from the same template share it.
+# Runs per document: inside an iframe it describes that frame only.
+# Returns {hash, elements (null when the hash is already known), links: [[text, url], ...], frame: path label}.
+SCREEN_SCAN_JS = r"""
+var exclude = arguments[0], known = arguments[1] || [];
+var SKIP = {SCRIPT: 1, STYLE: 1, NOSCRIPT: 1, TEMPLATE: 1};
+function fnv(str) {
+    var h = 0x811c9dc5;
+    for (var i = 0; i < str.length; i++) { h ^= str.charCodeAt(i); h = Math.imul(h, 0x01000193); }
+    return ('0000000' + (h >>> 0).toString(16)).slice(-8);
+}
+function skeleton(el) {
+    var parts = [], prev = null;
+    for (var i = 0; i < el.children.length; i++) {
+        var child = el.children[i];
+        if (SKIP[child.tagName] || (exclude && child.matches(exclude))) continue;
+        var s = skeleton(child);
+        if (s !== prev) parts.push(s);
+        prev = s;
+    }
+    var type = el.getAttribute('type');
+    return el.tagName.toLowerCase() + (type ? '[' + type + ']' : '') + (parts.length ? '(' + parts.join(',') + ')' : '');
+}
+
+// Same labels as FrameTree: #id, tag[name=...] or tag[index in parent frames]; path for cross-origin parents
+function frameLabel() {
+    var parts = [], win = window;
+    try {
+        while (win !== win.parent) {
+            var el = win.frameElement;
+            if (!el) { parts.unshift(win.location.pathname); break; }
+            var index = 0;
+            for (var k = 0; k < win.parent.frames.length; k++) { if (win.parent.frames[k] === win) { index = k; break; } }
+            var tag = el.tagName.toLowerCase();
+            parts.unshift(el.id ? '#' + el.id : el.name ? tag + '[name=' + el.name + ']' : tag + '[' + index + ']');
+            win = win.parent;
+        }
+    } catch (e) { parts.unshift(location.pathname); }
+    return parts.join(' > ');
+}
+
+var hash = fnv(skeleton(document.body));
+var elements = known.indexOf(hash) === -1 ? (function () {""" + SCREEN_HARVEST_JS + r"""}).apply(null, [document, exclude]) : null;
+
+var links = [], urls = {}, anchors = document.querySelectorAll('a[href]');
+for (var j = 0; j < anchors.length; j++) {
+    var a = anchors[j], raw = a.getAttribute('href');
+    if (!raw || raw.charAt(0) === '#' || raw.toLowerCase().indexOf('javascript:') === 0) continue;
+    if (a.origin !== location.origin || (exclude && a.closest(exclude)) || urls[a.href]) continue;
+    var text = (a.innerText || a.getAttribute('title') || '').replace(/\s+/g, ' ').trim();
+    if (!text || !(a.offsetWidth || a.offsetHeight)) continue;
+    urls[a.href] = 1;
+    links.push([text.slice(0, 120), a.href.split('#')[0]]);
+}
+return {hash: hash, elements: elements, links: links, frame: frameLabel()};
+"""
+
+
+def screen_scan_expression(exclude, known_hashes):
+    """
+    SCREEN_SCAN_JS as a self-invoking expression for CDP Runtime.evaluate.
+    """
+    return "(function () {" + SCREEN_SCAN_JS + "}).apply(null, " + json.dumps([exclude, list(known_hashes)]) + ")"
+
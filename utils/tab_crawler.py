@@ -0,0 +1,160 @@
+import json
+import time
+import trio
+from selenium.webdriver.common.bidi.cdp import import_devtools, open_cdp
+from config import Config
+from utils.logger import logger
+from utils.session_store import SessionStore
+from utils.snapshot import screen_scan_expression
+from utils.screen_crawler import ScreenFrontier, error_record
+from utils.waits import DOM_QUIET_JS
+from utils.throttle import throttle
+
+# Promise wrapper around the DOM-quiet waiter (its async callback becomes the resolver)
+DOM_QUIET_EXPRESSION = "new Promise(function (resolve) { (function () {" + DOM_QUIET_JS + "}).apply(null, [%d, %d, resolve]); })"
+
+# sessionStorage is per tab: replay the logged-in tab's values into every new tab of the same origin
+SESSION_STORAGE_BOOTSTRAP = """
+(function () {
+    var origin = %s, data = %s;
+    if (location.origin !== origin) return;
+    Object.keys(data).forEach(function (k) { if (sessionStorage.getItem(k) === null) sessionStorage.setItem(k, data[k]); });
+})();
+"""
+
+
+class TabCrawler:
+    """
+    Visits menu targets concurrently in K tabs of the already logged-in browser, driven with trio
+    over the Chrome DevTools websocket. Tabs share the browser's cookies, so there is no extra login
+    and no extra Chrome process. Each tab harvests its screen inventory in one Runtime.evaluate.
+    Screens are scheduled breadth-first and deduplicated by structure hash (see ScreenFrontier).
+    """
+
+    def __init__(self, driver, tabs=None, sink=None, exclude=None, max_depth=None, max_screens=None, checkpoint=None):
+        self.driver = driver
+        self.tabs = tabs or Config.ASYNC_TABS
+        self.sink = sink
+        self.exclude = exclude
+        self.frontier = None
+        # CrawlCheckpoint: rows are written once, in target order, so the stage is checkpointed as a whole
+        self.checkpoint = checkpoint
+        self.max_depth = max_depth
+        self.max_screens = max_screens
+        self.visited = 0
+        self.failed = 0
+        self._active = 0
+
+    def run(self, targets):
+        """
+        targets: menu InventoryRecords with url_after_click set. Returns the screen element records,
+        which are also written to the sink (in target order) when one was given.
+        """
+        state = self.checkpoint.screens if self.checkpoint else None
+        self.frontier = ScreenFrontier(targets, self.max_depth, self.max_screens, state)
+        if not self.frontier.queue:
+            return []
+        started = time.perf_counter()
+        logger.info(f"Async tab crawl: {len(self.frontier.queue)} menu screens across {self.tabs} tabs...")
+        results = trio.run(self._crawl)
+
+        records = []
+        for order in range(self.frontier.popped):
+            records.extend(results.get(order, []))
+        if self.sink is not None:
+            self.sink.write_many(records)
+            if self.checkpoint:
+                self.sink.flush()
+                self.checkpoint.mark_screens(self.frontier.state(), self.sink.count)
+        logger.info(f"Async tab crawl done in {time.perf_counter() - started:.1f}s: {self.visited} screens "
+                    f"({len(self.frontier.templates)} templates, {self.frontier.duplicates} duplicates), "
+                    f"{self.failed} failed, {len(records)} rows.")
+        return records
+
+    def _cdp_details(self):
+        caps = self.driver.capabilities
+        if caps.get("se:cdp"):
+            return caps["se:cdpVersion"].split(".")[0], caps["se:cdp"]
+        return self.driver._get_cdp_details()
+
+    async def _crawl(self):
+        version, ws_url = self._cdp_details()
+        devtools = import_devtools(version)
+        session = SessionStore().snapshot(self.driver)
+        origin = self.driver.execute_script("return location.origin;")
+        bootstrap = SESSION_STORAGE_BOOTSTRAP % (json.dumps(origin), json.dumps(session.get("session", {})))
+
+        results = {}
+        async with open_cdp(ws_url) as conn:
+            async with trio.open_nursery() as nursery:
+                for tab_id in range(min(self.tabs, len(self.frontier.queue))):
+                    nursery.start_soon(self._tab_worker, conn, devtools, tab_id + 1, bootstrap, results)
+        return results
+
+    async def _tab_worker(self, conn, devtools, tab_id, bootstrap, results):
+        target_id = await conn.execute(devtools.target.create_target("about:blank", background=True))
+        try:
+            async with conn.open_session(target_id) as session:
+                await session.execute(devtools.page.enable())
+                await session.execute(devtools.page.add_script_to_evaluate_on_new_document(source=bootstrap))
+                while True:
+                    entry = self.frontier.pop()
+                    if entry is None:
+                        # Other tabs may still queue links found on their screens
+                        if not self._active:
+                            break
+                        await trio.sleep(0.05)
+                        continue
+                    order, target, depth = entry
+                    self._active += 1
+                    try:
+                        results[order] = await self._visit(session, devtools, tab_id, target, depth)
+                    finally:
+                        self._active -= 1
+        finally:
+            await conn.execute(devtools.target.close_target(target_id))
+
+    async def _visit(self, session, devtools, tab_id, target, depth):
+        url = target.url_after_click
+        try:
+            with trio.fail_after(Config.TAB_PAGE_TIMEOUT):
+                async with throttle.request_async("get"):
+                    async with session.wait_for(devtools.page.LoadEventFired):
+                        await session.execute(devtools.page.navigate(url=url))
+                await session.execute(devtools.runtime.evaluate(
+                    expression=DOM_QUIET_EXPRESSION % (Config.DOM_QUIET_MS, Config.DOM_SETTLE_TIMEOUT_MS), await_promise=True))
+                remote, error = await session.execute(devtools.runtime.evaluate(
+                    expression=screen_scan_expression(self.exclude, self.frontier.known_hashes()), return_by_value=True))
+            if error:
+                raise RuntimeError(error.text)
+            scans = [remote.value or {}] + await self._scan_frames(session, devtools)
+            self.visited += 1
+            records = self.frontier.records(target, depth, scans)
+            logger.info(f"[tab {tab_id}] {target.item_text}: {len(records)} rows")
+            return records
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"[tab {tab_id}] Failed to harvest '{target.item_text}' ({url}): {e}")
+            return [error_record(target, e)]
+
+    async def _scan_frames(self, session, devtools):
+        """
+        Runs the screen scan in every child frame of the tab (one isolated world + one evaluate each).
+        Out-of-process (cross-site) frames are not reachable from this session and are skipped.
+        """
+        tree = await session.execute(devtools.page.get_frame_tree())
+        pending, scans = list(tree.child_frames or []), []
+        while pending:
+            node = pending.pop(0)
+            pending.extend(node.child_frames or [])
+            try:
+                context = await session.execute(devtools.page.create_isolated_world(frame_id=node.frame.id_, world_name="qa-harvest"))
+                remote, error = await session.execute(devtools.runtime.evaluate(
+                    expression=screen_scan_expression(self.exclude, self.frontier.known_hashes()),
+                    context_id=context, return_by_value=True))
+            except Exception as e:
+                logger.debug(f"Frame {node.frame.url} not scanned: {e}")
+                continue
+            if not error and remote.value:
+                scans.append(remote.value)
+        return scans
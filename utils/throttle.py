@@ -0,0 +1,229 @@
+import time
+import threading
+from contextlib import contextmanager, asynccontextmanager
+import trio
+from config import Config
+from utils.logger import logger
+
+# WebDriver commands that reach the ERP server (page loads, clicks, native action chains)
+THROTTLED_COMMANDS = {"get": "get", "refresh": "get", "goBack": "get", "goForward": "get",
+                      "clickElement": "click", "actions": "click"}
+
+# W3C error codes of a command response that point at the server or the network (congestion).
+# Client-side errors (click intercepted, stale element, no such element) are not the server's fault.
+CONGESTION_ERRORS = ("timeout", "script timeout")
+
+# HTTP status of the page just loaded. ChromeDriver's get succeeds for a 5xx page with a body (what
+# IIS returns when the ERP is overloaded), so the status has to be read from the navigation entry.
+NAVIGATION_STATUS_JS = "var e = performance.getEntriesByType('navigation')[0]; return e && e.responseStatus || 0;"
+OVERLOAD_STATUSES = (429, 502, 503, 504)
+
+
+def command_error(response):
+    """
+    Returns (error, congestion) for a command executor response: the W3C error code ("" on success)
+    and whether it signals server/network trouble (timeouts, net::ERR_* page load failures).
+    command_executor.execute returns errors instead of raising; WebDriver.execute raises them later.
+    """
+    value = response.get("value") if isinstance(response, dict) else None
+    if not isinstance(value, dict) or not value.get("error"):
+        return "", False
+    error, message = value["error"], str(value.get("message", ""))
+    return error, error in CONGESTION_ERRORS or "net::ERR_" in message or "timed out" in message.lower()
+
+
+def navigation_status(execute, session_id=None):
+    """
+    HTTP status of the document loaded by the last get (0 when unknown, e.g. data: URLs or old Chrome).
+    execute is a command executor's execute (the call does not take a throttle slot); session_id
+    comes from the params of the command being wrapped.
+    """
+    try:
+        response = execute("w3cExecuteScript", {"sessionId": session_id, "script": NAVIGATION_STATUS_JS, "args": []})
+    except Exception:
+        return 0
+    value = response.get("value") if isinstance(response, dict) else None
+    return value if isinstance(value, int) else 0
+
+
+class AdaptiveThrottle:
+    """
+    AIMD limiter for the requests the crawl sends to the ERP: a concurrency limit (requests in
+    flight across worker browsers, tabs and threads) and a pacing rate (requests/second, capped at
+    Config.THROTTLE_MAX_RPS). Every fast, successful request raises both additively (the limit by 1
+    per `limit` requests, the rate by about 1 rps per second); an error or a response slower than
+    Config.THROTTLE_TARGET_LATENCY cuts both by Config.THROTTLE_BACKOFF, at most once per cooldown
+    so a single burst isn't punished twice.
+    """
+
+    def __init__(self, max_rps=None, max_concurrency=None, target_latency=None, backoff=None, enabled=None):
+        self.enabled = Config.THROTTLE_ENABLED if enabled is None else enabled
+        self.max_rps = max_rps or Config.THROTTLE_MAX_RPS
+        self.max_concurrency = max_concurrency or Config.THROTTLE_MAX_CONCURRENCY
+        self.target_latency = target_latency or Config.THROTTLE_TARGET_LATENCY
+        self.backoff = backoff or Config.THROTTLE_BACKOFF
+        self.min_rps = min(Config.THROTTLE_MIN_RPS, self.max_rps)
+        # Start halfway and probe upwards
+        self.limit = max(1.0, self.max_concurrency / 2.0)
+        self.rate = max(self.min_rps, self.max_rps / 2.0)
+        self.active = 0
+        self.waiting = 0
+        self.stats = {"requests": 0, "errors": 0, "client_errors": 0, "slow": 0, "decreases": 0, "peak_queue": 0,
+                      "wait_seconds": 0.0, "latency_seconds": 0.0, "min_limit": self.limit, "min_rate": self.rate, "kinds": {}}
+        self._cond = threading.Condition()
+        self._next_slot = 0.0
+        self._last_decrease = 0.0
+
+    def attach(self, driver):
+        """
+        Wraps driver.command_executor.execute so page loads and clicks take a slot. Safe to call twice.
+        """
+        executor = driver.command_executor
+        if not self.enabled or getattr(executor, "_qa_throttled", False):
+            return driver
+        original = executor.execute
+
+        def throttled_execute(command, params=None):
+            kind = THROTTLED_COMMANDS.get(command)
+            if kind is None:
+                return original(command, params)
+            # RemoteConnection.execute pops the URL parameters (sessionId) out of params
+            session_id = (params or {}).get("sessionId")
+            with self.request(kind) as outcome:
+                response = original(command, params)
+                error, congestion = command_error(response)
+                if not error and kind == "get":
+                    status = navigation_status(original, session_id)
+                    congestion = status in OVERLOAD_STATUSES or status >= 500
+                if congestion:
+                    outcome["ok"] = False
+                elif error:
+                    outcome["client_error"] = True
+                return response
+
+        executor.execute = throttled_execute
+        executor._qa_throttled = True
+        return driver
+
+    @contextmanager
+    def request(self, kind="request"):
+        """
+        Holds a slot while the block runs. Yields the outcome dict: set outcome["ok"] = False for a
+        failed request (server error, timeout); outcome["client_error"] = True for a failure that says
+        nothing about the server's load. An exception counts as an error (and is re-raised).
+        """
+        outcome = {"ok": True, "client_error": False}
+        if not self.enabled:
+            yield outcome
+            return
+        queued = time.perf_counter()
+        self._enqueue()
+        with self._cond:
+            delay = self._reserve()
+            while delay is None:
+                self._cond.wait(0.1)
+                delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        started = self._dequeue(queued)
+        failed = True
+        try:
+            yield outcome
+            failed = False
+        finally:
+            self.release(kind, time.perf_counter() - started, outcome["ok"] and not failed, outcome["client_error"])
+
+    @asynccontextmanager
+    async def request_async(self, kind="request"):
+        """
+        trio variant of request() for the async tab crawl (polls for a slot instead of blocking the loop).
+        """
+        outcome = {"ok": True, "client_error": False}
+        if not self.enabled:
+            yield outcome
+            return
+        queued = time.perf_counter()
+        self._enqueue()
+        while True:
+            with self._cond:
+                delay = self._reserve()
+            if delay is not None:
+                break
+            await trio.sleep(0.02)
+        if delay > 0:
+            await trio.sleep(delay)
+        started = self._dequeue(queued)
+        failed = True
+        try:
+            yield outcome
+            failed = False
+        finally:
+            self.release(kind, time.perf_counter() - started, outcome["ok"] and not failed, outcome["client_error"])
+
+    def _enqueue(self):
+        with self._cond:
+            self.waiting += 1
+            self.stats["peak_queue"] = max(self.stats["peak_queue"], self.waiting)
+
+    def _dequeue(self, queued):
+        now = time.perf_counter()
+        with self._cond:
+            self.waiting -= 1
+            self.stats["wait_seconds"] += now - queued
+        return now
+
+    def _reserve(self):
+        """
+        Takes a concurrency slot and the next pacing slot. Returns the seconds to wait before sending,
+        or None when the concurrency limit is reached. Caller holds the lock.
+        """
+        if self.active >= int(self.limit):
+            return None
+        self.active += 1
+        now = time.perf_counter()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1.0 / self.rate
+        return slot - now
+
+    def release(self, kind, latency, ok=True, client_error=False):
+        with self._cond:
+            self.active -= 1
+            s = self.stats
+            s["requests"] += 1
+            s["latency_seconds"] += latency
+            s["kinds"][kind] = s["kinds"].get(kind, 0) + 1
+            slow = latency > self.target_latency
+            if ok and client_error and not slow:
+                s["client_errors"] += 1   # Neutral: neither a sign of spare capacity nor of overload
+            elif ok and not slow:
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+                self.rate = min(self.max_rps, self.rate + 1.0 / self.rate)
+            else:
+                s["errors" if not ok else "slow"] += 1
+                now = time.perf_counter()
+                if now - self._last_decrease >= self.target_latency:
+                    self._last_decrease = now
+                    self.limit = max(1.0, self.limit * self.backoff)
+                    self.rate = max(self.min_rps, self.rate * self.backoff)
+                    s["decreases"] += 1
+                    s["min_limit"] = min(s["min_limit"], self.limit)
+                    s["min_rate"] = min(s["min_rate"], self.rate)
+                    logger.debug(f"Throttle: {'error' if not ok else f'slow {kind} ({latency:.2f}s)'}, "
+                                 f"limit -> {self.limit:.1f}, rate -> {self.rate:.2f} rps")
+            self._cond.notify_all()
+
+    def log_summary(self):
+        s = self.stats
+        if not s["requests"]:
+            return
+        kinds = ", ".join(f"{k} {v}" for k, v in sorted(s["kinds"].items()))
+        logger.info(f"Throttle: {s['requests']} requests ({kinds}), {s['errors']} errors, {s['slow']} slow, "
+                    f"{s['client_errors']} client-side errors (not counted), "
+                    f"avg latency {1000.0 * s['latency_seconds'] / s['requests']:.0f} ms. "
+                    f"Limit {self.limit:.1f} in flight / {self.rate:.2f} rps (max {self.max_concurrency} / {self.max_rps:g}, "
+                    f"lowest {s['min_limit']:.1f} / {s['min_rate']:.2f}, {s['decreases']} backoffs); "
+                    f"queue depth {self.waiting} (peak {s['peak_queue']}), {s['wait_seconds']:.1f}s spent queued.")
+
+
+# Single limiter for the whole run: shared by the main driver, the worker pool and the async tabs
+throttle = AdaptiveThrottle()
@@ -1,22 +1,270 @@
+import math
+import time
+import uuid
+from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-# from utils.logger import logger # Import if needed, avoiding circular imports if logger imports waits
+from selenium.common.exceptions import TimeoutException, JavascriptException, WebDriverException
+from config import Config
+from utils.logger import logger
+
+# Locator kinds the in-page waiter can resolve itself
+_JS_LOCATORS = {
+    By.CSS_SELECTOR: "css",
+    By.ID: "id",
+    By.NAME: "name",
+    By.CLASS_NAME: "class",
+    By.TAG_NAME: "tag",
+    By.XPATH: "xpath",
+}
+
+# Resolves as soon as the element reaches the requested state. Re-checks on every DOM
+# mutation (MutationObserver) plus a slow safety tick for changes that don't mutate the DOM.
+ELEMENT_WAIT_JS = r"""
+var kind = arguments[0], value = arguments[1], state = arguments[2], timeout = arguments[3];
+var done = arguments[arguments.length - 1];
+var start = Date.now(), finished = false, obs = null, tick = null;
+
+function find() {
+    switch (kind) {
+        case 'css': return document.querySelector(value);
+        case 'id': return document.getElementById(value);
+        case 'name': return document.getElementsByName(value)[0] || null;
+        case 'class': return document.getElementsByClassName(value)[0] || null;
+        case 'tag': return document.getElementsByTagName(value)[0] || null;
+        case 'xpath': return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    return null;
+}
+function visible(el) {
+    if (!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) return false;
+    var s = window.getComputedStyle(el);
+    return s.visibility !== 'hidden' && s.display !== 'none' && s.opacity !== '0';
+}
+function check() {
+    var el = find();
+    if (!el) return null;
+    if (state === 'present') return el;
+    if (!visible(el)) return null;
+    if (state === 'clickable' && el.disabled) return null;
+    return el;
+}
+function finish(result) {
+    if (finished) return;
+    finished = true;
+    if (obs) obs.disconnect();
+    clearInterval(tick);
+    done({element: result, elapsed: Date.now() - start});
+}
+
+var hit = check();
+if (hit) { finish(hit); return; }
+obs = new MutationObserver(function () { var el = check(); if (el) finish(el); });
+obs.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+tick = setInterval(function () {
+    var el = check();
+    if (el) finish(el);
+    else if (Date.now() - start >= timeout) finish(null);
+}, 250);
+"""
+
+# Resolves once no DOM mutation has been seen for `quiet` ms (or timeout).
+DOM_QUIET_JS = r"""
+var quiet = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+var start = Date.now(), last = start;
+var obs = new MutationObserver(function () { last = Date.now(); });
+obs.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+(function check() {
+    var now = Date.now();
+    if (now - last >= quiet || now - start >= timeout) { obs.disconnect(); done({quiet: now - last >= quiet, elapsed: now - start}); }
+    else setTimeout(check, Math.min(50, quiet));
+})();
+"""
+
+# Installs (once per document) a pending-request counter on XHR and fetch. Requests started
+# before the first install on a page are not visible to the tracker.
+NETWORK_TRACKER_JS = r"""
+if (!window.__qaNet) {
+    var net = window.__qaNet = {pending: 0, last: Date.now()};
+    var settle = function () { net.pending = Math.max(0, net.pending - 1); net.last = Date.now(); };
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        net.pending++; net.last = Date.now();
+        this.addEventListener('loadend', settle);
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var origFetch = window.fetch;
+        window.fetch = function () {
+            net.pending++; net.last = Date.now();
+            return origFetch.apply(this, arguments).finally(settle);
+        };
+    }
+}
+"""
+
+# Marks the current document right before an action that may navigate (see Waits.mark_document)
+DOCUMENT_MARK_JS = NETWORK_TRACKER_JS + r"""
+window.__qaDocMark = {id: arguments[0], t: Date.now(), href: location.href};
+"""
+
+# Resolves when nothing has been in flight for `idle` ms. With a document mark, idle is only measured
+# once the action has visibly started (new document, URL or readyState change, or a request since
+# the mark), or after `grace` ms: otherwise the wait could resolve before a navigation even begins.
+NETWORK_IDLE_JS = NETWORK_TRACKER_JS + r"""
+var idle = arguments[0], timeout = arguments[1], mark = arguments[2], grace = arguments[3];
+var done = arguments[arguments.length - 1];
+var start = Date.now();
+function started() {
+    var m = window.__qaDocMark;
+    if (!mark || !m || m.id !== mark) return true;   // No mark, or a new document
+    return location.href !== m.href || document.readyState !== 'complete' || window.__qaNet.last > m.t;
+}
+(function check() {
+    var now = Date.now(), net = window.__qaNet;
+    var isIdle = (started() || now - start >= grace) && net.pending === 0 && now - net.last >= idle &&
+                 document.readyState === 'complete';
+    if (isIdle || now - start >= timeout) done({idle: isIdle, pending: net.pending, elapsed: now - start});
+    else setTimeout(check, 50);
+})();
+"""
+
 
 class Waits:
     DEFAULT_TIMEOUT = 10
+    POLL_FREQUENCY = 0.5  # WebDriverWait default, used as the baseline for "time saved"
+
+    # Cumulative savings for the run summary
+    stats = {"waits": 0, "saved_seconds": 0.0}
 
     @staticmethod
     def wait_for_element(driver, locator, timeout=DEFAULT_TIMEOUT, condition=EC.presence_of_element_located):
-        try:
+        """
+        Waits for an element with ONE blocking execute_async_script call (MutationObserver in page).
+        Locators/conditions the page script can't evaluate fall back to WebDriverWait polling.
+        """
+        state = Waits._state_for(condition)
+        kind = _JS_LOCATORS.get(locator[0])
+        if not state or not kind:
             return WebDriverWait(driver, timeout).until(condition(locator))
-        except TimeoutException:
-            raise
+
+        started = time.perf_counter()
+        result = Waits._run_async(driver, timeout, lambda ms: (ELEMENT_WAIT_JS, kind, locator[1], state, ms))
+        elapsed = time.perf_counter() - started
+        if result.get("element") is None:
+            raise TimeoutException(f"Element {locator} not {state} after {timeout}s")
+
+        polled = math.ceil(elapsed / Waits.POLL_FREQUENCY) * Waits.POLL_FREQUENCY
+        Waits._report(f"{state} {locator[1]}", elapsed, polled, "0.5s polling")
+        return result["element"]
 
     @staticmethod
     def wait_for_clickable(driver, locator, timeout=DEFAULT_TIMEOUT):
         return Waits.wait_for_element(driver, locator, timeout, EC.element_to_be_clickable)
-    
+
     @staticmethod
     def wait_for_visibility(driver, locator, timeout=DEFAULT_TIMEOUT):
         return Waits.wait_for_element(driver, locator, timeout, EC.visibility_of_element_located)
+
+    @staticmethod
+    def wait_for_dom_quiet(driver, quiet_ms=None, timeout=DEFAULT_TIMEOUT, baseline=None):
+        """
+        Blocks until the DOM has had no mutations for quiet_ms. Returns True if it settled before timeout.
+        baseline: fixed sleep (s) this wait replaces, for the time-saved report.
+        """
+        quiet_ms = Config.DOM_QUIET_MS if quiet_ms is None else quiet_ms
+        try:
+            result = Waits._run_async(driver, timeout, lambda ms: (DOM_QUIET_JS, quiet_ms, ms))
+        except Exception as e:
+            logger.debug(f"DOM quiet wait failed: {e}")
+            return False
+        if baseline is not None:
+            Waits._report(f"DOM quiet {quiet_ms}ms", result.get("elapsed", 0) / 1000.0, baseline, f"sleep({baseline})")
+        return bool(result.get("quiet"))
+
+    @staticmethod
+    def mark_document(driver):
+        """
+        Call right before a click/select that may navigate; pass the returned mark to
+        wait_for_network_idle(since=mark) so the wait doesn't resolve on the old, still idle page.
+        """
+        mark = uuid.uuid4().hex
+        try:
+            driver.execute_script(DOCUMENT_MARK_JS, mark)
+        except WebDriverException as e:
+            logger.debug(f"Document mark failed: {e}")
+            return None
+        return mark
+
+    @staticmethod
+    def wait_for_network_idle(driver, idle_ms=None, timeout=DEFAULT_TIMEOUT, baseline=None, since=None):
+        """
+        Blocks until no XHR/fetch has been pending for idle_ms and the document is complete.
+        since: mark from mark_document(); idle is measured once the action has started loading
+        (or after Config.NAVIGATION_START_MS). Returns True if the page went idle before timeout.
+        """
+        idle_ms = Config.NETWORK_IDLE_MS if idle_ms is None else idle_ms
+        started = time.perf_counter()
+        try:
+            result = Waits._run_async(driver, timeout, lambda ms: (NETWORK_IDLE_JS, idle_ms, ms, since, Config.NAVIGATION_START_MS))
+        except Exception as e:
+            logger.debug(f"Network idle wait failed: {e}")
+            return False
+        if not result.get("idle"):
+            logger.warning(f"Network not idle after {timeout}s ({result.get('pending')} requests pending).")
+        if baseline is not None:
+            Waits._report(f"network idle {idle_ms}ms", time.perf_counter() - started, baseline, f"sleep({baseline})")
+        return bool(result.get("idle"))
+
+    @staticmethod
+    def log_summary():
+        logger.info(f"Event-driven waits: {Waits.stats['waits']} waits, ~{Waits.stats['saved_seconds']:.1f}s saved vs polling/fixed sleeps.")
+
+    @staticmethod
+    def _state_for(condition):
+        if condition is EC.presence_of_element_located:
+            return "present"
+        if condition is EC.visibility_of_element_located:
+            return "visible"
+        if condition is EC.element_to_be_clickable:
+            return "clickable"
+        return None
+
+    @staticmethod
+    def _run_async(driver, timeout, build):
+        """
+        Runs an in-page async wait; build(remaining_ms) returns (script, *args). A full-page navigation
+        kills the script (older drivers: "document unloaded while waiting for result", chromedriver 140:
+        an early "script timeout"): it is re-run on the new document until the timeout, like
+        WebDriverWait re-polling. Returns {} on timeout.
+        """
+        Waits._ensure_script_timeout(driver, timeout)
+        deadline = time.perf_counter() + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return {}
+            script, *args = build(int(remaining * 1000))
+            try:
+                return driver.execute_async_script(script, *args) or {}
+            except (JavascriptException, TimeoutException) as e:
+                # The session script timeout is timeout + 5s, so a real one can't fire before the deadline
+                if isinstance(e, JavascriptException) and "unload" not in str(e).lower():
+                    raise
+                logger.debug("Page navigated during an in-page wait, waiting on the new document.")
+                time.sleep(0.05)
+
+    @staticmethod
+    def _ensure_script_timeout(driver, timeout):
+        # Async scripts are bound by the session script timeout (30s by default); only raise it when needed
+        needed = timeout + 5
+        if getattr(driver, "_qa_script_timeout", 30) < needed:
+            driver.set_script_timeout(needed)
+            driver._qa_script_timeout = needed
+
+    @staticmethod
+    def _report(label, elapsed, baseline, basis):
+        saved = max(0.0, baseline - elapsed)
+        Waits.stats["waits"] += 1
+        Waits.stats["saved_seconds"] += saved
+        logger.info(f"Wait [{label}] resolved in {elapsed * 1000:.0f} ms (saved ~{saved * 1000:.0f} ms vs {basis}).")
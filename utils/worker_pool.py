@@ -0,0 +1,161 @@
+import time
+import queue
+import threading
+from config import Config
+from utils.logger import logger
+from utils.session_store import SessionStore
+from utils.profiler import profiler
+from utils.throttle import throttle
+from utils.inventory_sink import InventoryRecord
+from utils.driver_factory import DriverFactory
+
+
+def create_headless_driver():
+    return DriverFactory().create(headless=True, implicit_wait=0)
+
+
+class WorkerStats:
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.tasks_done = 0
+        self.tasks_failed = 0
+        self.restarts = 0
+        self.startup_seconds = 0.0
+        self.busy_seconds = 0.0
+
+
+class CrawlWorkerPool:
+    """
+    Runs crawl tasks across N headless Chrome processes that share one authenticated session.
+    The session (cookies + storage) of the interactive login is injected into every worker,
+    so the CAPTCHA is only solved once.
+
+    task_fn(driver, task) must return a list of InventoryRecords for that task.
+    Results are returned merged in the original task order, or streamed in that order
+    to on_result(task, records, ok) as soon as every earlier task has finished.
+    """
+
+    def __init__(self, session_payload, task_fn, pool_size=None, max_restarts=None, driver_factory=create_headless_driver):
+        self.session_payload = session_payload
+        self.task_fn = task_fn
+        self.pool_size = pool_size or Config.WORKER_POOL_SIZE
+        self.max_restarts = Config.WORKER_MAX_RESTARTS if max_restarts is None else max_restarts
+        self.driver_factory = driver_factory
+        self.stats = []
+
+    def run(self, tasks, on_result=None):
+        if not tasks:
+            return []
+        self._tasks = tasks
+        self._on_result = on_result
+        self._next_emit = 0
+
+        pending = queue.Queue()
+        for index, task in enumerate(tasks):
+            pending.put((index, task, 0))
+
+        results = {}
+        lock = threading.Lock()
+        pool_size = min(self.pool_size, len(tasks))
+        self.stats = [WorkerStats(i + 1) for i in range(pool_size)]
+        logger.info(f"Starting worker pool: {pool_size} headless browsers for {len(tasks)} tasks.")
+
+        threads = [
+            threading.Thread(target=self._worker_loop, args=(stats, pending, results, lock), name=f"crawl-worker-{stats.worker_id}", daemon=True)
+            for stats in self.stats
+        ]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        # Tasks left behind by workers that exhausted their restarts
+        while not pending.empty():
+            index, task, _ = pending.get_nowait()
+            with lock:
+                self._store(results, index, [self._error_entry(task, "No worker available (restart budget exhausted)")], False)
+
+        self._log_summary(elapsed)
+
+        merged = []
+        for index in range(len(tasks)):
+            merged.extend(results.get(index, (None, []))[1])
+        return merged
+
+    def _store(self, results, index, records, ok):
+        """
+        Stores a task result and emits the contiguous finished prefix in task order. Caller holds the lock.
+        """
+        results[index] = (ok, records)
+        while self._on_result and self._next_emit in results:
+            emitted_ok, emitted = results.pop(self._next_emit)
+            self._on_result(self._tasks[self._next_emit], emitted, emitted_ok)
+            self._next_emit += 1
+
+    def _start_driver(self, stats):
+        started = time.perf_counter()
+        driver = throttle.attach(profiler.attach(self.driver_factory()))
+        SessionStore.inject(driver, self.session_payload)
+        stats.startup_seconds += time.perf_counter() - started
+        return driver
+
+    def _worker_loop(self, stats, pending, results, lock):
+        driver = None
+        try:
+            while True:
+                try:
+                    index, task, attempts = pending.get_nowait()
+                except queue.Empty:
+                    return
+
+                try:
+                    if driver is None:
+                        driver = self._start_driver(stats)
+                    started = time.perf_counter()
+                    with profiler.span(f"worker-{stats.worker_id}: {task}"):
+                        entries = self.task_fn(driver, task)
+                    stats.busy_seconds += time.perf_counter() - started
+                    stats.tasks_done += 1
+                    with lock:
+                        self._store(results, index, entries, True)
+                    logger.info(f"[worker {stats.worker_id}] '{task}' captured ({len(entries)} items).")
+
+                except Exception as e:
+                    logger.error(f"[worker {stats.worker_id}] Task '{task}' crashed: {e}")
+                    self._quit(driver)
+                    driver = None
+
+                    if attempts < Config.WORKER_TASK_RETRIES:
+                        pending.put((index, task, attempts + 1))
+                    else:
+                        stats.tasks_failed += 1
+                        with lock:
+                            self._store(results, index, [self._error_entry(task, str(e))], False)
+
+                    if stats.restarts >= self.max_restarts:
+                        logger.error(f"[worker {stats.worker_id}] Restart budget exhausted. Worker stopping.")
+                        return
+                    stats.restarts += 1
+        finally:
+            self._quit(driver)
+
+    @staticmethod
+    def _quit(driver):
+        if driver is None:
+            return
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _error_entry(task, error):
+        return InventoryRecord(str(task), menu_level_1=str(task), status="ERROR", error=error)
+
+    def _log_summary(self, elapsed):
+        logger.info(f"Worker pool finished in {elapsed:.1f}s")
+        logger.info("Worker | Tasks | Failed | Restarts | Startup (s) | Busy (s)")
+        for s in self.stats:
+            logger.info(f"{s.worker_id:>6} | {s.tasks_done:>5} | {s.tasks_failed:>6} | {s.restarts:>8} | {s.startup_seconds:>11.1f} | {s.busy_seconds:>8.1f}")